@@ -3,25 +3,129 @@ Flask API Server for ML Demand Forecasting Service
 Provides endpoints for the Node.js backend to access ML predictions
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
-import pandas as pd
-import numpy as np
+from collections import Counter
 from datetime import datetime, timedelta
+import hmac
 import os
+import time
 
 from predict import ProductionPlanner
 from train_model import DemandForecaster
+from reconciliation import reconcile_forecasts
+from donation_allocator import allocate_donations
+from fallback import TIER_NO_HISTORY
+from production_optimizer import optimize_production
+from plan_store import PlanStore, materialize, next_plan_date
+from intraday import SlotForecaster
+from model_registry import MODEL_REGISTRY_DIR, ModelRegistry
+from profiler import MAX_SECONDS as PROFILE_MAX_SECONDS, profile_call, profile_for
+from response_format import content_headers, encode_body, iter_encoded, parse_response_options, shape_body
+from schemas import (
+    SchemaError, parse_actuals_payload, parse_budget_ms, parse_dish_payload, parse_predict_payload,
+    parse_profile_payload, parse_restaurant_id, parse_slot_predict_payload, parse_slot_training_payload,
+    parse_training_payload
+)
 
 app = Flask(__name__)
 CORS(app)
 
-# Initialize planner
-planner = ProductionPlanner()
-
 # Model paths
 MODEL_PATH = 'model.pkl'
 METADATA_PATH = 'model_metadata.json'
+ARRAYS_PATH = 'model_arrays.joblib'
+SLOT_MODEL_PATH = 'slot_model.pkl'
+SLOT_METADATA_PATH = 'slot_model_metadata.json'
+
+# Share memory-mapped model arrays across worker processes
+USE_MMAP_MODEL = os.environ.get('ML_MMAP_MODEL', '0') == '1'
+
+# 'xgboost' (default) or 'compiled' NumPy tree evaluation
+INFERENCE_BACKEND = os.environ.get('ML_INFERENCE_BACKEND', 'xgboost')
+
+# Engineered training matrices reused when /train sees the same data again
+FEATURE_CACHE_DIR = os.environ.get('ML_FEATURE_CACHE', 'feature_cache')
+
+# Histogram bins per feature for training (lower = less memory, coarser splits)
+TRAIN_MAX_BIN = int(os.environ.get('ML_MAX_BIN', 256))
+
+# Coalesce concurrent predictions for up to this many ms (0 disables)
+BATCH_WINDOW_MS = float(os.environ.get('ML_BATCH_WINDOW_MS', 0))
+BATCH_MAX_ROWS = int(os.environ.get('ML_BATCH_MAX_ROWS', 1024))
+
+# Milliseconds /predict may spend on the model before remaining dishes
+# drop to the seasonal fallback; requests may override it (0 disables)
+FORECAST_BUDGET_MS = float(os.environ.get('ML_FORECAST_BUDGET_MS', 3000))
+
+# Restaurant timezone for meal slots when /train/slots does not send one
+RESTAURANT_TIMEZONE = os.environ.get('ML_RESTAURANT_TZ', 'UTC')
+
+# Per-restaurant models: memory cap for loaded models, and how many of the
+# busiest tenants the background warmer keeps loaded (0 disables it)
+MODEL_MEMORY_MB = float(os.environ.get('ML_MODEL_MEMORY_MB', 512))
+WARM_TENANTS = int(os.environ.get('ML_WARM_TENANTS', 8))
+WARM_INTERVAL_S = float(os.environ.get('ML_WARM_INTERVAL_S', 60))
+
+# Shared secret for /admin endpoints (sent as X-Admin-Token); unset disables them
+ADMIN_TOKEN = os.environ.get('ML_ADMIN_TOKEN')
+
+# Initialize planner
+planner = ProductionPlanner(MODEL_PATH, METADATA_PATH, ARRAYS_PATH,
+                            use_mmap=USE_MMAP_MODEL, inference_backend=INFERENCE_BACKEND,
+                            batch_window_ms=BATCH_WINDOW_MS, batch_max_rows=BATCH_MAX_ROWS)
+
+
+def load_tenant_planner(model_path, metadata_path, arrays_path):
+    """Planner for one registry model, configured like the default planner"""
+    return ProductionPlanner(model_path, metadata_path, arrays_path,
+                             use_mmap=USE_MMAP_MODEL, inference_backend=INFERENCE_BACKEND,
+                             batch_window_ms=BATCH_WINDOW_MS, batch_max_rows=BATCH_MAX_ROWS)
+
+
+# Restaurant id -> model version; restaurants without one use `planner`
+model_registry = ModelRegistry(MODEL_REGISTRY_DIR, loader=load_tenant_planner,
+                               memory_budget_mb=MODEL_MEMORY_MB)
+
+
+def start_model_warmer():
+    """
+    Keep hot restaurant models loaded in a background thread
+    
+    Started by the server entry points only, so scripts and tools that
+    import this module do not load models in the background.
+    
+    Returns:
+        threading.Event: Set it to stop the warmer, or None if disabled
+    """
+    if WARM_TENANTS <= 0:
+        return None
+    return model_registry.start_warmer(WARM_INTERVAL_S, WARM_TENANTS)
+
+
+def planner_for(restaurant_id):
+    """
+    Planner serving a restaurant
+    
+    Returns:
+        ProductionPlanner: The restaurant's own model, else the default one
+    """
+    try:
+        return model_registry.get(restaurant_id) or planner
+    except Exception as e:
+        print(f"Warning: Could not load model for {restaurant_id} - {e}")
+        return planner
+
+# Precomputed next-day plans, filled by `python plan_store.py` nightly
+plan_store = PlanStore()
+
+# Intraday (meal-slot / hourly) model, trained separately via /train/slots
+slot_forecaster = None
+if os.path.exists(SLOT_MODEL_PATH) and os.path.exists(SLOT_METADATA_PATH):
+    try:
+        slot_forecaster = SlotForecaster.load(SLOT_MODEL_PATH, SLOT_METADATA_PATH)
+    except Exception as e:
+        print(f"Warning: Could not load slot model - {e}")
 
 
 @app.route('/health', methods=['GET'])
@@ -30,10 +134,432 @@ def health_check():
     return jsonify({
         'status': 'healthy',
         'service': 'ML Demand Forecasting',
-        'model_loaded': planner.model is not None
+        'model_loaded': planner.model is not None,
+        'model_registry': model_registry.report()
     })
 
 
+def build_production_plan(data):
+    """
+    Build the production plan for a parsed /predict payload
+    
+    Returns:
+        dict: Production plan
+    
+    Raises:
+        SchemaError: If the payload is malformed
+    """
+    # Validate and convert to a typed frame once
+    df, menu_items, inventory_data = parse_predict_payload(data)
+    budget_ms = parse_budget_ms(data.get('latency_budget_ms')) or FORECAST_BUDGET_MS
+    restaurant_id = parse_restaurant_id(data.get('restaurant_id'))
+    tenant = planner_for(restaurant_id)
+    hierarchy = None
+    start = time.perf_counter()
+    
+    if len(df) == 0:
+        # Generate dummy predictions if no historical data
+        predictions = {item['name']: 0 for item in menu_items}
+        tiers = {item['name']: TIER_NO_HISTORY for item in menu_items}
+        explanations = {}
+    else:
+        prediction_date = datetime.now() + timedelta(days=1)
+        try:
+            predictions, tiers, explanations = tenant.forecast_all_dishes(
+                df, menu_items, prediction_date, budget_ms=budget_ms, explain=bool(data.get('explain'))
+            )
+        except Exception as e:
+            print(f"Prediction error: {e}")
+            predictions, tiers = tenant.fallback_forecasts(df, menu_items, prediction_date)
+            explanations = {}
+        
+        # Make dish, category and restaurant forecasts add up
+        if data.get('reconcile') and menu_items:
+            predictions, hierarchy = reconcile_forecasts(
+                predictions, df, menu_items, prediction_date
+            )
+    forecast_ms = (time.perf_counter() - start) * 1000
+    
+    # Generate production plan
+    production_plan = tenant.generate_production_plan(
+        predictions, inventory_data, menu_items
+    )
+    if hierarchy is not None:
+        production_plan['hierarchy'] = hierarchy
+    
+    # Which forecaster served each dish
+    for dish_plan in production_plan['predictions']:
+        dish_plan['forecast_tier'] = tiers.get(dish_plan['dish_name'])
+        if data.get('explain'):
+            dish_plan['explanation'] = explanations.get(dish_plan['dish_name'])
+    production_plan['forecast'] = {
+        'tiers': dict(Counter(tiers.values())),
+        'budget_ms': budget_ms,
+        'elapsed_ms': round(forecast_ms, 1),
+        'model_version': tenant.metadata.get('timestamp'),
+        'tenant_model': tenant is not planner
+    }
+    
+    # Fit production to ingredient stock, using near-expiry stock first
+    recipes = data.get('recipes') or {
+        item['name']: item['recipe'] for item in menu_items if item.get('recipe')
+    }
+    if recipes:
+        ingredient_plan = optimize_production(predictions, menu_items, inventory_data, recipes)
+        optimized = {d['dish_name']: d['optimized_production'] for d in ingredient_plan['dishes']}
+        for dish_plan in production_plan['predictions']:
+            dish_plan['optimized_production'] = optimized.get(dish_plan['dish_name'])
+        production_plan['ingredient_plan'] = ingredient_plan
+    
+    # Route surplus to NGOs when the caller sent them
+    ngos = data.get('ngos')
+    if ngos and production_plan['donation_suggestions']:
+        production_plan['donation_allocation'] = allocate_donations(
+            production_plan['donation_suggestions'], ngos
+        )
+    
+    return production_plan
+
+
+def handle_predict(data):
+    """
+    Handle a parsed /predict payload
+    
+    Shared by the Flask routes and the async server so both serve
+    identical responses.
+    
+    Returns:
+        tuple: (response dict, HTTP status)
+    """
+    try:
+        production_plan = build_production_plan(data)
+    except SchemaError as e:
+        return e.to_dict(), 400
+    
+    return {
+        'success': True,
+        'production_plan': production_plan
+    }, 200
+
+
+def handle_get_plan(restaurant_id, plan_date=None):
+    """
+    Read a precomputed plan without touching the model
+    
+    Args:
+        plan_date: 'YYYY-MM-DD', 'next' for the date POST materializes
+                   (tomorrow on this server's clock), or None for the latest
+    
+    Returns:
+        tuple: (response dict, HTTP status)
+    """
+    if plan_date == 'next':
+        plan_date = next_plan_date()
+    stored = plan_store.get(restaurant_id, plan_date)
+    if stored is None:
+        return {
+            'success': False,
+            'error': f'No plan materialized for {restaurant_id}'
+        }, 404
+    
+    return {'success': True, **stored}, 200
+
+
+def handle_refresh_plan(restaurant_id, data):
+    """
+    Store a restaurant's latest inputs and recompute its plan only if
+    they changed since the plan was materialized
+    
+    Returns:
+        tuple: (response dict, HTTP status)
+    """
+    if isinstance(data, dict):
+        data = {**data, 'restaurant_id': restaurant_id}
+    try:
+        stored, recomputed = materialize(
+            plan_store, restaurant_id, data, build_production_plan,
+            model_version=planner_for(restaurant_id).metadata.get('timestamp')
+        )
+    except SchemaError as e:
+        return e.to_dict(), 400
+    
+    # Only inputs that produced a plan are kept for the nightly job; an
+    # unchanged hash means these exact inputs are already saved
+    if recomputed:
+        plan_store.save_inputs(restaurant_id, data)
+    return {'success': True, 'recomputed': recomputed, **stored}, 200
+
+
+def handle_train(data):
+    """
+    Train, save and reload the model from a parsed /train payload
+    
+    With a restaurant_id the model is saved as a new version of that
+    restaurant in the registry; the default model is left alone.
+    
+    Returns:
+        tuple: (response dict, HTTP status)
+    """
+    try:
+        df = parse_training_payload(data)
+        restaurant_id = parse_restaurant_id(data.get('restaurant_id'))
+    except SchemaError as e:
+        return e.to_dict(), 400
+    
+    if len(df) < 50:
+        return {
+            'success': False,
+            'error': 'Insufficient training data. Need at least 50 records.'
+        }, 400
+    
+    # Train model
+    forecaster = DemandForecaster(cache_dir=FEATURE_CACHE_DIR, max_bin=TRAIN_MAX_BIN)
+    metrics = forecaster.train(df)
+    
+    if restaurant_id is not None:
+        # New version on disk, then repoint the restaurant; it loads on next use
+        model_dir, paths = model_registry.new_model_dir(restaurant_id)
+        forecaster.save_model(**paths)
+        model_registry.register(restaurant_id, model_dir)
+    else:
+        model_dir = None
+        # Save model
+        forecaster.save_model(MODEL_PATH, METADATA_PATH, ARRAYS_PATH)
+        
+        # Reload in planner
+        planner.load_model(MODEL_PATH, METADATA_PATH)
+    
+    return {
+        'success': True,
+        'metrics': metrics,
+        'dataset_hash': forecaster.dataset_hash,
+        'model_dir': model_dir,
+        'message': 'Model trained successfully'
+    }, 200
+
+
+def handle_predict_dish(dish_name, data):
+    """
+    Predict one dish from a parsed /predict/dish/<dish_name> payload
+    
+    Returns:
+        tuple: (response dict, HTTP status)
+    """
+    try:
+        df, prediction_date = parse_dish_payload(data)
+        restaurant_id = parse_restaurant_id(data.get('restaurant_id'))
+    except SchemaError as e:
+        return e.to_dict(), 400
+    
+    if prediction_date is None:
+        prediction_date = datetime.now() + timedelta(days=1)
+    
+    # Make prediction
+    predicted_demand = planner_for(restaurant_id).predict_demand(df, dish_name, prediction_date)
+    
+    return {
+        'success': True,
+        'dish_name': dish_name,
+        'predicted_demand': predicted_demand,
+        'prediction_date': prediction_date.isoformat()
+    }, 200
+
+
+def handle_train_slots(data):
+    """
+    Train, save and swap in the intraday slot model
+    
+    Returns:
+        tuple: (response dict, HTTP status)
+    """
+    global slot_forecaster
+    try:
+        df, scheme, timezone = parse_slot_training_payload(data, RESTAURANT_TIMEZONE)
+    except SchemaError as e:
+        return e.to_dict(), 400
+    
+    if len(df) < 50:
+        return {
+            'success': False,
+            'error': 'Insufficient training data. Need at least 50 records.'
+        }, 400
+    
+    forecaster = SlotForecaster(scheme, timezone=timezone)
+    try:
+        metrics = forecaster.train(df)
+    except ValueError as e:
+        return {'success': False, 'error': str(e)}, 400
+    forecaster.save(SLOT_MODEL_PATH, SLOT_METADATA_PATH)
+    slot_forecaster = forecaster
+    
+    return {
+        'success': True,
+        'scheme': scheme,
+        'timezone': timezone,
+        'metrics': metrics,
+        'message': 'Slot model trained successfully'
+    }, 200
+
+
+def handle_predict_slots(data):
+    """
+    Forecast every slot of one day for all requested dishes
+    
+    Returns:
+        tuple: (response dict, HTTP status)
+    """
+    forecaster = slot_forecaster
+    if forecaster is None:
+        return {
+            'success': False,
+            'error': 'Slot model not trained. POST /train/slots first.'
+        }, 503
+    
+    try:
+        # Default to the timezone the model was trained in
+        df, dishes, prediction_date = parse_slot_predict_payload(data, forecaster.timezone)
+    except SchemaError as e:
+        return e.to_dict(), 400
+    
+    if prediction_date is None:
+        prediction_date = datetime.now() + timedelta(days=1)
+    if dishes is None:
+        dishes = [str(name) for name in df['dish_name'].unique()]
+    
+    forecasts = forecaster.predict(df, dishes, prediction_date)
+    
+    return {
+        'success': True,
+        'scheme': forecaster.scheme,
+        'timezone': forecaster.timezone,
+        'slots': forecaster.slot_labels,
+        'prediction_date': prediction_date.date().isoformat(),
+        'forecasts': forecasts
+    }, 200
+
+
+def handle_allocate_donations(data):
+    """
+    Allocate surplus lots to NGOs from a parsed /donations/allocate payload
+    
+    Returns:
+        tuple: (response dict, HTTP status)
+    """
+    lots = data.get('lots', [])
+    ngos = data.get('ngos', [])
+    
+    return {
+        'success': True,
+        'allocation': allocate_donations(lots, ngos)
+    }, 200
+
+
+def handle_monitor_actuals(data):
+    """
+    Record (forecast, actual) pairs from a parsed /monitor/actuals payload
+    
+    With a restaurant_id the pairs go to that restaurant's model monitor.
+    
+    Returns:
+        tuple: (response dict, HTTP status)
+    """
+    try:
+        records, restaurant_id = parse_actuals_payload(data)
+    except SchemaError as e:
+        return e.to_dict(), 400
+    
+    monitor = planner_for(restaurant_id).monitor
+    ingested = monitor.observe_actuals(records)
+    
+    return {
+        'success': True,
+        'ingested': ingested,
+        'retrain_needed': monitor.report()['retrain_needed']
+    }, 200
+
+
+def check_admin(headers):
+    """
+    Gate for admin-only features
+    
+    Returns:
+        tuple: (response dict, HTTP status) to reject with, or None if allowed
+    """
+    if not ADMIN_TOKEN:
+        return {'success': False, 'error': 'Admin endpoints are disabled'}, 404
+    if not hmac.compare_digest(headers.get('X-Admin-Token', ''), ADMIN_TOKEN):
+        return {'success': False, 'error': 'Invalid admin token'}, 403
+    return None
+
+
+def handle_profile(data):
+    """
+    Sample every worker thread for the requested window (blocks meanwhile)
+    
+    Returns:
+        tuple: (response dict, HTTP status)
+    """
+    try:
+        seconds, interval_ms = parse_profile_payload(data, PROFILE_MAX_SECONDS)
+    except SchemaError as e:
+        return e.to_dict(), 400
+    
+    profiler = profile_for(seconds, interval_ms)
+    return {'success': True, 'profile': profiler.report()}, 200
+
+
+def handle_profiled(handler, *args):
+    """
+    Run a handler with its own thread sampled; the report is added as 'profile'
+    
+    Returns:
+        tuple: (response dict, HTTP status)
+    """
+    (body, status), profiler = profile_call(handler, *args)
+    return {**body, 'profile': profiler.report()}, status
+
+
+def handle_monitor_report(restaurant_id=None):
+    """
+    Current accuracy and drift report of a restaurant's model (default model if None)
+    
+    Returns:
+        tuple: (response dict, HTTP status)
+    """
+    try:
+        restaurant_id = parse_restaurant_id(restaurant_id)
+    except SchemaError as e:
+        return e.to_dict(), 400
+    
+    return {
+        'success': True,
+        'monitor': planner_for(restaurant_id).monitor.report()
+    }, 200
+
+
+def plan_response(handler, *args):
+    """
+    Run a plan handler and serialize the result the way the caller asked
+    
+    Query: ?fields=summary,predictions.dish_name&layout=columnar&stream=1
+    Compression (zstd/gzip) follows the Accept-Encoding header.
+    
+    Returns:
+        Response: Shaped and encoded body, or 400 for malformed options
+    """
+    try:
+        options = parse_response_options(request.args, request.headers.get('Accept-Encoding'))
+    except SchemaError as e:
+        return jsonify(e.to_dict()), 400
+    
+    body, status = handler(*args)
+    body = shape_body(body, options)
+    if options.stream:
+        return Response(iter_encoded(body, options), status=status, headers=content_headers(options))
+    data, headers = encode_body(body, options)
+    return Response(data, status=status, headers=headers)
+
+
 @app.route('/predict', methods=['POST'])
 def predict():
     """
@@ -41,55 +567,38 @@ def predict():
     
     Request body:
     {
+        "restaurant_id": "r42",    # Optional: use the restaurant's own model
         "historical_data": [...],  # List of sales records
         "menu_items": [...],       # List of menu items
-        "inventory_data": [...]    # List of inventory items
+        "inventory_data": [...],   # List of inventory items
+        "reconcile": false,        # Optional: reconcile dish/category/restaurant
+        "ngos": [...],             # Optional: allocate donation suggestions
+        "recipes": {...},          # Optional: {dish: {ingredient: qty per portion}}
+        "latency_budget_ms": 500,  # Optional: model time before seasonal fallback
+        "explain": false           # Optional: top feature contributions per dish
     }
     
+    Headers "X-Profile: 1" plus "X-Admin-Token" add a sampled "profile"
+    of this request (see /admin/profile).
+    
+    Query (optional, see plan_response):
+        fields=summary,predictions.dish_name   # keep only these plan fields
+        layout=columnar                        # {column: [values]} instead of row objects
+        stream=1                               # chunked response for large plans
+    
     Returns:
     {
         "success": true,
-        "production_plan": {...}
+        "production_plan": {...}   # "forecast" reports the tier per dish; plus "hierarchy" when reconciled
     }
     """
     try:
-        data = request.json
-        
-        # Extract data
-        historical_data = data.get('historical_data', [])
-        menu_items = data.get('menu_items', [])
-        inventory_data = data.get('inventory_data', [])
-        
-        # Convert to DataFrame
-        if len(historical_data) == 0:
-            # Generate dummy predictions if no historical data
-            predictions = {item['name']: 0 for item in menu_items}
-        else:
-            df = pd.DataFrame(historical_data)
-            
-            # Try to make predictions
-            try:
-                predictions = planner.predict_all_dishes(df, menu_items)
-            except Exception as e:
-                print(f"Prediction error: {e}")
-                # Fallback to simple averaging
-                predictions = {}
-                for item in menu_items:
-                    dish_data = df[df['dish_name'] == item['name']]
-                    if len(dish_data) > 0:
-                        predictions[item['name']] = dish_data['quantity_sold'].mean()
-                    else:
-                        predictions[item['name']] = 0
-        
-        # Generate production plan
-        production_plan = planner.generate_production_plan(
-            predictions, inventory_data, menu_items
-        )
-        
-        return jsonify({
-            'success': True,
-            'production_plan': production_plan
-        })
+        if request.headers.get('X-Profile') == '1':
+            rejected = check_admin(request.headers)
+            if rejected:
+                return jsonify(rejected[0]), rejected[1]
+            return plan_response(handle_profiled, handle_predict, request.json)
+        return plan_response(handle_predict, request.json)
     
     except Exception as e:
         return jsonify({
@@ -105,7 +614,8 @@ def train_model():
     
     Request body:
     {
-        "training_data": [...]  # List of historical sales records
+        "training_data": [...],  # List of historical sales records
+        "restaurant_id": "r42"   # Optional: train that restaurant's own model
     }
     
     Returns:
@@ -115,33 +625,8 @@ def train_model():
     }
     """
     try:
-        data = request.json
-        training_data = data.get('training_data', [])
-        
-        if len(training_data) < 50:
-            return jsonify({
-                'success': False,
-                'error': 'Insufficient training data. Need at least 50 records.'
-            }), 400
-        
-        # Convert to DataFrame
-        df = pd.DataFrame(training_data)
-        
-        # Train model
-        forecaster = DemandForecaster()
-        metrics = forecaster.train(df)
-        
-        # Save model
-        forecaster.save_model(MODEL_PATH, METADATA_PATH)
-        
-        # Reload in planner
-        planner.load_model(MODEL_PATH, METADATA_PATH)
-        
-        return jsonify({
-            'success': True,
-            'metrics': metrics,
-            'message': 'Model trained successfully'
-        })
+        body, status = handle_train(request.json)
+        return jsonify(body), status
     
     except Exception as e:
         return jsonify({
@@ -158,7 +643,8 @@ def predict_single_dish(dish_name):
     Request body:
     {
         "historical_data": [...],
-        "prediction_date": "2024-02-22"  # Optional
+        "prediction_date": "2024-02-22",  # Optional
+        "restaurant_id": "r42"            # Optional: use the restaurant's own model
     }
     
     Returns:
@@ -169,28 +655,218 @@ def predict_single_dish(dish_name):
     }
     """
     try:
-        data = request.json
-        historical_data = data.get('historical_data', [])
-        prediction_date_str = data.get('prediction_date')
-        
-        # Parse prediction date
-        if prediction_date_str:
-            prediction_date = datetime.fromisoformat(prediction_date_str)
-        else:
-            prediction_date = datetime.now() + timedelta(days=1)
-        
-        # Convert to DataFrame
-        df = pd.DataFrame(historical_data)
-        
-        # Make prediction
-        predicted_demand = planner.predict_demand(df, dish_name, prediction_date)
-        
+        body, status = handle_predict_dish(dish_name, request.json)
+        return jsonify(body), status
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/train/slots', methods=['POST'])
+def train_slot_model():
+    """
+    Train the intraday model on timestamped order lines
+    
+    Request body:
+    {
+        "training_data": [...],  # Sales records, "date" includes the order time
+        "scheme": "meal",        # Optional: "meal" (breakfast/lunch/dinner) or "hourly"
+        "timezone": "Asia/Kolkata"  # Optional: slots are binned in this local time
+                                    # (IANA name or "+05:30"; default ML_RESTAURANT_TZ)
+    }
+    
+    Returns:
+    {
+        "success": true,
+        "scheme": "meal",
+        "timezone": "Asia/Kolkata",
+        "metrics": {...}
+    }
+    """
+    try:
+        body, status = handle_train_slots(request.json)
+        return jsonify(body), status
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/predict/slots', methods=['POST'])
+def predict_slots():
+    """
+    Predict demand per meal slot (or hour) for one day
+    
+    Request body:
+    {
+        "historical_data": [...],         # Timestamped sales records
+        "dishes": ["Biryani", ...],       # Optional: default every dish in history
+        "prediction_date": "2024-02-22",  # Optional
+        "timezone": "Asia/Kolkata"        # Optional: default the model's training timezone
+    }
+    
+    Returns:
+    {
+        "success": true,
+        "timezone": "Asia/Kolkata",
+        "slots": ["breakfast", "lunch", "dinner"],
+        "forecasts": {"Biryani": {"breakfast": 3.1, "lunch": 20.4, "dinner": 18.0}}
+    }
+    """
+    try:
+        body, status = handle_predict_slots(request.json)
+        return jsonify(body), status
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/donations/allocate', methods=['POST'])
+def allocate_donation_lots():
+    """
+    Assign surplus food lots to NGOs, minimizing distance and spoilage
+    
+    Request body:
+    {
+        "lots": [{"dish": "Biryani", "quantity": 20, "expiry_hours": 6}],
+        "ngos": [{"_id": "...", "ngoName": "Hope Shelter", "capacity": 50,
+                  "distance": "3 km", "pickup_start": 2, "pickup_end": 8}]
+    }
+    
+    Returns:
+    {
+        "success": true,
+        "allocation": {"assignments": [...], "unallocated": [...], "summary": {...}}
+    }
+    """
+    try:
+        body, status = handle_allocate_donations(request.json)
+        return jsonify(body), status
+    
+    except Exception as e:
         return jsonify({
-            'success': True,
-            'dish_name': dish_name,
-            'predicted_demand': predicted_demand,
-            'prediction_date': prediction_date.isoformat()
-        })
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/monitor/actuals', methods=['POST'])
+def monitor_actuals():
+    """
+    Record actual sales against the forecasts that were served
+    
+    Request body:
+    {
+        "records": [
+            {"dish_name": "Biryani", "date": "2024-02-21", "forecast": 42.5, "actual": 39}
+        ],
+        "restaurant_id": "r42"   # Optional: the restaurant whose model served the forecasts
+    }
+    
+    Returns:
+    {
+        "success": true,
+        "ingested": 1,
+        "retrain_needed": false
+    }
+    """
+    try:
+        body, status = handle_monitor_actuals(request.json)
+        return jsonify(body), status
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/monitor', methods=['GET'])
+def monitor_report():
+    """
+    Streaming accuracy (per-dish MAE/bias), feature drift (PSI) and
+    the retrain-needed flag
+    
+    Query: ?restaurant_id=r42 (default: the shared model)
+    """
+    body, status = handle_monitor_report(request.args.get('restaurant_id'))
+    return jsonify(body), status
+
+
+@app.route('/plan/<restaurant_id>', methods=['GET'])
+def get_plan(restaurant_id):
+    """
+    Read the precomputed production plan for a restaurant
+    
+    Query: ?date=2024-02-22 or ?date=next (the date POST materializes;
+    default: latest materialized plan), plus the /predict response
+    options (fields, layout, stream)
+    
+    Returns:
+    {
+        "success": true,
+        "plan_date": "2024-02-22",
+        "production_plan": {...},
+        "created_at": "..."
+    }
+    """
+    return plan_response(handle_get_plan, restaurant_id, request.args.get('date'))
+
+
+@app.route('/admin/profile', methods=['POST'])
+def profile_worker():
+    """
+    Sample this worker's threads for a few seconds (admin only)
+    
+    Headers: X-Admin-Token: <ML_ADMIN_TOKEN>
+    Query: ?format=collapsed returns the stacks as text/plain
+    
+    Request body (optional):
+    {
+        "seconds": 10,      # at most 60
+        "interval_ms": 5
+    }
+    
+    Returns:
+    {
+        "success": true,
+        "profile": {"samples": ..., "stages": {...}, "collapsed": "..."}
+    }
+    """
+    rejected = check_admin(request.headers)
+    if rejected:
+        return jsonify(rejected[0]), rejected[1]
+    body, status = handle_profile(request.get_json(silent=True))
+    if status == 200 and request.args.get('format') == 'collapsed':
+        return Response(body['profile']['collapsed'] + '\n', mimetype='text/plain')
+    return jsonify(body), status
+
+
+@app.route('/plan/<restaurant_id>', methods=['POST'])
+def refresh_plan(restaurant_id):
+    """
+    Return the restaurant's plan, recomputing only when inputs changed
+    
+    Request body and query: same as /predict
+    
+    Returns:
+    {
+        "success": true,
+        "recomputed": false,
+        "plan_date": "2024-02-22",
+        "production_plan": {...}
+    }
+    """
+    try:
+        return plan_response(handle_refresh_plan, restaurant_id, request.json)
     
     except Exception as e:
         return jsonify({
@@ -200,5 +876,6 @@ def predict_single_dish(dish_name):
 
 
 if __name__ == '__main__':
+    start_model_warmer()
     port = int(os.environ.get('PORT', 5002))
     app.run(host='0.0.0.0', port=port, debug=True)
@@ -0,0 +1,301 @@
+"""
+Async API Server for ML Demand Forecasting Service
+Serves the same endpoints as app.py from an asyncio event loop
+
+Request parsing runs on the event loop, while every handler (prediction,
+training, plan reads, monitoring) and the encoding of plan responses is
+offloaded to a bounded thread pool. When every worker and queue slot is taken, new requests are
+rejected with 429 instead of piling up behind one slow large payload.
+"""
+
+import asyncio
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from aiohttp import web
+
+from app import (
+    check_admin, handle_allocate_donations, handle_get_plan, handle_monitor_actuals, handle_monitor_report,
+    handle_predict, handle_predict_dish, handle_predict_slots, handle_profiled, handle_refresh_plan, handle_train,
+    handle_train_slots, model_registry, planner, start_model_warmer
+)
+from profiler import MAX_SECONDS as PROFILE_MAX_SECONDS, SamplingProfiler
+from response_format import content_headers, encode_body, iter_encoded, parse_response_options, shape_body
+from schemas import SchemaError, parse_profile_payload
+
+
+# Threads running predictions / training
+EXECUTOR_WORKERS = int(os.environ.get('ML_EXECUTOR_WORKERS', 4))
+
+# Requests allowed to wait for a free worker before returning 429
+EXECUTOR_QUEUE = int(os.environ.get('ML_EXECUTOR_QUEUE', 8))
+
+# Seconds before a request gives up with 504 (Node backend waits 10s)
+REQUEST_TIMEOUT = float(os.environ.get('ML_REQUEST_TIMEOUT', 9))
+
+# Training is slow and rare, so it gets a longer budget
+TRAIN_TIMEOUT = float(os.environ.get('ML_TRAIN_TIMEOUT', 300))
+
+
+class BoundedExecutor:
+    """
+    Thread pool with a hard cap on in-flight jobs
+
+    A slot stays taken until the job really finishes, even if the request
+    that submitted it has already timed out, so abandoned work still
+    counts against capacity.
+    """
+
+    def __init__(self, max_workers, max_queue):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='ml-worker')
+        self.capacity = max_workers + max_queue
+        self.in_flight = 0
+
+    @property
+    def saturated(self):
+        return self.in_flight >= self.capacity
+
+    def submit(self, fn, *args):
+        """Run fn(*args) in the pool and return an awaitable future"""
+        loop = asyncio.get_running_loop()
+        self.in_flight += 1
+        future = loop.run_in_executor(self.executor, fn, *args)
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, _):
+        self.in_flight -= 1
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def error_response(message, status):
+    return web.json_response({'success': False, 'error': message}, status=status)
+
+
+def _shaped(options, fn, *args):
+    """Handler plus response shaping and (unless streaming) encoding, on the worker thread"""
+    body, status = fn(*args)
+    body = shape_body(body, options)
+    return (body if options.stream else encode_body(body, options)), status
+
+
+def response_options(request):
+    """Plan response options from the query and Accept-Encoding (400 if malformed)"""
+    try:
+        return parse_response_options(request.query, request.headers.get('Accept-Encoding'))
+    except SchemaError as e:
+        raise web.HTTPBadRequest(text=json.dumps(e.to_dict()), content_type='application/json')
+
+
+async def plan_response(request, result, status, options):
+    """Send a _shaped result, streaming chunk by chunk when asked"""
+    if not options.stream:
+        data, headers = result
+        return web.Response(body=data, status=status, headers=headers)
+
+    response = web.StreamResponse(status=status, headers=content_headers(options))
+    await response.prepare(request)
+    # Each chunk is encoded (and compressed) on a worker thread, not the loop
+    chunks = iter_encoded(result, options)
+    while (chunk := await request.app['executor'].submit(next, chunks, None)) is not None:
+        await response.write(chunk)
+    await response.write_eof()
+    return response
+
+
+async def run_offloaded(request, fn, *args, timeout=REQUEST_TIMEOUT, options=None):
+    """
+    Run a handler in the bounded executor with backpressure and a timeout
+
+    With options (plan endpoints) the body is shaped and encoded in the
+    executor too, so large responses do not serialize on the event loop.
+
+    Returns:
+        web.Response: Handler result, 429 when saturated or 504 on timeout
+    """
+    executor = request.app['executor']
+    if executor.saturated:
+        response = error_response('Server busy, retry shortly', 429)
+        response.headers['Retry-After'] = '1'
+        return response
+
+    try:
+        if options is not None:
+            future = executor.submit(_shaped, options, fn, *args)
+        else:
+            future = executor.submit(fn, *args)
+        body, status = await asyncio.wait_for(asyncio.shield(future), timeout)
+    except asyncio.TimeoutError:
+        return error_response(f'Request timed out after {timeout:g}s', 504)
+    except Exception as e:
+        return error_response(str(e), 500)
+
+    if options is not None:
+        return await plan_response(request, body, status, options)
+    return web.json_response(body, status=status)
+
+
+async def read_json(request):
+    """Parse the request body on the event loop"""
+    try:
+        return await request.json()
+    except ValueError:
+        raise web.HTTPBadRequest(
+            text='{"success": false, "error": "Invalid JSON body"}',
+            content_type='application/json'
+        )
+
+
+async def health_check(request):
+    """Health check endpoint"""
+    executor = request.app['executor']
+    return web.json_response({
+        'status': 'healthy',
+        'service': 'ML Demand Forecasting',
+        'model_loaded': planner.model is not None,
+        'model_registry': model_registry.report(),
+        'in_flight': executor.in_flight,
+        'capacity': executor.capacity
+    })
+
+
+async def predict(request):
+    """Predict demand and generate production plan (see app.predict)"""
+    options = response_options(request)
+    data = await read_json(request)
+    if request.headers.get('X-Profile') == '1':
+        rejected = check_admin(request.headers)
+        if rejected:
+            return web.json_response(rejected[0], status=rejected[1])
+        return await run_offloaded(request, handle_profiled, handle_predict, data, options=options)
+    return await run_offloaded(request, handle_predict, data, options=options)
+
+
+async def train_model(request):
+    """Train the model with provided data (see app.train_model)"""
+    data = await read_json(request)
+    return await run_offloaded(request, handle_train, data, timeout=TRAIN_TIMEOUT)
+
+
+async def predict_single_dish(request):
+    """Predict demand for a single dish (see app.predict_single_dish)"""
+    data = await read_json(request)
+    dish_name = request.match_info['dish_name']
+    return await run_offloaded(request, handle_predict_dish, dish_name, data)
+
+
+async def train_slot_model(request):
+    """Train the intraday slot model (see app.train_slot_model)"""
+    data = await read_json(request)
+    return await run_offloaded(request, handle_train_slots, data, timeout=TRAIN_TIMEOUT)
+
+
+async def predict_slots(request):
+    """Per-slot demand for one day (see app.predict_slots)"""
+    data = await read_json(request)
+    return await run_offloaded(request, handle_predict_slots, data)
+
+
+async def allocate_donation_lots(request):
+    """Assign surplus lots to NGOs (see app.allocate_donation_lots)"""
+    data = await read_json(request)
+    return await run_offloaded(request, handle_allocate_donations, data)
+
+
+async def monitor_actuals(request):
+    """Record actual sales against served forecasts (see app.monitor_actuals)"""
+    data = await read_json(request)
+    return await run_offloaded(request, handle_monitor_actuals, data)
+
+
+async def monitor_report(request):
+    """Accuracy, drift and retrain flag (see app.monitor_report)"""
+    # Offloaded: a restaurant's model may have to be loaded from disk first
+    return await run_offloaded(request, handle_monitor_report, request.query.get('restaurant_id'))
+
+
+async def get_plan(request):
+    """Read a precomputed plan (see app.get_plan)"""
+    options = response_options(request)
+    # The SQLite read, projection and encoding all run on a worker thread
+    return await run_offloaded(request, handle_get_plan, request.match_info['restaurant_id'],
+                               request.query.get('date'), options=options)
+
+
+async def refresh_plan(request):
+    """Recompute a plan only if its inputs changed (see app.refresh_plan)"""
+    options = response_options(request)
+    data = await read_json(request)
+    return await run_offloaded(request, handle_refresh_plan, request.match_info['restaurant_id'], data,
+                               options=options)
+
+
+async def profile_worker(request):
+    """
+    Sample the worker's threads (see app.profile_worker)
+
+    The event loop keeps serving while the sampler runs, so the profile
+    shows the other requests in flight.
+    """
+    rejected = check_admin(request.headers)
+    if rejected:
+        return web.json_response(rejected[0], status=rejected[1])
+    data = await read_json(request) if request.can_read_body else None
+    try:
+        seconds, interval_ms = parse_profile_payload(data, PROFILE_MAX_SECONDS)
+    except SchemaError as e:
+        return web.json_response(e.to_dict(), status=400)
+
+    profiler = SamplingProfiler(interval_ms).start()
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        profiler.stop()
+    if request.query.get('format') == 'collapsed':
+        return web.Response(text=profiler.collapsed() + '\n', content_type='text/plain')
+    return web.json_response({'success': True, 'profile': profiler.report()})
+
+
+async def _start_warmer(application):
+    application['warmer'] = start_model_warmer()
+
+
+async def _stop_warmer(application):
+    if application.get('warmer') is not None:
+        application['warmer'].set()
+
+
+async def _shutdown_executor(application):
+    application['executor'].shutdown()
+
+
+def create_app(max_workers=EXECUTOR_WORKERS, max_queue=EXECUTOR_QUEUE):
+    """Build the aiohttp application"""
+    application = web.Application(client_max_size=64 * 1024 * 1024)
+    application['executor'] = BoundedExecutor(max_workers, max_queue)
+    application.on_startup.append(_start_warmer)
+    application.on_cleanup.append(_stop_warmer)
+    application.on_cleanup.append(_shutdown_executor)
+
+    application.router.add_get('/health', health_check)
+    application.router.add_post('/predict', predict)
+    application.router.add_post('/train', train_model)
+    application.router.add_post('/predict/dish/{dish_name}', predict_single_dish)
+    application.router.add_post('/train/slots', train_slot_model)
+    application.router.add_post('/predict/slots', predict_slots)
+    application.router.add_post('/donations/allocate', allocate_donation_lots)
+    application.router.add_post('/monitor/actuals', monitor_actuals)
+    application.router.add_get('/monitor', monitor_report)
+    application.router.add_get('/plan/{restaurant_id}', get_plan)
+    application.router.add_post('/plan/{restaurant_id}', refresh_plan)
+    application.router.add_post('/admin/profile', profile_worker)
+
+    return application
+
+
+if __name__ == '__main__':
+    port = int(os.environ.get('PORT', 5002))
+    web.run_app(create_app(), host='0.0.0.0', port=port)
@@ -0,0 +1,107 @@
+"""
+Micro-Batching Module
+Coalesces feature rows from concurrent requests into one model call
+"""
+
+import threading
+from concurrent.futures import Future
+
+import numpy as np
+
+
+class _PendingRows:
+    """Feature rows from one caller waiting to be scored"""
+
+    def __init__(self, X, model):
+        self.X = X
+        self.model = model
+        self.future = Future()
+
+
+class PredictionBatcher:
+    """
+    Collects feature rows from concurrent callers and scores them together
+
+    The first caller to arrive becomes the batch leader: it waits for the
+    window to pass (or for max_rows rows to pile up), then scores every
+    waiting row in one call on its own thread and hands each caller back
+    exactly the predictions for its rows. There is no background thread,
+    so a lone request never pays a thread handoff on top of the window.
+
+    Each caller passes the model it built its rows for. Rows are grouped by
+    model within a batch, so a reload during the window never scores rows
+    with a model whose feature order they were not built for.
+    """
+
+    def __init__(self, score_fn, window_ms=3, max_rows=1024):
+        """
+        Args:
+            score_fn: callable(model, float32 array (rows, features)) -> predictions
+            window_ms: float, how long a batch stays open for more rows
+            max_rows: int, score immediately once this many rows are waiting
+        """
+        self.score_fn = score_fn
+        self.window = window_ms / 1000
+        self.max_rows = max_rows
+        self.batches_scored = 0
+        self.rows_scored = 0
+
+        self._lock = threading.Lock()
+        self._waiting = []
+        self._waiting_rows = 0
+        self._full = threading.Event()
+
+    def predict(self, X, model):
+        """
+        Score rows as part of the next batch, blocking until done
+
+        Args:
+            X: 2D float32 array ordered like the model's feature columns
+            model: model (e.g. ModelBundle) to score X with
+
+        Returns:
+            np.ndarray: Predictions for X
+        """
+        pending = _PendingRows(np.asarray(X, dtype=np.float32), model)
+
+        with self._lock:
+            is_leader = not self._waiting
+            self._waiting.append(pending)
+            self._waiting_rows += len(pending.X)
+            if self._waiting_rows >= self.max_rows:
+                self._full.set()
+
+        if is_leader:
+            self._full.wait(self.window)
+            with self._lock:
+                batch = self._waiting
+                self._waiting = []
+                self._waiting_rows = 0
+                self._full.clear()
+            # Normally one group; two only if the model was swapped mid-window
+            groups = {}
+            for waiting in batch:
+                groups.setdefault(id(waiting.model), []).append(waiting)
+            for group in groups.values():
+                self._score(group)
+
+        return pending.future.result()
+
+    def _score(self, batch):
+        """Score one coalesced batch (all for one model) and hand each caller its slice"""
+        try:
+            predictions = np.asarray(self.score_fn(batch[0].model, np.concatenate([p.X for p in batch])))
+        except Exception as e:
+            for pending in batch:
+                pending.future.set_exception(e)
+            return
+
+        with self._lock:
+            self.batches_scored += 1
+            self.rows_scored += len(predictions)
+
+        start = 0
+        for pending in batch:
+            stop = start + len(pending.X)
+            pending.future.set_result(predictions[start:stop])
+            start = stop
@@ -0,0 +1,674 @@
+"""
+Benchmark Script
+Performance benchmarks for the ML service, run on generated sample data
+
+Usage:
+    python benchmark.py memory --workers 4
+    python benchmark.py inference --batch-sizes 1 10 100 1000 10000
+    python benchmark.py load --server async --requests 200 --concurrency 16
+    python benchmark.py batching --threads 32 --window-ms 3
+    python benchmark.py donations --lots 5000 --ngos 300
+    python benchmark.py parse --records 100000
+    python benchmark.py slots --dishes 100 --days 180
+    python benchmark.py threads --threads 1 2 4 8
+    python benchmark.py training --days 730 --restaurants 40
+    python benchmark.py profile --interval-ms 1 5 10
+    python benchmark.py formats --dishes 50 500 5000
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing as mp
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from generate_sample_data import generate_sample_data
+
+
+def train_sample_model(workdir, num_days=90, num_dishes=10):
+    """
+    Train a model on generated data and save all artifacts into workdir
+
+    Returns:
+        tuple: (model_path, metadata_path, arrays_path, sample DataFrame)
+    """
+    from train_model import DemandForecaster
+
+    df = generate_sample_data(num_days=num_days, num_dishes=num_dishes)
+    model_path = os.path.join(workdir, 'model.pkl')
+    metadata_path = os.path.join(workdir, 'model_metadata.json')
+    arrays_path = os.path.join(workdir, 'model_arrays.joblib')
+
+    forecaster = DemandForecaster()
+    forecaster.train(df)
+    forecaster.save_model(model_path, metadata_path, arrays_path)
+
+    return model_path, metadata_path, arrays_path, df
+
+
+def _memory_usage_kb():
+    """Resident and proportional set size of this process (Linux only)"""
+    usage = {}
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            key, _, rest = line.partition(':')
+            if key in ('Rss', 'Pss', 'Shared_Clean', 'Private_Dirty'):
+                usage[key] = int(rest.split()[0])
+    return usage
+
+
+def _memory_worker(mode, paths, history, ready, results):
+    """Load the model the way a service worker would and report memory"""
+    from predict import ProductionPlanner
+    planner = ProductionPlanner(*paths, use_mmap=(mode == 'mmap'))
+
+    # Touch every page the prediction path needs
+    for dish_name in history['dish_name'].unique():
+        planner.predict_demand(history, dish_name)
+
+    ready.wait()
+    results.put((mode, os.getpid(), _memory_usage_kb()))
+
+
+def bench_memory(args):
+    """Per-worker memory when each worker unpickles vs maps the model"""
+    with tempfile.TemporaryDirectory() as workdir:
+        *paths, df = train_sample_model(workdir)
+        history = df.assign(date=pd.to_datetime(df['date']))
+        ctx = mp.get_context('spawn')
+
+        print(f"\n{'mode':<8}{'workers':>8}{'avg RSS MB':>12}{'avg PSS MB':>12}{'private MB':>12}")
+        for mode in ('joblib', 'mmap'):
+            ready = ctx.Barrier(args.workers)
+            results = ctx.Queue()
+            workers = [
+                ctx.Process(target=_memory_worker, args=(mode, paths, history, ready, results))
+                for _ in range(args.workers)
+            ]
+            for w in workers:
+                w.start()
+            usage = [results.get()[2] for _ in workers]
+            for w in workers:
+                w.join()
+
+            def avg_mb(key):
+                return np.mean([u.get(key, 0) for u in usage]) / 1024
+
+            print(f"{mode:<8}{args.workers:>8}{avg_mb('Rss'):>12.1f}"
+                  f"{avg_mb('Pss'):>12.1f}{avg_mb('Private_Dirty'):>12.1f}")
+
+
+def _time_call(fn, repeat):
+    """Median wall time of fn() in milliseconds"""
+    fn()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return np.median(times) * 1000
+
+
+def bench_inference(args):
+    """Booster inplace_predict vs the compiled NumPy backend"""
+    from data_preprocessing import DataPreprocessor
+    from feature_engineering import FeatureEngineer
+    from inference import load_bundle, score
+    from model_store import TreeEnsemble, flatten_booster
+
+    with tempfile.TemporaryDirectory() as workdir:
+        model_path, metadata_path, _, df = train_sample_model(workdir)
+        bundle = load_bundle(model_path, metadata_path)
+
+    preprocessor = DataPreprocessor()
+    engineer = FeatureEngineer()
+    features = engineer.engineer_features(
+        preprocessor.prepare_training_data(preprocessor.load_data(df))
+    )
+    X_all, _, feature_columns = engineer.select_features(features)
+    ensemble = TreeEnsemble(flatten_booster(bundle.model, feature_columns))
+
+    print(f"\n{ensemble.num_trees} trees, max depth {ensemble.max_depth}")
+    print(f"{'batch':>8}{'xgboost ms':>12}{'compiled ms':>13}{'speedup':>9}{'max abs diff':>14}")
+    for batch_size in args.batch_sizes:
+        rows = np.resize(np.arange(len(X_all)), batch_size)
+        X_frame = X_all.iloc[rows]
+        X_array = X_frame.to_numpy(dtype=np.float32)
+        repeat = max(5, min(200, 20000 // batch_size))
+
+        xgb_ms = _time_call(lambda: score(bundle, X_array), repeat)
+        compiled_ms = _time_call(lambda: ensemble.predict_array(X_array), repeat)
+        diff = np.abs(score(bundle, X_array) - ensemble.predict_array(X_array)).max()
+
+        print(f"{batch_size:>8}{xgb_ms:>12.3f}{compiled_ms:>13.3f}"
+              f"{xgb_ms / compiled_ms:>8.1f}x{diff:>14.2e}")
+
+
+def _predict_payload(num_days, num_dishes):
+    """A /predict body like the one the Node backend sends"""
+    df = generate_sample_data(num_days=num_days, num_dishes=min(num_dishes, 10))
+    if num_dishes > 10:
+        # Clone the sample dishes under new names to widen the menu
+        copies = [df.assign(dish_name=df['dish_name'] + f' #{i}') for i in range(num_dishes // 10)]
+        df = pd.concat(copies, ignore_index=True)
+    dish_prices = df.groupby('dish_name')['selling_price'].first()
+    return {
+        'historical_data': df.to_dict('records'),
+        'menu_items': [{'name': name, 'price': price, 'stock': 20} for name, price in dish_prices.items()],
+        'inventory_data': []
+    }
+
+
+def _start_server(kind, port, workdir):
+    """Launch the Flask or async server in a subprocess and wait until it answers"""
+    import urllib.request
+
+    service_dir = os.path.dirname(os.path.abspath(__file__))
+    if kind == 'async':
+        command = [sys.executable, os.path.join(service_dir, 'async_app.py')]
+    else:
+        command = [sys.executable, '-c', f"from app import app; app.run(port={port}, threaded=True)"]
+
+    env = dict(os.environ, PORT=str(port), PYTHONPATH=service_dir)
+    server = subprocess.Popen(command, cwd=workdir, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    for _ in range(100):
+        try:
+            urllib.request.urlopen(f'http://127.0.0.1:{port}/health', timeout=1)
+            return server
+        except OSError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError(f'{kind} server did not start')
+
+
+async def _run_load(url, payloads, concurrency):
+    """Fire (label, payload) requests with bounded concurrency"""
+    import aiohttp
+
+    semaphore = asyncio.Semaphore(concurrency)
+    results = []
+
+    async def send(session, label, payload):
+        async with semaphore:
+            start = time.perf_counter()
+            async with session.post(url, json=payload) as response:
+                await response.read()
+                results.append((label, response.status, time.perf_counter() - start))
+
+    timeout = aiohttp.ClientTimeout(total=120)
+    async with aiohttp.ClientSession(timeout=timeout) as session:
+        await asyncio.gather(*(send(session, label, payload) for label, payload in payloads))
+    return results
+
+
+def bench_load(args):
+    """Latency of /predict under a mix of small and large payloads"""
+    rng = np.random.default_rng(0)
+    small = _predict_payload(num_days=30, num_dishes=10)
+    large = _predict_payload(num_days=365, num_dishes=args.large_dishes)
+    labels = rng.random(args.requests) < args.large_fraction
+    payloads = [('large', large) if is_large else ('small', small) for is_large in labels]
+
+    with tempfile.TemporaryDirectory() as workdir:
+        train_sample_model(workdir)
+        server = _start_server(args.server, args.port, workdir)
+        try:
+            start = time.perf_counter()
+            results = asyncio.run(_run_load(f'http://127.0.0.1:{args.port}/predict',
+                                            payloads, args.concurrency))
+            elapsed = time.perf_counter() - start
+        finally:
+            server.terminate()
+            server.wait()
+
+    print(f"\n{args.server} server, {args.requests} requests, concurrency {args.concurrency}, "
+          f"{elapsed:.1f}s ({args.requests / elapsed:.1f} req/s)")
+    print(f"{'payload':<8}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}  statuses")
+    for label in ('small', 'large'):
+        rows = [r for r in results if r[0] == label]
+        if not rows:
+            continue
+        latency = np.array([r[2] for r in rows]) * 1000
+        statuses = pd.Series([r[1] for r in rows]).value_counts().to_dict()
+        print(f"{label:<8}{len(rows):>7}{np.percentile(latency, 50):>10.0f}"
+              f"{np.percentile(latency, 95):>10.0f}{latency.max():>10.0f}  {statuses}")
+
+
+def bench_batching(args):
+    """Throughput of concurrent single-dish predictions with and without coalescing"""
+    from concurrent.futures import ThreadPoolExecutor
+    from predict import ProductionPlanner
+
+    with tempfile.TemporaryDirectory() as workdir:
+        *paths, df = train_sample_model(workdir)
+        history = df.assign(date=pd.to_datetime(df['date']))
+        dish_names = list(history['dish_name'].unique())
+
+        print(f"\n{args.requests} /predict/dish-style calls from {args.threads} threads")
+        print(f"{'window ms':>10}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'model calls':>13}")
+        for window_ms in (0, args.window_ms):
+            planner = ProductionPlanner(*paths, batch_window_ms=window_ms,
+                                        batch_max_rows=args.max_rows)
+
+            def call(i):
+                start = time.perf_counter()
+                planner.predict_demand(history, dish_names[i % len(dish_names)])
+                return time.perf_counter() - start
+
+            with ThreadPoolExecutor(max_workers=args.threads) as pool:
+                start = time.perf_counter()
+                latency = np.array(list(pool.map(call, range(args.requests)))) * 1000
+                elapsed = time.perf_counter() - start
+
+            calls = planner.batcher.batches_scored if planner.batcher else args.requests
+            print(f"{window_ms:>10g}{args.requests / elapsed:>10.0f}{np.percentile(latency, 50):>10.1f}"
+                  f"{np.percentile(latency, 95):>10.1f}{calls:>13}")
+
+
+def bench_threads(args):
+    """Throughput of the shared planner from many threads, with live model reloads"""
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+    from inference import feature_matrix, score
+    from predict import ProductionPlanner
+
+    with tempfile.TemporaryDirectory() as workdir:
+        *paths, df = train_sample_model(workdir)
+        history = df.assign(date=pd.to_datetime(df['date']))
+        menu_items = [{'name': name} for name in history['dish_name'].unique()]
+        planner = ProductionPlanner(*paths[:2], arrays_path=paths[2])
+        bundle = planner.bundle
+        rows = pd.concat([planner._build_features(history, item['name'], pd.Timestamp('2030-01-01'))
+                          for item in menu_items], ignore_index=True)
+        X = feature_matrix(bundle, rows.sample(args.rows, replace=True, random_state=0))
+        expected = planner.predict_all_dishes(history, menu_items, pd.Timestamp('2030-01-01'))
+
+        workloads = [
+            (f'score {args.rows} rows', lambda: score(bundle, X)),
+            ('predict_all_dishes', lambda: planner.predict_all_dishes(history, menu_items,
+                                                                      pd.Timestamp('2030-01-01')))
+        ]
+        print(f"\n{os.cpu_count()} CPUs, {args.calls} calls per run, model reloaded every "
+              f"{args.reload_ms:g} ms during predict_all_dishes runs")
+        print(f"{'workload':>22}{'threads':>9}{'calls/s':>10}{'speedup':>9}{'errors':>8}")
+
+        for label, workload in workloads:
+            reloading = label == 'predict_all_dishes'
+            baseline = None
+            for threads in args.threads:
+                errors = []
+                stop = threading.Event()
+
+                def reload_loop():
+                    while not stop.wait(args.reload_ms / 1000):
+                        planner.load_model(*paths[:2])
+
+                def call(_):
+                    try:
+                        result = workload()
+                        if reloading and result != expected:
+                            errors.append('mismatch')
+                    except Exception as e:
+                        errors.append(e)
+
+                reloader = threading.Thread(target=reload_loop, daemon=True)
+                if reloading:
+                    reloader.start()
+                with ThreadPoolExecutor(max_workers=threads) as pool:
+                    start = time.perf_counter()
+                    list(pool.map(call, range(args.calls)))
+                    rate = args.calls / (time.perf_counter() - start)
+                stop.set()
+                baseline = baseline or rate
+                print(f"{label:>22}{threads:>9}{rate:>10.1f}{rate / baseline:>9.2f}{len(errors):>8}")
+
+
+def _peak_rss_kb():
+    """Peak resident set size since the last _reset_peak_rss (Linux only)"""
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmHWM:'):
+                return int(line.split()[1])
+    return 0
+
+
+def _reset_peak_rss():
+    """Restart peak RSS tracking from the current RSS"""
+    with open('/proc/self/clear_refs', 'w') as f:
+        f.write('5')
+
+
+def _training_worker(mode, frame_path, max_bin, results):
+    """Train once on pickled features and report time and peak memory"""
+    import xgboost as xgb
+    from monitoring import build_feature_reference
+    from train_model import DemandForecaster, EARLY_STOPPING_ROUNDS, NUM_BOOST_ROUND, XGB_PARAMS
+
+    X, y = pd.read_pickle(frame_path)
+    _reset_peak_rss()
+    baseline = _peak_rss_kb()
+    start = time.perf_counter()
+
+    if mode == 'dataframe':
+        # The previous path: XGBRegressor.fit on the pandas frames, same
+        # feature reference and metric predictions as fit_features
+        num_train = len(X) - int(np.ceil(len(X) * 0.2))
+        build_feature_reference(X)
+        model = xgb.XGBRegressor(n_estimators=NUM_BOOST_ROUND, early_stopping_rounds=EARLY_STOPPING_ROUNDS,
+                                 random_state=42, n_jobs=-1, **XGB_PARAMS)
+        model.fit(X.iloc[:num_train], y.iloc[:num_train],
+                  eval_set=[(X.iloc[num_train:], y.iloc[num_train:])], verbose=False)
+        model.predict(X.iloc[:num_train])
+        y_test_pred = model.predict(X.iloc[num_train:])
+        rmse = float(np.sqrt(np.mean((y_test_pred - y.iloc[num_train:].to_numpy()) ** 2)))
+    else:
+        rmse = DemandForecaster(max_bin=max_bin).fit_features(X, y)['test_rmse']
+
+    results.put((mode, max_bin, time.perf_counter() - start, (_peak_rss_kb() - baseline) / 1024, rmse))
+
+
+def bench_training(args):
+    """Training time and peak memory: pandas XGBRegressor.fit vs QuantileDMatrix"""
+    from data_preprocessing import DataPreprocessor
+    from feature_engineering import FeatureEngineer
+
+    # Independent copies of the 10-dish menu, one per restaurant
+    df = pd.concat([generate_sample_data(num_days=args.days).assign(
+        dish_name=lambda frame, i=i: frame['dish_name'] + f' #{i}') for i in range(args.restaurants)],
+        ignore_index=True)
+    preprocessor = DataPreprocessor()
+    engineer = FeatureEngineer()
+    features = engineer.engineer_features(preprocessor.prepare_training_data(preprocessor.load_data(df)))
+    X, y, _ = engineer.select_features(features.sort_values('date', kind='stable', ignore_index=True))
+    ctx = mp.get_context('spawn')
+
+    with tempfile.TemporaryDirectory() as workdir:
+        frame_path = os.path.join(workdir, 'features.pkl')
+        pd.to_pickle((X, y), frame_path)
+
+        print(f"\n{len(X)} rows x {X.shape[1]} features ({X.memory_usage().sum() / 1e6:.1f} MB as DataFrame)")
+        print(f"{'path':<16}{'max_bin':>8}{'train s':>9}{'peak MB':>9}{'test RMSE':>11}")
+        runs = [('dataframe', 256)] + [('quantile', max_bin) for max_bin in args.max_bin]
+        for mode, max_bin in runs:
+            results = ctx.Queue()
+            worker = ctx.Process(target=_training_worker, args=(mode, frame_path, max_bin, results))
+            worker.start()
+            worker.join()
+            if results.empty():
+                print(f"{mode:<16}{max_bin:>8}  failed (exit code {worker.exitcode})")
+                continue
+            _, _, seconds, peak_mb, rmse = results.get()
+            print(f"{mode:<16}{max_bin:>8}{seconds:>9.2f}{peak_mb:>9.1f}{rmse:>11.3f}")
+
+
+def bench_donations(args):
+    """Solve time of the donation allocation LP on a synthetic city"""
+    from donation_allocator import allocate_donations
+
+    rng = np.random.default_rng(0)
+    # Points within ~20 km of a city centre
+    center_lat, center_lng = 19.07, 72.88
+
+    def point():
+        return center_lat + rng.normal(0, 0.08), center_lng + rng.normal(0, 0.08)
+
+    lots = []
+    for i in range(args.lots):
+        lat, lng = point()
+        ready = float(rng.uniform(0, 6))
+        lots.append({'dish': f'Lot {i}', 'quantity': int(rng.integers(5, 40)), 'lat': lat, 'lng': lng,
+                     'ready_hours': ready, 'expiry_hours': ready + float(rng.uniform(3, 12))})
+    ngos = []
+    for j in range(args.ngos):
+        lat, lng = point()
+        start = float(rng.uniform(0, 12))
+        ngos.append({'_id': f'ngo{j}', 'ngoName': f'NGO {j}', 'capacity': int(rng.integers(50, 600)),
+                     'lat': lat, 'lng': lng, 'pickup_start': start, 'pickup_end': start + 4})
+
+    print(f"\n{args.lots} lots, {args.ngos} NGOs")
+    for k in args.k:
+        allocate_donations(lots[:50], ngos[:20], k_nearest=k)
+        summary = allocate_donations(lots, ngos, k_nearest=k)['summary']
+        print(f"k={k:<4} solve {summary['solve_ms']:>8.1f} ms  allocated {summary['allocated']:.0f}"
+              f"/{summary['total_surplus']:.0f}  avg distance {summary['avg_distance_km']} km"
+              f"  ({summary['solver']})")
+
+    # Capacity short of surplus: the unallocated lots must serialize like the response does
+    scarce = allocate_donations([{'dish': 'A', 'quantity': 20}, {'dish': 'B', 'quantity': 30}],
+                                [{'_id': 'ngo0', 'capacity': 25}])
+    print(f"scarce capacity: unallocated {json.dumps(scarce['unallocated'])}")
+
+
+def bench_parse(args):
+    """Payload records -> DataFrame: untyped pd.DataFrame vs the schema layer"""
+    from schemas import sales_frame
+
+    df = generate_sample_data(num_days=365, num_dishes=10)
+    records = df.assign(date=df['date'].astype(str)).to_dict('records')
+    records = (records * (args.records // len(records) + 1))[:args.records]
+    repeat = 5
+
+    def untyped():
+        frame = pd.DataFrame(records)
+        frame['date'] = pd.to_datetime(frame['date'])
+        return frame
+
+    untyped_ms = _time_call(untyped, repeat)
+    typed_ms = _time_call(lambda: sales_frame(records), repeat)
+    per_100k = 100_000 / args.records
+
+    print(f"\n{args.records} records")
+    print(f"{'':>10}{'ms':>10}{'ms/100k':>10}{'MB':>8}")
+    for label, ms, frame in [('untyped', untyped_ms, untyped()), ('schema', typed_ms, sales_frame(records))]:
+        print(f"{label:>10}{ms:>10.1f}{ms * per_100k:>10.1f}{frame.memory_usage(deep=True).sum() / 1e6:>8.1f}")
+
+
+def _order_lines(num_days, num_dishes, orders_per_day, rng):
+    """Timestamped order lines with a lunch and a dinner peak"""
+    hours = np.concatenate([rng.normal(13, 1.2, 4), rng.normal(20, 1.5, 5), rng.uniform(7, 23, 1)])
+    count = num_days * num_dishes * orders_per_day
+    stamps = (np.datetime64('2026-01-01T00:00') + rng.integers(0, num_days, count).astype('timedelta64[D]')
+              + (np.clip(rng.choice(hours, count) + rng.normal(0, 0.5, count), 0, 23.9) * 60)
+              .astype('timedelta64[m]'))
+    return pd.DataFrame({
+        'date': stamps.astype('datetime64[ns]'),
+        'dish_name': pd.Categorical.from_codes(rng.integers(0, num_dishes, count),
+                                               [f'Dish {i}' for i in range(num_dishes)]),
+        'quantity_sold': rng.integers(1, 4, count).astype(np.float32),
+        'selling_price': np.float32(150)
+    })
+
+
+def bench_slots(args):
+    """Intraday feature building and batched slot prediction, meal vs hourly"""
+    from intraday import SlotForecaster, slot_features, slot_grid
+
+    orders = _order_lines(args.days, args.dishes, args.orders_per_day, np.random.default_rng(0))
+    dishes = list(orders['dish_name'].cat.categories)
+    target = orders['date'].max().normalize() + pd.Timedelta(days=1)
+    print(f"\n{len(orders)} order lines, {args.dishes} dishes x {args.days} days")
+    print(f"{'scheme':>8}{'rows':>10}{'features ms':>13}{'rows/s':>12}{'train s':>9}{'predict ms':>12}")
+
+    for scheme in ['meal', 'hourly']:
+        forecaster = SlotForecaster(scheme)
+
+        def build():
+            return slot_features(slot_grid(orders, scheme), scheme, forecaster.exogenous)
+
+        features_ms = _time_call(build, 3)
+        rows = build()['slot'].size
+
+        start = time.perf_counter()
+        forecaster.train(orders)
+        train_s = time.perf_counter() - start
+        predict_ms = _time_call(lambda: forecaster.predict(orders, dishes, target), 5)
+
+        print(f"{scheme:>8}{rows:>10}{features_ms:>13.1f}{rows / features_ms * 1000:>12.0f}"
+              f"{train_s:>9.1f}{predict_ms:>12.1f}")
+
+
+def bench_profile(args):
+    """predict_all_dishes time with the sampling profiler off and on"""
+    from predict import ProductionPlanner
+    from profiler import SamplingProfiler
+
+    with tempfile.TemporaryDirectory() as workdir:
+        *paths, df = train_sample_model(workdir, num_days=args.days)
+        planner = ProductionPlanner(*paths[:2], arrays_path=paths[2])
+    history = df.assign(date=pd.to_datetime(df['date']))
+    menu_items = [{'name': name} for name in history['dish_name'].unique()]
+
+    def run():
+        planner.predict_all_dishes(history, menu_items, pd.Timestamp('2030-01-01'))
+
+    baseline = _time_call(run, args.repeat)
+    print(f"\n{len(history)} history rows, {len(menu_items)} dishes, median of {args.repeat} calls")
+    print(f"{'profiler':>14}{'ms':>10}{'overhead':>10}{'samples':>9}")
+    print(f"{'off':>14}{baseline:>10.1f}{'-':>10}{'-':>9}")
+    for interval_ms in args.interval_ms:
+        profiler = SamplingProfiler(interval_ms).start()
+        elapsed = _time_call(run, args.repeat)
+        profiler.stop()
+        print(f"{f'{interval_ms:g} ms':>14}{elapsed:>10.1f}{elapsed / baseline - 1:>+10.1%}{profiler.samples:>9}")
+    print("\nTop stages at the last interval:", profiler.report()['stages'])
+
+
+# Plan fields the Node backend reads (see getMLOptimization)
+NODE_PLAN_FIELDS = ('summary.high_waste_risk_count,summary.total_dishes,summary.expected_profit,'
+                    'predictions.dish_name,predictions.predicted_demand,predictions.current_stock,'
+                    'predictions.recommended_production,predictions.expected_profit,predictions.priority,'
+                    'predictions.action,waste_alerts.severity,waste_alerts.message,waste_alerts.action,'
+                    'donation_suggestions')
+
+
+def bench_formats(args):
+    """Serialization time and response bytes per plan response format"""
+    from flask import Flask, jsonify
+    from predict import ProductionPlanner
+    from response_format import encode_body, iter_encoded, parse_response_options, shape_body, zstandard
+
+    planner = ProductionPlanner(model_path=None)
+    flask_app = Flask('bench')
+    encodings = ['', 'gzip'] + (['zstd'] if zstandard is not None else [])
+    formats = [
+        ('rows', {}),
+        ('projected', {'fields': NODE_PLAN_FIELDS}),
+        ('columnar', {'layout': 'columnar'}),
+        ('proj+columnar', {'fields': NODE_PLAN_FIELDS, 'layout': 'columnar'})
+    ]
+    rng = np.random.default_rng(0)
+
+    for num_dishes in args.dishes:
+        names = [f'Dish {i:05d}' for i in range(num_dishes)]
+        predictions = dict(zip(names, np.round(rng.gamma(2, 10, num_dishes), 2).tolist()))
+        menu_items = [{'name': name, 'price': int(rng.integers(50, 400)), 'stock': int(rng.integers(0, 60))}
+                      for name in names]
+        body = {'success': True,
+                'production_plan': planner.generate_production_plan(predictions, [], menu_items)}
+        repeat = max(3, 2000 // num_dishes)
+
+        with flask_app.app_context():
+            baseline_ms = _time_call(lambda: jsonify(body).get_data(), repeat)
+            baseline_bytes = len(jsonify(body).get_data())
+        print(f"\n{num_dishes} dishes (jsonify: {baseline_bytes / 1024:.1f} KB in {baseline_ms:.2f} ms)")
+        print(f"{'format':>16}{'encoding':>10}{'KB':>10}{'vs jsonify':>12}{'ms':>9}{'stream ms':>11}")
+        for label, query in formats:
+            for encoding in encodings:
+                options = parse_response_options(query, encoding)
+
+                def encode():
+                    return encode_body(shape_body(body, options), options)[0]
+
+                def stream():
+                    return b''.join(iter_encoded(shape_body(body, options), options))
+
+                size = len(encode())
+                encode_ms = _time_call(encode, repeat)
+                stream_ms = _time_call(stream, repeat)
+                print(f"{label:>16}{encoding or 'none':>10}{size / 1024:>10.1f}{size / baseline_bytes:>11.1%}"
+                      f"{encode_ms:>9.2f}{stream_ms:>11.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='ML service benchmarks')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    memory = subparsers.add_parser('memory', help='per-worker memory, joblib vs mmap model')
+    memory.add_argument('--workers', type=int, default=4)
+    memory.set_defaults(func=bench_memory)
+
+    inference = subparsers.add_parser('inference', help='xgboost vs compiled tree inference')
+    inference.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 10, 100, 1000, 10000])
+    inference.set_defaults(func=bench_inference)
+
+    load = subparsers.add_parser('load', help='/predict latency under mixed payload sizes')
+    load.add_argument('--server', choices=['flask', 'async'], default='async')
+    load.add_argument('--requests', type=int, default=200)
+    load.add_argument('--concurrency', type=int, default=16)
+    load.add_argument('--large-fraction', type=float, default=0.1)
+    load.add_argument('--large-dishes', type=int, default=60)
+    load.add_argument('--port', type=int, default=5099)
+    load.set_defaults(func=bench_load)
+
+    batching = subparsers.add_parser('batching', help='concurrent predictions with micro-batching')
+    batching.add_argument('--requests', type=int, default=2000)
+    batching.add_argument('--threads', type=int, default=32)
+    batching.add_argument('--window-ms', type=float, default=3)
+    batching.add_argument('--max-rows', type=int, default=1024)
+    batching.set_defaults(func=bench_batching)
+
+    donations = subparsers.add_parser('donations', help='donation allocation solve time')
+    donations.add_argument('--lots', type=int, default=5000)
+    donations.add_argument('--ngos', type=int, default=300)
+    donations.add_argument('--k', type=int, nargs='+', default=[5, 10, 20])
+    donations.set_defaults(func=bench_donations)
+
+    parse = subparsers.add_parser('parse', help='payload validation and DataFrame construction')
+    parse.add_argument('--records', type=int, default=100_000)
+    parse.set_defaults(func=bench_parse)
+
+    slots = subparsers.add_parser('slots', help='intraday slot features and batched prediction')
+    slots.add_argument('--dishes', type=int, default=100)
+    slots.add_argument('--days', type=int, default=180)
+    slots.add_argument('--orders-per-day', type=int, default=20)
+    slots.set_defaults(func=bench_slots)
+
+    threads = subparsers.add_parser('threads', help='shared planner throughput vs thread count')
+    threads.add_argument('--threads', type=int, nargs='+', default=[1, 2, 4, 8])
+    threads.add_argument('--calls', type=int, default=200)
+    threads.add_argument('--rows', type=int, default=2000)
+    threads.add_argument('--reload-ms', type=float, default=50)
+    threads.set_defaults(func=bench_threads)
+
+    training = subparsers.add_parser('training', help='training time and peak memory per matrix path')
+    training.add_argument('--days', type=int, default=730)
+    training.add_argument('--restaurants', type=int, default=40)
+    training.add_argument('--max-bin', type=int, nargs='+', default=[256, 64])
+    training.set_defaults(func=bench_training)
+
+    profile = subparsers.add_parser('profile', help='sampling profiler overhead on predict_all_dishes')
+    profile.add_argument('--interval-ms', type=float, nargs='+', default=[1, 5, 10])
+    profile.add_argument('--days', type=int, default=90)
+    profile.add_argument('--repeat', type=int, default=20)
+    profile.set_defaults(func=bench_profile)
+
+    formats = subparsers.add_parser('formats', help='plan response bytes and encode time per format')
+    formats.add_argument('--dishes', type=int, nargs='+', default=[50, 500, 5000])
+    formats.set_defaults(func=bench_formats)
+
+    args = parser.parse_args()
+    start = time.perf_counter()
+    args.func(args)
+    print(f"\nDone in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,187 @@
+"""
+Cold-Start Module
+Forecasts new dishes from their most similar existing dishes
+"""
+
+import math
+import re
+import threading
+from collections import OrderedDict, defaultdict
+
+
+# Similarity weights
+CATEGORY_WEIGHT = 0.4
+TOKEN_WEIGHT = 0.4
+PRICE_WEIGHT = 0.2
+
+# Neighbours blended into one estimate
+TOP_K = 3
+
+# Price scaling is clipped so one odd price cannot dominate
+MIN_PRICE_SCALE = 0.5
+MAX_PRICE_SCALE = 2.0
+
+# Indexes kept per planner, one per distinct menu
+INDEX_CACHE_SIZE = 32
+
+
+def name_tokens(name):
+    """Lowercase word tokens of a dish name"""
+    return {token for token in re.split(r'[^a-z0-9]+', name.lower()) if len(token) > 1}
+
+
+def price_band(price):
+    """Half-octave price bucket, so neighbouring bands differ by ~40%"""
+    return int(math.floor(math.log2(max(price, 0) + 1) * 2))
+
+
+def menu_key(menu_items):
+    """Hashable identity of everything the index is built from"""
+    return tuple((item['name'], item.get('price'), item.get('category')) for item in menu_items)
+
+
+class DishSimilarityIndex:
+    """
+    Inverted index over the dishes of a menu
+
+    Dishes are keyed by name token, category and price band. A lookup
+    only scores dishes that share at least one key with the new dish,
+    never the whole catalog. The index depends only on the menu; which
+    dishes have demand is given per lookup, so one index serves every
+    request for the same menu.
+    """
+
+    def __init__(self, menu_items):
+        """
+        Args:
+            menu_items: list of dict with 'name', 'price' and 'category'
+        """
+        self.dishes = []
+        self.by_token = defaultdict(list)
+        self.by_category = defaultdict(list)
+        self.by_band = defaultdict(list)
+
+        for item in menu_items:
+            name = item['name']
+            entry = {
+                'name': name,
+                'price': float(item.get('price') or 0),
+                'category': item.get('category'),
+                'tokens': name_tokens(name)
+            }
+            dish_id = len(self.dishes)
+            self.dishes.append(entry)
+
+            for token in entry['tokens']:
+                self.by_token[token].append(dish_id)
+            if entry['category']:
+                self.by_category[entry['category']].append(dish_id)
+            self.by_band[price_band(entry['price'])].append(dish_id)
+
+    def _candidates(self, tokens, category, band):
+        candidates = set()
+        for token in tokens:
+            candidates.update(self.by_token.get(token, ()))
+        if category:
+            candidates.update(self.by_category.get(category, ()))
+        for neighbour_band in (band - 1, band, band + 1):
+            candidates.update(self.by_band.get(neighbour_band, ()))
+        return candidates
+
+    def neighbours(self, item, demand, k=TOP_K):
+        """
+        Most similar known dishes for a new menu item
+
+        Args:
+            item: dict with 'name', 'price' and 'category'
+            demand: dict, {dish_name: forecast} for dishes with history
+            k: int, neighbours to return
+
+        Returns:
+            list: (similarity, dish entry) pairs, best first
+        """
+        tokens = name_tokens(item['name'])
+        category = item.get('category')
+        price = float(item.get('price') or 0)
+        band = price_band(price)
+
+        scored = []
+        for dish_id in self._candidates(tokens, category, band):
+            dish = self.dishes[dish_id]
+            if dish['name'] not in demand:
+                continue
+            token_sim = 0.0
+            if tokens and dish['tokens']:
+                token_sim = len(tokens & dish['tokens']) / len(tokens | dish['tokens'])
+            price_sim = 1.0 / (1.0 + abs(math.log2((price + 1) / (dish['price'] + 1))))
+            similarity = (CATEGORY_WEIGHT * (category is not None and category == dish['category'])
+                          + TOKEN_WEIGHT * token_sim + PRICE_WEIGHT * price_sim)
+            scored.append((similarity, dish))
+
+        scored.sort(key=lambda pair: pair[0], reverse=True)
+        return scored[:k]
+
+    def estimate(self, item, demand):
+        """
+        Borrow demand for a new dish from its neighbours
+
+        Each neighbour's forecast is scaled by the price ratio (cheaper
+        dishes sell more), then blended by similarity.
+
+        Args:
+            item: dict with 'name', 'price' and 'category'
+            demand: dict, {dish_name: forecast} for dishes with history
+
+        Returns:
+            tuple: (estimated demand, list of neighbour names) or (None, [])
+        """
+        neighbours = self.neighbours(item, demand)
+        if not neighbours:
+            return None, []
+
+        price = float(item.get('price') or 0)
+        weighted, total_weight = 0.0, 0.0
+        for similarity, dish in neighbours:
+            scale = 1.0
+            if price > 0 and dish['price'] > 0:
+                scale = min(max(math.sqrt(dish['price'] / price), MIN_PRICE_SCALE), MAX_PRICE_SCALE)
+            weighted += similarity * float(demand[dish['name']]) * scale
+            total_weight += similarity
+
+        if total_weight == 0:
+            return None, []
+        return round(weighted / total_weight, 2), [dish['name'] for _, dish in neighbours]
+
+
+class SimilarityIndexCache:
+    """
+    Recently used DishSimilarityIndex per menu (thread-safe LRU)
+
+    Building the postings tokenizes every dish name; a menu rarely
+    changes between requests, so requests only pay for their lookups.
+    """
+
+    def __init__(self, max_entries=INDEX_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._indexes = OrderedDict()
+
+    def get(self, menu_items):
+        """
+        Returns:
+            DishSimilarityIndex: Index of this menu, built on first use
+        """
+        key = menu_key(menu_items)
+        with self._lock:
+            index = self._indexes.get(key)
+            if index is not None:
+                self._indexes.move_to_end(key)
+                return index
+
+        # Built outside the lock; a concurrent duplicate build is harmless
+        index = DishSimilarityIndex(menu_items)
+        with self._lock:
+            self._indexes[key] = index
+            while len(self._indexes) > self.max_entries:
+                self._indexes.popitem(last=False)
+        return index
@@ -55,8 +55,9 @@ class DataPreprocessor:
         df = df[df['quantity_sold'] >= 0]
         
         # Fill missing prices with median
-        df['selling_price'].fillna(df['selling_price'].median(), inplace=True)
-        df['cost_price'].fillna(df['cost_price'].median(), inplace=True)
+        # Assign instead of fillna(inplace=True) on a column of a filtered frame
+        df = df.assign(selling_price=df['selling_price'].fillna(df['selling_price'].median()),
+                       cost_price=df['cost_price'].fillna(df['cost_price'].median()))
         
         # Sort by date
         df = df.sort_values('date')
@@ -0,0 +1,140 @@
+"""
+Dataset Cache Module
+Content-hashes training data and caches its engineered feature matrix
+"""
+
+import hashlib
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+
+# Bump whenever preprocessing or feature engineering changes, so matrices
+# built by older code are never reused
+PIPELINE_VERSION = 2
+
+# Cached matrices kept on disk; least recently used are removed first
+MAX_ENTRIES = 8
+
+
+def canonical_dataset(df, columns):
+    """
+    Reduce raw sales to a canonical frame
+
+    Keeps the given columns, uses one dtype per column and a stable row
+    order. The same sales therefore always produce the same frame, no
+    matter how the rows were ordered or typed in the request.
+
+    Args:
+        df: pd.DataFrame with a datetime 'date' column
+        columns: list of str, columns to keep (in this order)
+
+    Returns:
+        pd.DataFrame: Canonical frame with a fresh RangeIndex
+    """
+    columns = [col for col in columns if col in df.columns]
+    canonical = pd.DataFrame({
+        col: (df[col].astype(str) if col == 'dish_name'
+              else df[col] if col == 'date'
+              else pd.to_numeric(df[col]).astype(np.float64))
+        for col in columns
+    })
+    return canonical.sort_values(columns, kind='mergesort').reset_index(drop=True)
+
+
+def dataset_hash(df, extra=''):
+    """
+    SHA-256 of a canonical frame's columns, dtypes, values and the
+    pipeline version
+
+    Args:
+        df: pd.DataFrame from canonical_dataset
+        extra: str, other inputs of the pipeline (e.g. exogenous file hashes)
+
+    Returns:
+        str: Hex digest
+    """
+    digest = hashlib.sha256(f'v{PIPELINE_VERSION}|{extra}'.encode())
+    for col in df.columns:
+        digest.update(f'|{col}:{df[col].dtype}|'.encode())
+        digest.update(pd.util.hash_pandas_object(df[col], index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+class DatasetCache:
+    """
+    Engineered (X, y) matrices on disk, keyed by dataset hash
+
+    Each entry is one compressed .npz file holding every feature column
+    with its own dtype, so a cache hit reproduces the matrix exactly.
+    """
+
+    def __init__(self, cache_dir='feature_cache', max_entries=MAX_ENTRIES):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f'{key}.npz')
+
+    def load(self, key):
+        """
+        Args:
+            key: str, dataset hash
+
+        Returns:
+            tuple: (X DataFrame, y Series), or None on a miss
+        """
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+
+        try:
+            with np.load(path, allow_pickle=False) as stored:
+                columns = [str(col) for col in stored['columns']]
+                X = pd.DataFrame({col: stored[f'x_{i}'] for i, col in enumerate(columns)})
+                y = pd.Series(stored['y'], name=str(stored['target']))
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Warning: Ignoring unreadable cache entry {path} - {e}")
+            return None
+
+        # Mark as recently used for eviction
+        os.utime(path)
+        return X, y
+
+    def save(self, key, X, y):
+        """Store a matrix atomically, then evict old entries"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(key)
+        # Unique per call: concurrent saves of the same key must not share a temp file
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=os.path.basename(path) + '.', suffix='.tmp')
+
+        arrays = {f'x_{i}': X[col].to_numpy() for i, col in enumerate(X.columns)}
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez_compressed(f, columns=np.array(X.columns, dtype=str),
+                                    target=np.array(str(y.name)), y=y.to_numpy(), **arrays)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self._evict()
+
+    def _evict(self):
+        # Another worker may evict (or replace) the same files concurrently
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.npz'):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                entries.append((os.path.getmtime(path), path))
+            except FileNotFoundError:
+                continue
+        entries.sort(reverse=True)
+        for _, stale in entries[self.max_entries:]:
+            try:
+                os.remove(stale)
+            except FileNotFoundError:
+                pass
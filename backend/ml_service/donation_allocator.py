@@ -0,0 +1,283 @@
+"""
+Donation Allocation Module
+Assigns surplus food lots to NGOs, minimizing distance and spoilage
+"""
+
+import re
+import time
+
+import numpy as np
+
+
+# Cost weights (per unit of food)
+DISTANCE_WEIGHT = 1.0      # per km
+SPOILAGE_WEIGHT = 10.0     # per fraction of shelf life used before pickup
+WASTE_PENALTY = 1000.0     # per unit left unallocated
+
+# Candidate NGOs kept per lot before solving
+K_NEAREST = 20
+
+# Problems up to this many candidate edges are solved exactly as an LP
+EXACT_MAX_EDGES = 5000
+
+# Price-update rounds for larger problems
+PRICE_ITERATIONS = 100
+
+# Defaults when the caller does not know pickup windows or shelf life
+DEFAULT_EXPIRY_HOURS = 24.0
+DEFAULT_PICKUP_WINDOW = (0.0, 24.0)
+
+
+def parse_distance(value):
+    """Distance in km from a number or a string like '3 km'"""
+    if value is None:
+        return np.nan
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = re.search(r'[\d.]+', str(value))
+    return float(match.group()) if match else np.nan
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """Great-circle distance, broadcasting over arrays"""
+    lat1, lng1, lat2, lng2 = map(np.radians, (lat1, lng1, lat2, lng2))
+    a = (np.sin((lat2 - lat1) / 2) ** 2
+         + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2)
+    return 6371.0 * 2 * np.arcsin(np.sqrt(a))
+
+
+def _lot_arrays(lots):
+    quantity = np.array([float(lot.get('quantity', lot.get('suggested_donation_qty', 0)) or 0)
+                         for lot in lots])
+    ready = np.array([float(lot.get('ready_hours', 0) or 0) for lot in lots])
+    expiry = np.array([float(lot.get('expiry_hours', DEFAULT_EXPIRY_HOURS) or DEFAULT_EXPIRY_HOURS)
+                       for lot in lots])
+    lat = np.array([lot.get('lat', np.nan) for lot in lots], dtype=float)
+    lng = np.array([lot.get('lng', np.nan) for lot in lots], dtype=float)
+    return quantity, ready, np.maximum(expiry, ready + 1e-3), lat, lng
+
+
+def _ngo_arrays(ngos):
+    capacity = np.array([float(ngo.get('capacity', 0) or 0) for ngo in ngos])
+    start = np.array([float(ngo.get('pickup_start', DEFAULT_PICKUP_WINDOW[0])) for ngo in ngos])
+    end = np.array([float(ngo.get('pickup_end', DEFAULT_PICKUP_WINDOW[1])) for ngo in ngos])
+    distance = np.array([parse_distance(ngo.get('distance')) for ngo in ngos])
+    lat = np.array([ngo.get('lat', np.nan) for ngo in ngos], dtype=float)
+    lng = np.array([ngo.get('lng', np.nan) for ngo in ngos], dtype=float)
+    return capacity, start, end, distance, lat, lng
+
+
+def cost_matrix(lots, ngos):
+    """
+    Per-unit cost and pickup time for every (lot, NGO) pair
+
+    Distance comes from coordinates when both sides have them, otherwise
+    from the NGO's distance to the restaurant. An NGO can take a lot only
+    if its pickup window opens before the lot expires.
+
+    Returns:
+        tuple: (cost matrix with inf for infeasible pairs, pickup hours, distance km)
+    """
+    quantity, ready, expiry, lot_lat, lot_lng = _lot_arrays(lots)
+    capacity, start, end, ngo_distance, ngo_lat, ngo_lng = _ngo_arrays(ngos)
+
+    distance = haversine_km(lot_lat[:, None], lot_lng[:, None], ngo_lat[None, :], ngo_lng[None, :])
+    distance = np.where(np.isnan(distance), ngo_distance[None, :], distance)
+    # Unknown distance counts as far rather than free
+    distance = np.where(np.isnan(distance), np.nanmax(distance, initial=50.0) * 2, distance)
+
+    pickup = np.maximum(ready[:, None], start[None, :])
+    feasible = (pickup <= np.minimum(expiry[:, None], end[None, :])) & (capacity[None, :] > 0)
+
+    shelf_used = (pickup - ready[:, None]) / (expiry - ready)[:, None]
+    cost = DISTANCE_WEIGHT * distance + SPOILAGE_WEIGHT * shelf_used
+    cost = np.where(feasible, cost, np.inf)
+
+    return cost, pickup, distance
+
+
+def _candidate_edges(cost, k):
+    """
+    Keep the k cheapest NGOs per lot
+
+    Returns:
+        tuple: (lots x k NGO indices, lots x k costs with inf for infeasible)
+    """
+    num_lots, num_ngos = cost.shape
+    k = min(k, num_ngos)
+    if k < num_ngos:
+        nearest = np.argpartition(cost, k - 1, axis=1)[:, :k]
+    else:
+        nearest = np.broadcast_to(np.arange(num_ngos), (num_lots, num_ngos)).copy()
+    return nearest, np.take_along_axis(cost, nearest, axis=1)
+
+
+def _edge_list(nearest, near_cost):
+    """Flatten candidate matrices into feasible (lot, ngo, cost) edges"""
+    lot_idx = np.repeat(np.arange(len(nearest)), nearest.shape[1])
+    ngo_idx = nearest.ravel()
+    edge_cost = near_cost.ravel()
+    keep = np.isfinite(edge_cost)
+    return lot_idx[keep], ngo_idx[keep], edge_cost[keep]
+
+
+def _solve_lp(quantity, capacity, lot_idx, ngo_idx, edge_cost):
+    """
+    Exact transportation LP with a waste slack per lot:
+
+        min  sum c_e x_e + penalty * sum w_i
+        s.t. sum_{e from lot i} x_e + w_i = quantity_i
+             sum_{e to NGO j}  x_e       <= capacity_j
+             x, w >= 0
+
+    Integral supplies and capacities give an integral optimum.
+    """
+    from scipy.optimize import linprog
+    from scipy.sparse import coo_matrix, hstack, identity
+
+    num_lots, num_ngos, num_edges = len(quantity), len(capacity), len(edge_cost)
+    edges = np.arange(num_edges)
+
+    A_eq = hstack([
+        coo_matrix((np.ones(num_edges), (lot_idx, edges)), shape=(num_lots, num_edges)),
+        identity(num_lots)
+    ]).tocsr()
+    A_ub = hstack([
+        coo_matrix((np.ones(num_edges), (ngo_idx, edges)), shape=(num_ngos, num_edges)),
+        coo_matrix((num_ngos, num_lots))
+    ]).tocsr()
+    c = np.concatenate([edge_cost, np.full(num_lots, WASTE_PENALTY)])
+
+    result = linprog(c, A_ub=A_ub, b_ub=capacity, A_eq=A_eq, b_eq=quantity,
+                     bounds=(0, None), method='highs-ipm')
+    if not result.success:
+        raise RuntimeError(f'Allocation LP failed: {result.message}')
+    return result.x[:num_edges]
+
+
+def _solve_greedy(quantity, capacity, lot_idx, ngo_idx, edge_cost):
+    """Fill edges cheapest first until lots or capacities run out"""
+    remaining_qty = quantity.copy()
+    remaining_cap = capacity.copy()
+    flow = np.zeros(len(edge_cost))
+
+    for e in np.argsort(edge_cost, kind='stable'):
+        i, j = lot_idx[e], ngo_idx[e]
+        amount = min(remaining_qty[i], remaining_cap[j])
+        if amount > 0:
+            flow[e] = amount
+            remaining_qty[i] -= amount
+            remaining_cap[j] -= amount
+    return flow
+
+
+def _ngo_prices(quantity, capacity, nearest, near_cost, iterations):
+    """
+    Lagrangian prices on NGO capacity
+
+    Every lot picks its cheapest NGO at cost + price; NGOs that receive
+    more than their capacity raise their price (subgradient step), pushing
+    lots towards the next-best NGO. Each round is one vectorized argmin
+    over the (lots x k) candidate matrix.
+    """
+    rows = np.arange(len(nearest))
+    prices = np.zeros(len(capacity))
+    finite = near_cost[np.isfinite(near_cost)]
+    step = np.median(finite) if len(finite) else 1.0
+
+    for iteration in range(iterations):
+        reduced = near_cost + prices[nearest]
+        choice = reduced.argmin(axis=1)
+        takes = reduced[rows, choice] < WASTE_PENALTY
+        load = np.bincount(nearest[rows, choice][takes], weights=quantity[takes],
+                           minlength=len(capacity))
+        overflow = (load - capacity) / np.maximum(capacity, 1)
+        prices = np.maximum(0, prices + step * overflow / np.sqrt(iteration + 1))
+
+    return prices
+
+
+def allocate_donations(lots, ngos, k_nearest=K_NEAREST):
+    """
+    Assign surplus lots to NGOs
+
+    Small problems (a restaurant and a few NGOs) are solved exactly as a
+    transportation LP. Larger ones use Lagrangian prices on NGO capacity
+    followed by a cheapest-first fill, which stays well under a second
+    for thousands of lots and hundreds of NGOs.
+
+    Args:
+        lots: list of dict with 'quantity' (or 'suggested_donation_qty'),
+              optional 'dish', 'ready_hours', 'expiry_hours', 'lat', 'lng'
+        ngos: list of dict with 'capacity', optional '_id', 'ngoName',
+              'distance' (km or '3 km'), 'pickup_start', 'pickup_end'
+              (hours from now), 'lat', 'lng'
+        k_nearest: int, candidate NGOs per lot
+
+    Returns:
+        dict: Assignments, unallocated lots and a summary
+    """
+    start_time = time.perf_counter()
+    quantity, _, _, _, _ = _lot_arrays(lots)
+    capacity = _ngo_arrays(ngos)[0] if ngos else np.zeros(0)
+
+    assignments = []
+    flow = np.zeros(0)
+    solver = 'none'
+    lot_idx = ngo_idx = np.zeros(0, dtype=int)
+
+    if len(lots) and len(ngos):
+        cost, pickup, distance = cost_matrix(lots, ngos)
+        nearest, near_cost = _candidate_edges(cost, k_nearest)
+        lot_idx, ngo_idx, edge_cost = _edge_list(nearest, near_cost)
+
+        if len(edge_cost):
+            flow = None
+            if len(edge_cost) <= EXACT_MAX_EDGES:
+                try:
+                    flow = _solve_lp(quantity, capacity, lot_idx, ngo_idx, edge_cost)
+                    solver = 'lp'
+                except ImportError:
+                    pass
+            if flow is None:
+                # Price out congested NGOs, then fill cheapest reduced cost first
+                prices = _ngo_prices(quantity, capacity, nearest, near_cost, PRICE_ITERATIONS)
+                flow = _solve_greedy(quantity, capacity, lot_idx, ngo_idx, edge_cost + prices[ngo_idx])
+                solver = 'lagrangian'
+            flow = np.round(flow, 6)
+
+            for e in np.flatnonzero(flow > 0):
+                i, j = lot_idx[e], ngo_idx[e]
+                assignments.append({
+                    'lot': int(i),
+                    'dish': lots[i].get('dish'),
+                    'ngo_id': ngos[j].get('_id') or ngos[j].get('id'),
+                    'ngo_name': ngos[j].get('ngoName') or ngos[j].get('name'),
+                    'quantity': round(float(flow[e]), 2),
+                    'distance_km': round(float(distance[i, j]), 2),
+                    'pickup_in_hours': round(float(pickup[i, j]), 2)
+                })
+
+    allocated = np.bincount(lot_idx[flow > 0], weights=flow[flow > 0], minlength=len(lots)) \
+        if len(flow) else np.zeros(len(lots))
+    unallocated = [
+        {'lot': int(i), 'dish': lots[i].get('dish'), 'quantity': round(float(quantity[i] - allocated[i]), 2)}
+        for i in np.flatnonzero(quantity - allocated > 1e-6)
+    ]
+
+    total_allocated = float(allocated.sum())
+    weighted_distance = sum(a['quantity'] * a['distance_km'] for a in assignments)
+    return {
+        'assignments': assignments,
+        'unallocated': unallocated,
+        'summary': {
+            'lots': len(lots),
+            'ngos': len(ngos),
+            'total_surplus': round(float(quantity.sum()), 2),
+            'allocated': round(total_allocated, 2),
+            'unallocated': round(float(quantity.sum()) - total_allocated, 2),
+            'avg_distance_km': round(weighted_distance / total_allocated, 2) if total_allocated else 0,
+            'solver': solver,
+            'solve_ms': round((time.perf_counter() - start_time) * 1000, 1)
+        }
+    }
@@ -0,0 +1,207 @@
+"""
+Exogenous Features Module
+Joins holiday, event and weather tables onto sales rows by date
+"""
+
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+
+# Directory scanned for holidays.csv, events.csv and weather.csv
+EXOGENOUS_DIR = os.environ.get('ML_EXOGENOUS_DIR', 'exogenous')
+
+# Proximity features are clipped to this many days
+MAX_PROXIMITY_DAYS = 30
+
+
+def _day_numbers(dates):
+    """Days since the epoch for a datetime-like array or scalar"""
+    dates = np.asarray(dates)
+    if dates.dtype.kind != 'M':
+        dates = np.asarray(pd.to_datetime(dates))
+    return dates.astype('datetime64[D]').astype(np.int64)
+
+
+class DateLookup:
+    """
+    Dense per-day feature arrays over a fixed date span
+
+    Lookups turn each date into an array offset, so joining is O(1) per row
+    with no merge or hash join. Dates outside the span get NaN.
+    """
+
+    def __init__(self, first_day, arrays):
+        """
+        Args:
+            first_day: int, day number of arrays[...][0]
+            arrays: dict, {feature_name: float array, one value per day}
+        """
+        self.first_day = first_day
+        self.arrays = arrays
+        self.num_days = len(next(iter(arrays.values()))) if arrays else 0
+
+    def lookup(self, dates):
+        """
+        Args:
+            dates: datetime-like array
+
+        Returns:
+            dict: {feature_name: float array aligned with dates}
+        """
+        offset = _day_numbers(dates) - self.first_day
+        inside = (offset >= 0) & (offset < self.num_days)
+        offset = np.where(inside, offset, 0)
+        return {name: np.where(inside, values[offset], np.nan) for name, values in self.arrays.items()}
+
+
+class DateCalendar:
+    """
+    Calendar of special days (holidays, festivals, local events)
+
+    File: CSV with a 'date' column and any other columns (e.g. 'name').
+    Features: <prefix>_flag, <prefix>_days_to_next, <prefix>_days_since_last
+    """
+
+    def __init__(self, path, prefix):
+        self.path = path
+        self.prefix = prefix
+        self.feature_names = [f'{prefix}_flag', f'{prefix}_days_to_next', f'{prefix}_days_since_last']
+
+        special = np.unique(_day_numbers(pd.read_csv(path)['date']))
+        # Pad the span so days just outside the calendar still see nearby dates
+        first_day = int(special[0]) - MAX_PROXIMITY_DAYS
+        days = np.arange(first_day, int(special[-1]) + MAX_PROXIMITY_DAYS + 1)
+
+        next_idx = np.searchsorted(special, days, side='left')
+        prev_idx = np.searchsorted(special, days, side='right') - 1
+        to_next = np.where(next_idx < len(special),
+                           special[np.minimum(next_idx, len(special) - 1)] - days, MAX_PROXIMITY_DAYS)
+        since_last = np.where(prev_idx >= 0, days - special[np.maximum(prev_idx, 0)], MAX_PROXIMITY_DAYS)
+
+        self.table = DateLookup(first_day, {
+            self.feature_names[0]: np.isin(days, special).astype(np.float64),
+            self.feature_names[1]: np.minimum(to_next, MAX_PROXIMITY_DAYS).astype(np.float64),
+            self.feature_names[2]: np.minimum(since_last, MAX_PROXIMITY_DAYS).astype(np.float64)
+        })
+
+    def lookup(self, dates):
+        return self.table.lookup(dates)
+
+
+class DateTable:
+    """
+    Numeric daily measurements (weather, footfall, ...)
+
+    File: CSV with a 'date' column and numeric columns; several rows for
+    one date are averaged. Features: <prefix>_<column>. Days missing from
+    the file are NaN, which the model treats as unknown.
+    """
+
+    def __init__(self, path, prefix):
+        self.path = path
+        self.prefix = prefix
+
+        table = pd.read_csv(path)
+        table['day'] = _day_numbers(table.pop('date'))
+        daily = table.groupby('day').mean(numeric_only=True)
+        self.feature_names = [f'{prefix}_{col}' for col in daily.columns]
+
+        first_day = int(daily.index.min())
+        days = np.arange(first_day, int(daily.index.max()) + 1)
+        dense = daily.reindex(days)
+        self.table = DateLookup(first_day, {
+            name: dense[col].to_numpy(dtype=np.float64) for name, col in zip(self.feature_names, daily.columns)
+        })
+
+    def lookup(self, dates):
+        return self.table.lookup(dates)
+
+
+class ExogenousFeatures:
+    """
+    Registry of exogenous feature plugins
+
+    A plugin is any object with 'feature_names', 'path' and a
+    lookup(dates) -> {name: array} method.
+    """
+
+    def __init__(self, plugins=None):
+        self.plugins = list(plugins or [])
+
+    def register(self, plugin):
+        self.plugins.append(plugin)
+        return plugin
+
+    @property
+    def feature_names(self):
+        return [name for plugin in self.plugins for name in plugin.feature_names]
+
+    def fingerprint(self):
+        """Hash of every plugin's source file, for cache keys ('' if none)"""
+        if not self.plugins:
+            return ''
+        digest = hashlib.sha256()
+        for plugin in self.plugins:
+            digest.update(f'{type(plugin).__name__}:{getattr(plugin, "prefix", "")}|'.encode())
+            with open(plugin.path, 'rb') as f:
+                digest.update(f.read())
+        return digest.hexdigest()
+
+    def lookup(self, dates):
+        """
+        Args:
+            dates: datetime-like array
+
+        Returns:
+            dict: {feature_name: float array aligned with dates}
+        """
+        columns = {}
+        for plugin in self.plugins:
+            columns.update(plugin.lookup(dates))
+        return columns
+
+    def transform(self, df, date_col='date'):
+        """
+        Add every plugin's features to df
+
+        Args:
+            df: pd.DataFrame with a date column
+
+        Returns:
+            pd.DataFrame: Copy with the exogenous feature columns
+        """
+        if not self.plugins:
+            return df
+        return df.assign(**self.lookup(df[date_col].to_numpy()))
+
+
+_loaded = {}
+
+
+def load_exogenous_features(directory=EXOGENOUS_DIR):
+    """
+    Registry for the standard files in a directory, built once per process
+
+    holidays.csv -> holiday_* features, events.csv -> event_* features,
+    weather.csv -> weather_* features. Missing files are skipped.
+
+    Returns:
+        ExogenousFeatures: Shared registry (empty if no files exist)
+    """
+    if directory not in _loaded:
+        registry = ExogenousFeatures()
+        sources = [('holidays.csv', DateCalendar, 'holiday'),
+                   ('events.csv', DateCalendar, 'event'),
+                   ('weather.csv', DateTable, 'weather')]
+        for filename, plugin_class, prefix in sources:
+            path = os.path.join(directory, filename)
+            if os.path.exists(path):
+                try:
+                    registry.register(plugin_class(path, prefix))
+                except Exception as e:
+                    print(f"Warning: Could not load {path} - {e}")
+        _loaded[directory] = registry
+    return _loaded[directory]
@@ -0,0 +1,71 @@
+"""
+Forecast Explanations Module
+Per-dish feature contributions from one batched XGBoost pred_contribs call
+"""
+
+import numpy as np
+import xgboost as xgb
+
+
+# Contributions listed per dish; the rest are summed into 'other'
+TOP_CONTRIBUTIONS = 5
+
+
+def tree_contributions(model, X, feature_columns, iteration_range=None):
+    """
+    Exact tree contributions (TreeSHAP) for a whole feature matrix
+
+    Args:
+        model: xgb.XGBRegressor or xgb.Booster
+        X: float32 array, shape (rows, len(feature_columns))
+        feature_columns: list of str
+        iteration_range: tuple, trees to use (default: the estimator's
+                         early-stopping range)
+
+    Returns:
+        np.ndarray: shape (rows, features + 1); the last column is the
+                    base value, and each row sums to the raw prediction
+    """
+    booster = model.get_booster() if hasattr(model, 'get_booster') else model
+    if iteration_range is None:
+        # Same trees as XGBRegressor.predict after early stopping
+        best_iteration = getattr(model, 'best_iteration', None)
+        iteration_range = (0, best_iteration + 1) if best_iteration is not None else (0, 0)
+    matrix = xgb.DMatrix(X, feature_names=list(feature_columns), missing=np.nan)
+    return booster.predict(matrix, pred_contribs=True, iteration_range=iteration_range)
+
+
+def summarize_contributions(contributions, X, feature_columns, top=TOP_CONTRIBUTIONS):
+    """
+    Largest contributions per row, ready for the JSON response
+
+    Args:
+        contributions: array from tree_contributions
+        X: feature array the contributions were computed on
+        feature_columns: list of str
+        top: int, contributions listed per row
+
+    Returns:
+        list: One {'base_value', 'contributions', 'other'} dict per row
+    """
+    per_feature = contributions[:, :-1]
+    # Rank every row at once instead of sorting row by row
+    order = np.argsort(-np.abs(per_feature), axis=1, kind='stable')[:, :top]
+    ranked = np.take_along_axis(per_feature, order, axis=1)
+    other = per_feature.sum(axis=1) - ranked.sum(axis=1)
+
+    summaries = []
+    for row, (columns, values) in enumerate(zip(order, ranked)):
+        summaries.append({
+            'base_value': round(float(contributions[row, -1]), 2),
+            'contributions': [
+                {
+                    'feature': feature_columns[col],
+                    'value': None if np.isnan(X[row, col]) else round(float(X[row, col]), 2),
+                    'contribution': round(float(value), 2)
+                }
+                for col, value in zip(columns, values)
+            ],
+            'other': round(float(other[row]), 2)
+        })
+    return summaries
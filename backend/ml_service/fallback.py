@@ -0,0 +1,126 @@
+"""
+Fallback Forecasting Module
+Cheap forecasts for dishes the XGBoost model cannot serve in time
+"""
+
+import numpy as np
+import pandas as pd
+
+
+# Forecast tiers, most to least accurate
+TIER_MODEL = 'xgboost'
+TIER_SEASONAL = 'seasonal'
+TIER_GLOBAL = 'global_mean'
+TIER_COLD_START = 'cold_start'
+TIER_NO_HISTORY = 'no_history'
+
+# Exponential smoothing weight of the newest (deseasonalized) day
+SMOOTHING_ALPHA = 0.3
+
+# Weekday factors are estimated from this many recent weeks
+SEASON_WEEKS = 8
+
+# A weekday needs this many observations before it gets its own factor
+MIN_WEEKDAY_OBSERVATIONS = 2
+
+# Factors are clipped so one odd weekday cannot zero or blow up a forecast
+FACTOR_RANGE = (0.1, 10.0)
+
+
+class FallbackForecaster:
+    """
+    Seasonal exponential smoothing for every dish in one grouped pass
+
+    Sales are binned once into a dense dishes x days grid. Weekday factors
+    and the smoothed level are then whole-column operations across all
+    dishes, so the cost does not grow with a per-dish frame scan.
+    """
+
+    def __init__(self, historical_data, prediction_date, alpha=SMOOTHING_ALPHA):
+        """
+        Args:
+            historical_data: pd.DataFrame with date, dish_name, quantity_sold
+            prediction_date: datetime, day being forecast
+            alpha: float, smoothing weight of the newest day
+        """
+        self.alpha = alpha
+        self.target_weekday = pd.Timestamp(prediction_date).weekday()
+
+        names = historical_data['dish_name'].astype('category').array
+        days = pd.to_datetime(historical_data['date']).to_numpy(dtype='datetime64[ns]').astype('datetime64[D]')
+        self.dish_index = pd.Index(names.categories.astype(str))
+
+        if len(days) == 0:
+            self.forecasts = np.array([])
+            self.global_mean = 0.0
+            return
+
+        first_day = days.min()
+        day_idx = (days - first_day).astype(np.int64)
+        num_days = int(day_idx.max()) + 1
+        num_dishes = len(self.dish_index)
+
+        # Daily totals per dish; days without a record stay NaN (unknown)
+        flat = names.codes.astype(np.int64) * num_days + day_idx
+        valid = names.codes >= 0
+        size = num_dishes * num_days
+        totals = np.bincount(flat[valid], weights=historical_data['quantity_sold'].to_numpy(np.float64)[valid],
+                             minlength=size)
+        seen = np.bincount(flat[valid], minlength=size) > 0
+        grid = np.where(seen, totals, np.nan).reshape(num_dishes, num_days)
+
+        weekdays = (np.arange(num_days) + pd.Timestamp(first_day).weekday()) % 7
+        factors = self._weekday_factors(grid, weekdays)
+        level = self._smoothed_level(grid / factors[:, weekdays])
+
+        self.forecasts = np.maximum(level * factors[:, self.target_weekday], 0)
+        observed = seen.sum()
+        self.global_mean = float(totals.sum() / observed) if observed else 0.0
+
+    @staticmethod
+    def _weekday_factors(grid, weekdays):
+        """(dishes x 7) ratio of each weekday's mean to the dish mean"""
+        recent = np.arange(grid.shape[1]) >= grid.shape[1] - 7 * SEASON_WEEKS
+        window = np.where(recent[None, :], grid, np.nan)
+        counts = (~np.isnan(window)).sum(axis=1)
+        dish_mean = np.nansum(window, axis=1) / np.maximum(counts, 1)
+
+        factors = np.ones((grid.shape[0], 7))
+        for weekday in range(7):
+            days = window[:, weekdays == weekday]
+            n = (~np.isnan(days)).sum(axis=1)
+            weekday_mean = np.nansum(days, axis=1) / np.maximum(n, 1)
+            usable = (n >= MIN_WEEKDAY_OBSERVATIONS) & (dish_mean > 0)
+            factors[usable, weekday] = weekday_mean[usable] / dish_mean[usable]
+        return np.clip(factors, *FACTOR_RANGE)
+
+    def _smoothed_level(self, series):
+        """Simple exponential smoothing over days, vectorized across dishes"""
+        level = np.full(series.shape[0], np.nan)
+        for day in range(series.shape[1]):
+            value = series[:, day]
+            update = np.where(np.isnan(level), value, self.alpha * value + (1 - self.alpha) * level)
+            level = np.where(np.isnan(value), level, update)
+        return level
+
+    def forecast(self, dish_names):
+        """
+        Args:
+            dish_names: list of str
+
+        Returns:
+            tuple: ({dish_name: quantity}, {dish_name: tier}). Dishes
+                   without history get the global mean
+        """
+        positions = self.dish_index.get_indexer(dish_names)
+        predictions = {}
+        tiers = {}
+        for name, pos in zip(dish_names, positions):
+            value = self.forecasts[pos] if pos >= 0 else np.nan
+            if np.isnan(value):
+                predictions[name] = round(self.global_mean, 2)
+                tiers[name] = TIER_GLOBAL
+            else:
+                predictions[name] = round(float(value), 2)
+                tiers[name] = TIER_SEASONAL
+        return predictions, tiers
@@ -6,16 +6,20 @@ Creates advanced features for demand forecasting
 import pandas as pd
 import numpy as np
 
+from exogenous import load_exogenous_features
+
 
 class FeatureEngineer:
     """
     Handles feature engineering for the demand forecasting model
     """
     
-    def __init__(self):
-        self.numerical_features = []
-        self.categorical_features = []
-        self.feature_columns = []
+    def __init__(self, exogenous=None):
+        """
+        Args:
+            exogenous: ExogenousFeatures registry (default: files in ML_EXOGENOUS_DIR)
+        """
+        self.exogenous = exogenous if exogenous is not None else load_exogenous_features()
     
     def create_price_features(self, df):
         """
@@ -51,7 +55,7 @@ class FeatureEngineer:
         df = df.copy()
         
         # Fill NaN values in std_last_7_days
-        df['std_last_7_days'].fillna(0, inplace=True)
+        df['std_last_7_days'] = df['std_last_7_days'].fillna(0)
         
         # Demand volatility
         df['demand_volatility'] = df['std_last_7_days'] / (df['avg_last_7_days'] + 1)
@@ -86,6 +90,18 @@ class FeatureEngineer:
         
         return df
     
+    def add_exogenous_features(self, df):
+        """
+        Join holiday, event and weather features by date
+        
+        Args:
+            df: pd.DataFrame with 'date' column
+            
+        Returns:
+            pd.DataFrame: Data with one column per registered exogenous feature
+        """
+        return self.exogenous.transform(df)
+    
     def select_features(self, df, target_col='quantity_sold'):
         """
         Select final features for model training
@@ -118,14 +134,15 @@ class FeatureEngineer:
             'demand_volatility', 'demand_trend', 'momentum'
         ]
         
+        # Features from registered exogenous plugins
+        feature_cols += self.exogenous.feature_names
+        
         # Filter only existing columns
         available_cols = [col for col in feature_cols if col in df.columns]
         
         X = df[available_cols]
         y = df[target_col] if target_col in df.columns else None
         
-        self.feature_columns = available_cols
-        
         return X, y, available_cols
     
     def engineer_features(self, df):
@@ -152,4 +169,8 @@ class FeatureEngineer:
         if 'day_of_week' in df.columns and 'month' in df.columns:
             df = self.create_cyclic_features(df)
         
+        # Join exogenous features (after dropna, so unknown weather keeps the row)
+        if 'date' in df.columns:
+            df = self.add_exogenous_features(df)
+        
         return df
@@ -0,0 +1,93 @@
+"""
+Inference Core Module
+Immutable model bundles and pure scoring functions, safe to share across threads
+"""
+
+import json
+from dataclasses import dataclass
+from types import MappingProxyType
+
+import joblib
+import numpy as np
+import xgboost as xgb
+
+from model_store import TreeEnsemble, artifacts_available, flatten_booster, load_model_arrays
+
+
+@dataclass(frozen=True)
+class ModelBundle:
+    """
+    Everything one prediction needs from a trained model
+
+    A bundle is never modified after load_bundle returns. Reloading builds
+    a new bundle and swaps the reference, so a request that took a bundle
+    at its start scores with one consistent model even while /train
+    replaces it.
+
+    Attributes:
+        model: xgb.Booster or TreeEnsemble
+        feature_columns: tuple of str, model input order
+        metadata: read-only mapping from model_metadata.json
+        model_path: str, pickled model (used to explain compiled models)
+        iteration_range: tuple, trees kept after early stopping
+    """
+    model: object
+    feature_columns: tuple
+    metadata: MappingProxyType
+    model_path: str
+    iteration_range: tuple = (0, 0)
+
+
+def load_bundle(model_path, metadata_path, arrays_path=None, use_mmap=False, inference_backend='xgboost'):
+    """
+    Load a trained model into a new immutable bundle
+
+    With use_mmap the shared node arrays are mapped instead of unpickling
+    a private booster. The 'compiled' backend flattens the booster into
+    node arrays once. The default backend keeps only the raw Booster,
+    whose inplace_predict is thread-safe and runs without the GIL.
+
+    Returns:
+        ModelBundle: Ready-to-score bundle
+    """
+    with open(metadata_path, 'r') as f:
+        metadata = json.load(f)
+    feature_columns = tuple(metadata['feature_columns'])
+    iteration_range = (0, 0)
+
+    if use_mmap and artifacts_available(arrays_path):
+        model = load_model_arrays(arrays_path)
+    else:
+        estimator = joblib.load(model_path)
+        if inference_backend == 'compiled':
+            model = TreeEnsemble(flatten_booster(estimator, list(feature_columns)))
+        else:
+            model = estimator.get_booster() if hasattr(estimator, 'get_booster') else estimator
+            best_iteration = getattr(estimator, 'best_iteration', None)
+            if best_iteration is not None:
+                iteration_range = (0, best_iteration + 1)
+
+    return ModelBundle(model, feature_columns, MappingProxyType(metadata), model_path, iteration_range)
+
+
+def feature_matrix(bundle, X_pred):
+    """
+    Feature rows as a contiguous float32 array in the model's column order
+
+    Features the model knows but this process cannot build (e.g. a removed
+    weather file) are scored as missing.
+    """
+    return np.ascontiguousarray(X_pred.reindex(columns=list(bundle.feature_columns)).to_numpy(dtype=np.float32))
+
+
+def score(bundle, X):
+    """
+    Raw predictions for a float32 feature array
+
+    The XGBoost path uses inplace_predict: no DMatrix or DataFrame
+    validation in Python, and the native call releases the GIL, so
+    concurrent requests score in parallel.
+    """
+    if isinstance(bundle.model, xgb.Booster):
+        return bundle.model.inplace_predict(X, iteration_range=bundle.iteration_range, missing=np.nan)
+    return bundle.model.predict(X)
@@ -0,0 +1,240 @@
+"""
+Data Ingestion Module
+Streams large CSV/Parquet exports of order lines into daily training files
+
+Usage:
+    python ingest.py orders_2024.csv orders_2025.parquet --out training_data
+"""
+
+import argparse
+import glob
+import os
+import resource
+import time
+
+import pandas as pd
+
+from data_preprocessing import DataPreprocessor
+
+
+# Running totals kept per (date, dish_name) key
+SUM_COLUMNS = [
+    'quantity_sold', 'selling_price_sum', 'selling_price_count', 'cost_price_sum', 'cost_price_count'
+]
+
+
+def iter_chunks(path, chunksize=100_000):
+    """
+    Read a CSV or Parquet file in bounded chunks
+
+    Args:
+        path: str, .csv / .csv.gz / .parquet file
+        chunksize: int, rows per chunk
+
+    Yields:
+        pd.DataFrame: Next chunk of order lines
+    """
+    if path.endswith('.parquet'):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Reading Parquet requires pyarrow. Install it with: pip install pyarrow")
+
+        parquet_file = pq.ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunksize)
+
+
+def validate_chunk(chunk, required_columns):
+    """
+    Validate a chunk of order lines and drop unusable rows
+
+    Args:
+        chunk: pd.DataFrame
+        required_columns: list of str, columns every export must provide
+
+    Returns:
+        pd.DataFrame: Valid rows with parsed dates and numeric values
+    """
+    missing = [col for col in required_columns if col not in chunk.columns]
+    if missing:
+        raise ValueError(f"Missing required columns: {missing}")
+
+    chunk = chunk[required_columns].copy()
+    chunk['date'] = pd.to_datetime(chunk['date'], errors='coerce').dt.normalize()
+    for col in ['quantity_sold', 'selling_price', 'cost_price']:
+        chunk[col] = pd.to_numeric(chunk[col], errors='coerce')
+
+    chunk = chunk.dropna(subset=['date', 'dish_name', 'quantity_sold'])
+    chunk = chunk[chunk['quantity_sold'] >= 0]
+
+    return chunk
+
+
+def aggregate_chunk(chunk):
+    """
+    Reduce order lines to partial daily totals per dish
+
+    Args:
+        chunk: pd.DataFrame of validated order lines
+
+    Returns:
+        pd.DataFrame: Partial sums indexed by (date, dish_name)
+    """
+    return chunk.assign(
+        selling_price_sum=chunk['selling_price'],
+        selling_price_count=chunk['selling_price'].notna().astype(int),
+        cost_price_sum=chunk['cost_price'],
+        cost_price_count=chunk['cost_price'].notna().astype(int)
+    ).groupby(['date', 'dish_name'])[SUM_COLUMNS].sum()
+
+
+class DailySalesAggregator:
+    """
+    Accumulates daily dish totals across chunks
+
+    Memory grows with the number of distinct (date, dish) pairs,
+    not with the number of order lines read.
+    """
+
+    def __init__(self):
+        self.totals = None
+        self.rows_read = 0
+        self.rows_rejected = 0
+
+    def add(self, chunk, required_columns):
+        """Validate and fold one chunk into the running totals"""
+        self.rows_read += len(chunk)
+        valid = validate_chunk(chunk, required_columns)
+        self.rows_rejected += len(chunk) - len(valid)
+
+        partial = aggregate_chunk(valid)
+        if self.totals is None:
+            self.totals = partial
+        else:
+            self.totals = self.totals.add(partial, fill_value=0)
+
+    def daily_sales(self):
+        """
+        Final daily training rows in the DataPreprocessor format
+
+        Returns:
+            pd.DataFrame: date, dish_name, quantity_sold, selling_price, cost_price
+        """
+        if self.totals is None:
+            return pd.DataFrame(columns=DataPreprocessor().required_columns)
+
+        totals = self.totals.reset_index()
+        # Average unit prices over the lines that had one (NaN if none did)
+        for col in ['selling_price', 'cost_price']:
+            totals[col] = totals[f'{col}_sum'] / totals[f'{col}_count'].where(totals[f'{col}_count'] > 0)
+
+        return totals[DataPreprocessor().required_columns].sort_values(['date', 'dish_name'])
+
+
+def write_partitions(daily, out_dir, file_format='csv'):
+    """
+    Write daily sales partitioned by month
+
+    Args:
+        daily: pd.DataFrame from DailySalesAggregator.daily_sales
+        out_dir: str, output directory
+        file_format: str, 'csv' or 'parquet'
+
+    Returns:
+        list: Paths of written partition files
+    """
+    paths = []
+    for month, part in daily.groupby(daily['date'].dt.strftime('%Y-%m')):
+        part_dir = os.path.join(out_dir, f'month={month}')
+        os.makedirs(part_dir, exist_ok=True)
+
+        part = part.assign(date=part['date'].dt.strftime('%Y-%m-%d'))
+        if file_format == 'parquet':
+            path = os.path.join(part_dir, 'part.parquet')
+            part.to_parquet(path, index=False)
+        else:
+            path = os.path.join(part_dir, 'part.csv')
+            part.to_csv(path, index=False)
+        paths.append(path)
+
+    return paths
+
+
+def load_partitions(out_dir):
+    """
+    Read partition files written by write_partitions back for training
+
+    Args:
+        out_dir: str, directory passed to write_partitions
+
+    Returns:
+        pd.DataFrame: Daily sales ready for DemandForecaster.train
+    """
+    parts = []
+    for path in sorted(glob.glob(os.path.join(out_dir, 'month=*', 'part.*'))):
+        if path.endswith('.parquet'):
+            parts.append(pd.read_parquet(path))
+        else:
+            parts.append(pd.read_csv(path))
+
+    return pd.concat(parts, ignore_index=True)
+
+
+def ingest(paths, out_dir, chunksize=100_000, file_format='csv'):
+    """
+    Stream order-line exports into partitioned daily training files
+
+    Args:
+        paths: list of str, CSV/Parquet files
+        out_dir: str, output directory
+        chunksize: int, rows read per chunk
+        file_format: str, 'csv' or 'parquet' output
+
+    Returns:
+        dict: Ingestion statistics
+    """
+    required_columns = DataPreprocessor().required_columns
+    aggregator = DailySalesAggregator()
+    start = time.perf_counter()
+
+    for path in paths:
+        for chunk in iter_chunks(path, chunksize):
+            aggregator.add(chunk, required_columns)
+        print(f"Read {path} ({aggregator.rows_read} rows so far)")
+
+    daily = aggregator.daily_sales()
+    written = write_partitions(daily, out_dir, file_format)
+    elapsed = time.perf_counter() - start
+
+    return {
+        'rows_read': aggregator.rows_read,
+        'rows_rejected': aggregator.rows_rejected,
+        'daily_rows': len(daily),
+        'partitions': len(written),
+        'seconds': round(elapsed, 2),
+        'rows_per_second': round(aggregator.rows_read / elapsed) if elapsed > 0 else 0
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Ingest order-line exports into daily training files')
+    parser.add_argument('paths', nargs='+', help='CSV or Parquet files of order lines')
+    parser.add_argument('--out', required=True, help='output directory for partitioned files')
+    parser.add_argument('--chunksize', type=int, default=100_000, help='rows read per chunk')
+    parser.add_argument('--format', choices=['csv', 'parquet'], default='csv', dest='file_format')
+    args = parser.parse_args()
+
+    stats = ingest(args.paths, args.out, args.chunksize, args.file_format)
+
+    print("\n=== Ingestion Results ===")
+    print(f"Rows read: {stats['rows_read']} ({stats['rows_rejected']} rejected)")
+    print(f"Daily dish rows: {stats['daily_rows']} in {stats['partitions']} partitions")
+    print(f"Throughput: {stats['rows_per_second']} rows/s ({stats['seconds']}s)")
+    print(f"Peak memory: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,368 @@
+"""
+Intraday Forecasting Module
+Forecasts demand per meal slot or hour from timestamped order lines
+"""
+
+import json
+from datetime import datetime, timedelta
+
+import joblib
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from sklearn.metrics import mean_absolute_error, mean_squared_error
+
+from exogenous import load_exogenous_features
+
+
+# Slot of each hour of the day, per scheme (hours are restaurant-local)
+SLOT_SCHEMES = {
+    'meal': {
+        'labels': ['breakfast', 'lunch', 'dinner'],
+        'slot_of_hour': np.array([0] * 11 + [1] * 5 + [2] * 8)   # 0-10, 11-15, 16-23
+    },
+    'hourly': {
+        'labels': [f'{hour:02d}:00' for hour in range(24)],
+        'slot_of_hour': np.arange(24)
+    }
+}
+
+# Days of same-slot history a training row needs (for the 7-day lag)
+MIN_HISTORY_DAYS = 7
+
+SLOT_FEATURES = [
+    'slot', 'slot_sin', 'slot_cos',
+    'day_of_week', 'is_weekend', 'day_of_month', 'month',
+    'same_slot_lag_1', 'same_slot_lag_7', 'same_slot_avg_7', 'same_slot_avg_28',
+    'same_weekday_slot_avg_4', 'day_total_lag_1', 'day_total_avg_7', 'slot_share_7',
+    'selling_price'
+]
+
+
+def slot_grid(df, scheme, dish_names=None, end_day=None):
+    """
+    Aggregate order lines into a dense (dishes x days x slots) grid
+
+    Args:
+        df: pd.DataFrame with datetime 'date' (order time), dish_name,
+            quantity_sold and optional selling_price
+        scheme: str, key of SLOT_SCHEMES
+        dish_names: list of str, row order (default: dishes in df)
+        end_day: pd.Timestamp, last day of the grid (default: last sale)
+
+    Returns:
+        dict: grid, first_day (pd.Timestamp), dish_names, first_sale
+              (per-dish day index) and price (per-dish mean selling price)
+    """
+    slot_of_hour = SLOT_SCHEMES[scheme]['slot_of_hour']
+    num_slots = int(slot_of_hour.max()) + 1
+
+    # Day and hour straight from datetime64, without pandas .dt accessors
+    timestamps = pd.to_datetime(df['date']).to_numpy(dtype='datetime64[ns]')
+    days = timestamps.astype('datetime64[D]')
+    hours = ((timestamps - days) // np.timedelta64(1, 'h')).astype(np.int64)
+
+    # Categorical dish names map through their categories, not per row
+    names = df['dish_name'].astype('category').array
+    if dish_names is None:
+        dish_names = [str(name) for name in names.categories[np.unique(names.codes[names.codes >= 0])]]
+    dish_idx = np.append(pd.Index(dish_names).get_indexer(names.categories.astype(str)), -1)[names.codes]
+
+    first_day = days.min() if len(df) else np.datetime64(pd.Timestamp(end_day).normalize(), 'D')
+    last_day = np.datetime64(pd.Timestamp(end_day).normalize(), 'D') if end_day is not None else days.max()
+    num_days = max(int((last_day - first_day) // np.timedelta64(1, 'D')) + 1, 1)
+
+    day_idx = (days - first_day).astype(np.int64)
+    slot_idx = slot_of_hour[hours]
+    keep = (dish_idx >= 0) & (day_idx >= 0) & (day_idx < num_days)
+
+    # One bincount instead of a groupby over (dish, day, slot)
+    flat = (dish_idx[keep] * num_days + day_idx[keep]) * num_slots + slot_idx[keep]
+    size = len(dish_names) * num_days * num_slots
+    grid = np.bincount(flat, weights=df['quantity_sold'].to_numpy(dtype=np.float64)[keep],
+                       minlength=size).reshape(len(dish_names), num_days, num_slots)
+
+    # Days before a dish first sold are unknown, not zero
+    sold_days = np.where(grid.sum(axis=2) > 0, np.arange(num_days), num_days)
+    first_sale = sold_days.min(axis=1)
+
+    price = np.full(len(dish_names), np.nan)
+    if 'selling_price' in df.columns and keep.any():
+        price_sums = np.bincount(dish_idx[keep], weights=np.nan_to_num(df['selling_price'].to_numpy(dtype=np.float64)[keep]),
+                                 minlength=len(dish_names))
+        price_counts = np.bincount(dish_idx[keep], weights=df['selling_price'].notna().to_numpy()[keep],
+                                   minlength=len(dish_names))
+        price = np.where(price_counts > 0, price_sums / np.maximum(price_counts, 1), np.nan)
+
+    return {
+        'grid': grid.astype(np.float32),
+        'first_day': pd.Timestamp(first_day),
+        'dish_names': list(dish_names),
+        'first_sale': first_sale,
+        'price': price
+    }
+
+
+def _shift_days(values, lag, first_sale):
+    """values[:, t - lag], NaN where that day is before the dish's first sale"""
+    shifted = np.full_like(values, np.nan)
+    shifted[:, lag:] = values[:, :-lag]
+    days = np.arange(values.shape[1])
+    unknown = (days[None, :] - lag) < first_sale[:, None]
+    shifted[unknown] = np.nan
+    return shifted
+
+
+def _trailing_mean(values, window, first_sale):
+    """Mean of values[:, t-window .. t-1] over days since the first sale"""
+    num_dishes, num_days = values.shape[:2]
+    padded = np.zeros((num_dishes, num_days + 1) + values.shape[2:], dtype=np.float64)
+    padded[:, 1:] = values.cumsum(axis=1)
+
+    days = np.arange(num_days)
+    lo = np.maximum(days[None, :] - window, first_sale[:, None])
+    hi = np.broadcast_to(days[None, :], lo.shape)
+    counts = (hi - lo).astype(np.float64)
+
+    extra = (1,) * (values.ndim - 2)
+    sums = (np.take_along_axis(padded, hi.reshape(hi.shape + extra), axis=1)
+            - np.take_along_axis(padded, np.maximum(lo, 0).reshape(lo.shape + extra), axis=1))
+    counts = counts.reshape(counts.shape + extra)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(counts > 0, sums / counts, np.nan).astype(np.float32)
+
+
+def slot_features(grid_info, scheme, exogenous=None):
+    """
+    Feature tensor for every (dish, day, slot) cell of a grid
+
+    Every feature of day t uses only days before t, so the last grid day
+    can be an empty placeholder for the day being forecast. All features
+    are computed with whole-array shifts and cumulative sums, never per
+    dish or per slot.
+
+    Returns:
+        dict: {feature_name: (dishes x days x slots) array}
+    """
+    grid = grid_info['grid']
+    first_sale = grid_info['first_sale']
+    num_dishes, num_days, num_slots = grid.shape
+    dates = pd.date_range(grid_info['first_day'], periods=num_days, freq='D')
+
+    def per_day(values):
+        return np.broadcast_to(np.asarray(values, dtype=np.float32)[None, :, None], grid.shape)
+
+    def per_slot(values):
+        return np.broadcast_to(np.asarray(values, dtype=np.float32)[None, None, :], grid.shape)
+
+    slots = np.arange(num_slots)
+    daily = grid.sum(axis=2)
+    day_total_avg_7 = _trailing_mean(daily, 7, first_sale)
+    same_slot_avg_7 = _trailing_mean(grid, 7, first_sale)
+
+    # Same weekday, same slot over the last 4 weeks
+    weekly = np.stack([_shift_days(grid, 7 * k, first_sale) for k in range(1, 5)])
+    weeks_seen = (~np.isnan(weekly)).sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        same_weekday = np.where(weeks_seen > 0, np.nansum(weekly, axis=0) / weeks_seen, np.nan)
+        slot_share = same_slot_avg_7 / (day_total_avg_7[:, :, None] + 1e-6)
+
+    features = {
+        'slot': per_slot(slots),
+        'slot_sin': per_slot(np.sin(2 * np.pi * slots / num_slots)),
+        'slot_cos': per_slot(np.cos(2 * np.pi * slots / num_slots)),
+        'day_of_week': per_day(dates.dayofweek),
+        'is_weekend': per_day(dates.dayofweek >= 5),
+        'day_of_month': per_day(dates.day),
+        'month': per_day(dates.month),
+        'same_slot_lag_1': _shift_days(grid, 1, first_sale),
+        'same_slot_lag_7': _shift_days(grid, 7, first_sale),
+        'same_slot_avg_7': same_slot_avg_7,
+        'same_slot_avg_28': _trailing_mean(grid, 28, first_sale),
+        'same_weekday_slot_avg_4': same_weekday,
+        'day_total_lag_1': np.broadcast_to(_shift_days(daily, 1, first_sale)[:, :, None], grid.shape),
+        'day_total_avg_7': np.broadcast_to(day_total_avg_7[:, :, None], grid.shape),
+        'slot_share_7': slot_share,
+        'selling_price': np.broadcast_to(grid_info['price'].astype(np.float32)[:, None, None], grid.shape)
+    }
+
+    if exogenous is not None:
+        for name, values in exogenous.lookup(dates.to_numpy()).items():
+            features[name] = per_day(values)
+
+    return features
+
+
+def _frame(features, columns, mask):
+    """
+    Rows of the selected cells, one column per feature
+
+    Features the model knows but this process cannot build (e.g. a removed
+    exogenous file) are filled as missing.
+    """
+    missing = np.full(int(mask.sum()), np.nan)
+    return pd.DataFrame({col: features[col][mask] if col in features else missing for col in columns},
+                        copy=False)
+
+
+class SlotForecaster:
+    """
+    XGBoost model over (dish, day, slot) rows
+
+    Works alongside the daily model: it has its own artifacts, scheme and
+    feature list.
+    """
+
+    def __init__(self, scheme='meal', exogenous=None, timezone='UTC'):
+        if scheme not in SLOT_SCHEMES:
+            raise ValueError(f"Unknown slot scheme '{scheme}', expected one of {list(SLOT_SCHEMES)}")
+        self.scheme = scheme
+        # Timezone the training order times were converted to (see schemas)
+        self.timezone = timezone
+        self.exogenous = exogenous if exogenous is not None else load_exogenous_features()
+        self.model = None
+        self.feature_columns = SLOT_FEATURES + self.exogenous.feature_names
+        self.metrics = {}
+
+    @property
+    def slot_labels(self):
+        return SLOT_SCHEMES[self.scheme]['labels']
+
+    def build_training_matrix(self, data):
+        """
+        Returns:
+            tuple: (X DataFrame, y array, day index per row)
+        """
+        grid_info = slot_grid(data, self.scheme)
+        features = slot_features(grid_info, self.scheme, self.exogenous)
+
+        # Rows with at least a week of history for their dish
+        num_dishes, num_days, num_slots = grid_info['grid'].shape
+        days = np.arange(num_days)
+        usable = days[None, :] >= grid_info['first_sale'][:, None] + MIN_HISTORY_DAYS
+        mask = np.broadcast_to(usable[:, :, None], grid_info['grid'].shape)
+
+        X = _frame(features, self.feature_columns, mask)
+        y = grid_info['grid'][mask]
+        day_of_row = np.broadcast_to(days[None, :, None], mask.shape)[mask]
+        return X, y, day_of_row
+
+    def train(self, data, test_size=0.2, random_state=42):
+        """
+        Train on timestamped order lines
+
+        The test set is the last test_size share of days, so the split
+        never leaks future days into training.
+
+        Args:
+            data: pd.DataFrame with datetime 'date', dish_name, quantity_sold
+
+        Returns:
+            dict: Training metrics
+        """
+        print(f"Starting {self.scheme} slot model training...")
+        X, y, day_of_row = self.build_training_matrix(data)
+        if len(X) == 0:
+            raise ValueError(f"Need at least {MIN_HISTORY_DAYS + 1} days of history per dish")
+
+        split_day = np.quantile(day_of_row, 1 - test_size)
+        train_rows = day_of_row < split_day
+        if train_rows.all() or not train_rows.any():
+            train_rows = np.arange(len(X)) < int(len(X) * (1 - test_size))
+        X_train, X_test = X[train_rows], X[~train_rows]
+        y_train, y_test = y[train_rows], y[~train_rows]
+        print(f"Training set size: {len(X_train)}, Test set size: {len(X_test)}")
+
+        self.model = xgb.XGBRegressor(
+            objective='reg:squarederror',
+            n_estimators=300,
+            max_depth=6,
+            learning_rate=0.1,
+            subsample=0.8,
+            colsample_bytree=0.8,
+            min_child_weight=3,
+            random_state=random_state,
+            early_stopping_rounds=20,
+            n_jobs=-1
+        )
+        self.model.fit(X_train, y_train, eval_set=[(X_test, y_test)], verbose=False)
+
+        y_test_pred = self.model.predict(X_test)
+        self.metrics = {
+            'test_rmse': float(np.sqrt(mean_squared_error(y_test, y_test_pred))),
+            'test_mae': float(mean_absolute_error(y_test, y_test_pred)),
+            'train_size': len(X_train),
+            'test_size': len(X_test),
+            'num_features': len(self.feature_columns)
+        }
+        print(f"Slot model test RMSE: {self.metrics['test_rmse']:.2f}")
+        return self.metrics
+
+    def predict(self, historical_data, dish_names, prediction_date=None):
+        """
+        Forecast every slot of one day for many dishes in one model call
+
+        Args:
+            historical_data: pd.DataFrame of timestamped order lines
+            dish_names: list of str
+            prediction_date: datetime (default: tomorrow)
+
+        Returns:
+            dict: {dish_name: {slot_label: quantity}}; dishes without
+                  history are omitted
+        """
+        if self.model is None:
+            raise ValueError("Slot model not loaded")
+        if prediction_date is None:
+            prediction_date = datetime.now() + timedelta(days=1)
+        target_day = pd.Timestamp(prediction_date).normalize()
+
+        # History up to the day before, plus an empty column for the target day
+        history = historical_data[pd.to_datetime(historical_data['date']) < target_day]
+        grid_info = slot_grid(history, self.scheme, dish_names=list(dish_names), end_day=target_day)
+        features = slot_features(grid_info, self.scheme, self.exogenous)
+
+        known = grid_info['first_sale'] < grid_info['grid'].shape[1] - 1
+        mask = np.zeros(grid_info['grid'].shape, dtype=bool)
+        mask[known, -1, :] = True
+        if not mask.any():
+            return {}
+
+        X = _frame(features, self.feature_columns, mask).to_numpy(dtype=np.float32)
+        scores = np.maximum(self.model.predict(X), 0).reshape(-1, len(self.slot_labels))
+
+        names = np.array(grid_info['dish_names'])[known]
+        return {
+            name: {label: round(float(qty), 2) for label, qty in zip(self.slot_labels, row)}
+            for name, row in zip(names, scores)
+        }
+
+    def save(self, model_path='slot_model.pkl', metadata_path='slot_model_metadata.json'):
+        """Save the model and its scheme/feature metadata"""
+        if self.model is None:
+            raise ValueError("No trained slot model to save. Train the model first.")
+        joblib.dump(self.model, model_path)
+        with open(metadata_path, 'w') as f:
+            json.dump({
+                'scheme': self.scheme,
+                'timezone': self.timezone,
+                'feature_columns': self.feature_columns,
+                'metrics': self.metrics,
+                'timestamp': datetime.now().isoformat(),
+                'model_type': 'XGBRegressor'
+            }, f, indent=2)
+        print(f"Slot model saved to {model_path}")
+
+    @classmethod
+    def load(cls, model_path='slot_model.pkl', metadata_path='slot_model_metadata.json'):
+        """
+        Returns:
+            SlotForecaster: Forecaster with the saved scheme and features
+        """
+        with open(metadata_path, 'r') as f:
+            metadata = json.load(f)
+        forecaster = cls(metadata['scheme'], timezone=metadata.get('timezone', 'UTC'))
+        forecaster.model = joblib.load(model_path)
+        forecaster.feature_columns = metadata['feature_columns']
+        forecaster.metrics = metadata['metrics']
+        return forecaster
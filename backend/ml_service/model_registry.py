@@ -0,0 +1,217 @@
+"""
+Model Registry Module
+Per-restaurant models on disk, loaded lazily and kept under a memory budget
+"""
+
+import json
+import os
+import tempfile
+import threading
+from collections import Counter, OrderedDict
+from datetime import datetime
+
+
+# Root of the registry: registry.json plus one directory per model version
+MODEL_REGISTRY_DIR = os.environ.get('ML_MODEL_REGISTRY', 'models')
+
+REGISTRY_FILE = 'registry.json'
+MODEL_FILES = {
+    'model_path': 'model.pkl',
+    'metadata_path': 'model_metadata.json',
+    'arrays_path': 'model_arrays.joblib'
+}
+
+
+class ModelRegistry:
+    """
+    Maps restaurant ids to model versions and caches loaded planners
+
+    registry.json:
+        {"restaurants": {"<restaurant_id>": "<model dir>"}, "warm": [...]}
+
+    A model dir (relative to the root) holds model.pkl,
+    model_metadata.json and model_arrays.joblib. Several restaurants (a
+    chain) may share one dir and then share one loaded model. Models load
+    on first request; once the loaded models exceed the memory budget the
+    least recently used are dropped.
+    """
+
+    def __init__(self, root=MODEL_REGISTRY_DIR, loader=None, memory_budget_mb=512):
+        """
+        Args:
+            root: str, registry directory
+            loader: callable(model_path, metadata_path, arrays_path) -> planner
+            memory_budget_mb: float, cap on the summed model sizes
+        """
+        self.root = root
+        self.loader = loader
+        self.memory_budget = memory_budget_mb * 1024 * 1024
+
+        self._lock = threading.Lock()
+        self._loaded = OrderedDict()      # model dir -> (planner, bytes)
+        self._loading = {}                # model dir -> lock held while loading
+        self._mapping = {}
+        self._warm = []
+        self._mapping_mtime = None
+        self._requests = Counter()
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def _registry_path(self):
+        return os.path.join(self.root, REGISTRY_FILE)
+
+    def _read_mapping(self):
+        """Re-read registry.json when it changed on disk"""
+        try:
+            mtime = os.stat(self._registry_path()).st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime == self._mapping_mtime:
+            return
+        with open(self._registry_path()) as f:
+            registry = json.load(f)
+        self._mapping = registry.get('restaurants', {})
+        self._warm = registry.get('warm', [])
+        self._mapping_mtime = mtime
+
+    def resolve(self, restaurant_id):
+        """
+        Returns:
+            str: Model dir for the restaurant, or None to use the default model
+        """
+        if restaurant_id is None:
+            return None
+        with self._lock:
+            self._read_mapping()
+            return self._mapping.get(restaurant_id)
+
+    def model_paths(self, model_dir):
+        """Artifact paths of a model dir"""
+        return {key: os.path.join(self.root, model_dir, name) for key, name in MODEL_FILES.items()}
+
+    def get(self, restaurant_id):
+        """
+        Planner for a restaurant, loading its model on first use
+
+        Returns:
+            Planner, or None when the restaurant has no model of its own
+        """
+        model_dir = self.resolve(restaurant_id)
+        if model_dir is None:
+            return None
+        return self._get_model(model_dir)
+
+    def _get_model(self, model_dir, count=True):
+        with self._lock:
+            if count:
+                self._requests[model_dir] += 1
+            entry = self._loaded.get(model_dir)
+            if entry is not None:
+                self._loaded.move_to_end(model_dir)
+                self.stats['hits'] += 1
+                return entry[0]
+            loading = self._loading.setdefault(model_dir, threading.Lock())
+
+        # One thread loads a given model; others for it wait, the rest proceed
+        with loading:
+            with self._lock:
+                entry = self._loaded.get(model_dir)
+                if entry is not None:
+                    return entry[0]
+
+            paths = self.model_paths(model_dir)
+            planner = self.loader(**paths)
+            if getattr(planner, 'model', None) is None:
+                raise ValueError(f"Model {model_dir} could not be loaded")
+            size = os.path.getsize(paths['model_path'])
+
+            with self._lock:
+                self._loaded[model_dir] = (planner, size)
+                self._loading.pop(model_dir, None)
+                self.stats['misses'] += 1
+                self._evict()
+        return planner
+
+    def _evict(self):
+        """Drop least recently used models until under budget (keeps the newest)"""
+        while len(self._loaded) > 1 and self.memory_used() > self.memory_budget:
+            model_dir, _ = self._loaded.popitem(last=False)
+            self.stats['evictions'] += 1
+            print(f"Model registry: evicted {model_dir}")
+
+    def memory_used(self):
+        return sum(size for _, size in self._loaded.values())
+
+    def register(self, restaurant_id, model_dir):
+        """Point a restaurant at a model dir (atomic rewrite of registry.json)"""
+        with self._lock:
+            self._read_mapping()
+            mapping = dict(self._mapping, **{restaurant_id: model_dir})
+            os.makedirs(self.root, exist_ok=True)
+            # Unique temp file: another process may be registering at the same time
+            fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix=REGISTRY_FILE + '.', suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    json.dump({'restaurants': mapping, 'warm': self._warm}, f, indent=2)
+                os.replace(tmp_path, self._registry_path())
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+            self._read_mapping()
+
+    def new_model_dir(self, restaurant_id):
+        """
+        Returns:
+            tuple: (model dir relative to root, artifact paths), dir created
+        """
+        model_dir = os.path.join(restaurant_id, datetime.now().strftime('%Y%m%dT%H%M%S%f'))
+        os.makedirs(os.path.join(self.root, model_dir), exist_ok=True)
+        return model_dir, self.model_paths(model_dir)
+
+    def warm(self, limit):
+        """
+        Load the registry's 'warm' list, then the most requested models
+
+        Request counts are halved on every call, so "hot" follows recent
+        traffic rather than all-time totals. Warming stops at the memory
+        budget instead of evicting models it ranked higher.
+        """
+        with self._lock:
+            self._read_mapping()
+            pinned = [self._mapping[rid] for rid in self._warm if rid in self._mapping]
+            hot = [model_dir for model_dir, _ in self._requests.most_common(limit)]
+            self._requests = Counter({key: count // 2 for key, count in self._requests.items() if count > 1})
+
+        for model_dir in list(dict.fromkeys(pinned + hot))[:limit]:
+            if model_dir in self._loaded:
+                continue
+            try:
+                # Stop rather than evict a hotter model to make room
+                size = os.path.getsize(self.model_paths(model_dir)['model_path'])
+                if self._loaded and self.memory_used() + size > self.memory_budget:
+                    break
+                self._get_model(model_dir, count=False)
+            except Exception as e:
+                print(f"Model registry: could not warm {model_dir} - {e}")
+
+    def start_warmer(self, interval_s=60, limit=8):
+        """Warm hot models now and then every interval_s in a daemon thread"""
+        stop = threading.Event()
+
+        def run():
+            while not stop.is_set():
+                self.warm(limit)
+                stop.wait(interval_s)
+
+        threading.Thread(target=run, name='model-warmer', daemon=True).start()
+        return stop
+
+    def report(self):
+        """Loaded models, memory use and cache counters"""
+        with self._lock:
+            return {
+                'loaded': list(self._loaded),
+                'memory_mb': round(self.memory_used() / 1024 / 1024, 2),
+                'budget_mb': round(self.memory_budget / 1024 / 1024, 2),
+                'restaurants': len(self._mapping),
+                **self.stats
+            }
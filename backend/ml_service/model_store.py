@@ -0,0 +1,237 @@
+"""
+Model Store Module
+Stores model weights as memory-mappable NumPy arrays so that every
+worker process on a host shares the same pages
+"""
+
+import json
+import os
+import tempfile
+
+import joblib
+import numpy as np
+import pandas as pd
+
+
+def flatten_booster(model, feature_columns=None):
+    """
+    Flatten a trained XGBoost model into plain NumPy node arrays
+
+    All trees are concatenated into one set of node arrays. Child indices are
+    global (already offset by the tree's start), and leaves point to
+    themselves so that a fixed number of descent steps always ends on a leaf.
+    Children are stored interleaved (children[2 * node + went_right]), the
+    layout prediction gathers from, so a mapped file is used as-is.
+
+    Args:
+        model: xgb.XGBRegressor or xgb.Booster
+        feature_columns: list of str, feature order used at prediction time
+
+    Returns:
+        dict: Node arrays plus tree offsets, base score and feature order
+    """
+    booster = model.get_booster() if hasattr(model, 'get_booster') else model
+    learner = json.loads(booster.save_raw(raw_format='json'))['learner']
+    gbtree = learner['gradient_booster']['model']
+
+    # Only keep the trees the sklearn wrapper would use (early stopping)
+    num_iterations = len(gbtree['iteration_indptr']) - 1
+    best_iteration = getattr(model, 'best_iteration', None)
+    if best_iteration is not None:
+        num_iterations = min(num_iterations, best_iteration + 1)
+    trees = gbtree['trees'][:gbtree['iteration_indptr'][num_iterations]]
+
+    left, right, feature, threshold, default_left, value = [], [], [], [], [], []
+    tree_offsets = [0]
+    max_depth = 0
+
+    for tree in trees:
+        offset = tree_offsets[-1]
+        tree_left = np.asarray(tree['left_children'], dtype=np.int32)
+        tree_right = np.asarray(tree['right_children'], dtype=np.int32)
+        is_leaf = tree_left == -1
+        node_ids = np.arange(len(tree_left), dtype=np.int32)
+
+        # Leaves loop back onto themselves
+        left.append(np.where(is_leaf, node_ids, tree_left) + offset)
+        right.append(np.where(is_leaf, node_ids, tree_right) + offset)
+        feature.append(np.where(is_leaf, 0, tree['split_indices']).astype(np.int32))
+        conditions = np.asarray(tree['split_conditions'], dtype=np.float32)
+        threshold.append(np.where(is_leaf, np.float32(0), conditions))
+        default_left.append(np.asarray(tree['default_left'], dtype=bool))
+        value.append(np.where(is_leaf, conditions, np.float32(0)))
+
+        tree_offsets.append(offset + len(tree_left))
+        max_depth = max(max_depth, _tree_depth(tree_left, tree_right))
+
+    if feature_columns is None:
+        feature_columns = booster.feature_names or []
+
+    return {
+        'children': np.stack([np.concatenate(left), np.concatenate(right)], axis=1).ravel(),
+        'feature': np.concatenate(feature),
+        'threshold': np.concatenate(threshold),
+        'default_left': np.concatenate(default_left),
+        'value': np.concatenate(value),
+        'tree_offsets': np.asarray(tree_offsets, dtype=np.int64),
+        'base_score': float(learner['learner_model_param']['base_score']),
+        'max_depth': max_depth,
+        'feature_columns': list(feature_columns)
+    }
+
+
+def _tree_depth(left, right):
+    """Depth of a single tree given its child arrays"""
+    depth = 0
+    level = [0]
+    while level:
+        level = [child for node in level if left[node] != -1
+                 for child in (left[node], right[node])]
+        if level:
+            depth += 1
+    return depth
+
+
+def save_model_arrays(model, path, feature_columns=None):
+    """
+    Save a trained model as memory-mappable node arrays
+
+    The file is written uncompressed so that joblib can map the arrays
+    with mmap_mode='r' instead of copying them into each process.
+
+    Args:
+        model: xgb.XGBRegressor or xgb.Booster
+        path: str, destination file
+        feature_columns: list of str, feature order used at prediction time
+    """
+    arrays = flatten_booster(model, feature_columns)
+    _atomic_dump(arrays, path)
+    return arrays
+
+
+def _atomic_dump(obj, path):
+    """
+    Dump uncompressed and rename into place
+
+    Other workers may still have the old file mapped; truncating it in
+    place would crash them, so the new file always gets a fresh inode.
+    The temp file is unique per call, so concurrent saves (threads or
+    processes) never write into each other's file.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', prefix=os.path.basename(path) + '.',
+                                    suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            joblib.dump(obj, f, compress=0)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def load_model_arrays(path, mmap_mode='r'):
+    """
+    Load node arrays saved by save_model_arrays
+
+    Args:
+        path: str, file written by save_model_arrays
+        mmap_mode: str or None, passed to joblib.load
+
+    Returns:
+        TreeEnsemble: Read-only ensemble backed by the mapped arrays
+    """
+    return TreeEnsemble(joblib.load(path, mmap_mode=mmap_mode))
+
+
+def artifacts_available(path):
+    """Check whether a memory-mappable artifact exists"""
+    return path is not None and os.path.exists(path)
+
+
+class TreeEnsemble:
+    """
+    Read-only tree ensemble evaluated directly from flattened node arrays
+
+    All trees are walked together: each step advances one (row, tree) node
+    index matrix by one level, so a prediction costs max_depth vectorized
+    gathers instead of one Python-level call per tree.
+    """
+
+    # Rows evaluated per step; bounds the (rows, trees) index matrix
+    chunk_rows = 4096
+
+    def __init__(self, arrays):
+        if 'children' in arrays:
+            self.children = arrays['children']
+        else:
+            # Artifact from before children were stored: builds a private copy
+            self.children = np.stack([arrays['left'], arrays['right']], axis=1).ravel()
+        # Strided views, so no copy of the mapped array
+        self.left = self.children[0::2]
+        self.right = self.children[1::2]
+        self.feature = arrays['feature']
+        self.threshold = arrays['threshold']
+        self.default_left = arrays['default_left']
+        self.value = arrays['value']
+        self.tree_offsets = arrays['tree_offsets']
+        self.base_score = arrays['base_score']
+        self.max_depth = arrays['max_depth']
+        self.feature_columns = arrays['feature_columns']
+        self.roots = np.asarray(self.tree_offsets[:-1], dtype=np.int32)
+
+    @property
+    def num_trees(self):
+        return len(self.tree_offsets) - 1
+
+    def predict(self, X):
+        """
+        Predict with the same semantics as XGBRegressor.predict
+
+        Args:
+            X: pd.DataFrame or 2D array with columns in feature order
+
+        Returns:
+            np.ndarray: Predictions
+        """
+        if isinstance(X, pd.DataFrame):
+            X = X[self.feature_columns].to_numpy(dtype=np.float32)
+        return self.predict_array(X)
+
+    def predict_array(self, X):
+        """
+        Predict from a float32 array already ordered like feature_columns
+
+        Args:
+            X: 2D array, shape (rows, len(feature_columns))
+
+        Returns:
+            np.ndarray: float32 predictions
+        """
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+
+        out = np.empty(len(X), dtype=np.float32)
+        for start in range(0, len(X), self.chunk_rows):
+            stop = start + self.chunk_rows
+            out[start:stop] = self._predict_chunk(X[start:stop])
+        return out
+
+    def _predict_chunk(self, X):
+        """Walk every tree for a block of rows at once"""
+        num_rows, num_features = X.shape
+        flat_X = X.ravel()
+        row_base = (np.arange(num_rows, dtype=np.int32) * num_features)[:, None]
+
+        has_missing = np.isnan(X).any()
+
+        node = np.broadcast_to(self.roots, (num_rows, len(self.roots)))
+        for _ in range(self.max_depth):
+            x = flat_X[row_base + self.feature[node]]
+            went_right = ~(x < self.threshold[node])
+            if has_missing:
+                missing = np.isnan(x)
+                went_right[missing] = ~self.default_left[node[missing]]
+            node = self.children[2 * node + went_right]
+
+        return self.value[node].sum(axis=1, dtype=np.float32) + np.float32(self.base_score)
@@ -0,0 +1,249 @@
+"""
+Monitoring Module
+Tracks forecast accuracy and feature drift incrementally in constant memory
+"""
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+# Features whose live distribution is compared with training
+MONITORED_FEATURES = ['lag_1_days', 'lag_7_days', 'avg_last_7_days', 'avg_last_30_days', 'selling_price']
+
+# Histogram bins per monitored feature
+NUM_BINS = 10
+
+# (dish, day) rows remembered so re-scored rows are counted once; oldest forgotten first
+MAX_SEEN_ROWS = 100000
+
+
+def build_feature_reference(X, features=MONITORED_FEATURES, num_bins=NUM_BINS):
+    """
+    Summarize the training distribution of each monitored feature
+
+    Bin edges are training quantiles, so every bin holds roughly the same
+    share of training rows and the live histogram can be compared with it.
+
+    Args:
+        X: pd.DataFrame, training feature matrix
+        features: list of str, features to summarize
+        num_bins: int, histogram bins per feature
+
+    Returns:
+        dict: {feature: {'edges': [...], 'proportions': [...]}} (JSON-safe)
+    """
+    reference = {}
+    for feature in features:
+        if feature not in X.columns:
+            continue
+        values = X[feature].dropna().to_numpy(dtype=float)
+        if len(values) == 0:
+            continue
+
+        # Inner edges only; the outer bins are open-ended
+        edges = np.unique(np.quantile(values, np.linspace(0, 1, num_bins + 1)[1:-1]))
+        counts = np.bincount(np.searchsorted(edges, values, side='right'), minlength=len(edges) + 1)
+        reference[feature] = {
+            'edges': edges.tolist(),
+            'proportions': (counts / counts.sum()).tolist()
+        }
+    return reference
+
+
+def population_stability_index(expected, actual, eps=1e-4):
+    """
+    PSI between two binned distributions
+
+    Args:
+        expected: array of reference proportions
+        actual: array of live counts or proportions
+
+    Returns:
+        float: PSI (< 0.1 stable, 0.1-0.25 moderate shift, > 0.25 major shift)
+    """
+    expected = np.clip(np.asarray(expected, dtype=float), eps, None)
+    actual = np.asarray(actual, dtype=float)
+    actual = np.clip(actual / max(actual.sum(), 1), eps, None)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+
+class _DishAccuracy:
+    """Running forecast error for one dish"""
+
+    __slots__ = ('count', 'sum_error', 'sum_abs_error', 'ewm_error', 'ewm_abs_error')
+
+    def __init__(self):
+        self.count = 0
+        self.sum_error = 0.0
+        self.sum_abs_error = 0.0
+        self.ewm_error = 0.0
+        self.ewm_abs_error = 0.0
+
+    def update(self, error, alpha):
+        # Seed the moving averages with the first observation
+        weight = 1.0 if self.count == 0 else alpha
+        self.count += 1
+        self.sum_error += error
+        self.sum_abs_error += abs(error)
+        self.ewm_error += weight * (error - self.ewm_error)
+        self.ewm_abs_error += weight * (abs(error) - self.ewm_abs_error)
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'mae': round(self.sum_abs_error / self.count, 3),
+            'bias': round(self.sum_error / self.count, 3),
+            'recent_mae': round(self.ewm_abs_error, 3),
+            'recent_bias': round(self.ewm_error, 3)
+        }
+
+
+class ForecastMonitor:
+    """
+    Compares forecasts with actuals and live features with training
+
+    State is a fixed-size histogram per monitored feature plus a handful of
+    counters per dish, so memory does not grow with traffic. Each (dish,
+    day) feature row counts once, however often dashboards re-score it.
+    """
+
+    def __init__(self, alpha=0.1, psi_threshold=0.25, mae_factor=1.5, min_samples=30):
+        """
+        Args:
+            alpha: float, weight of the newest error in the recent MAE/bias
+            psi_threshold: float, PSI above which a feature counts as drifted
+            mae_factor: float, recent MAE this many times the test MAE flags a retrain
+            min_samples: int, observations needed before a signal can fire
+        """
+        self.alpha = alpha
+        self.psi_threshold = psi_threshold
+        self.mae_factor = mae_factor
+        self.min_samples = min_samples
+
+        self._lock = threading.Lock()
+        self.reference = {}
+        self.baseline_mae = None
+        self.feature_counts = {}
+        self.dishes = {}
+        self._seen_rows = OrderedDict()
+
+    def set_reference(self, metadata):
+        """
+        Reset live state against a newly loaded model's training summary
+
+        Args:
+            metadata: dict, model metadata with 'feature_reference' and 'metrics'
+        """
+        with self._lock:
+            self.reference = metadata.get('feature_reference', {})
+            self.baseline_mae = metadata.get('metrics', {}).get('test_mae')
+            self.feature_counts = {
+                feature: np.zeros(len(ref['proportions']), dtype=np.int64)
+                for feature, ref in self.reference.items()
+            }
+            self.dishes = {}
+            self._seen_rows = OrderedDict()
+
+    def _unseen(self, X):
+        """Rows of X whose (dish_name, day) is not yet counted (call with the lock held)"""
+        if 'dish_name' not in X.columns or 'date' not in X.columns:
+            return X
+        days = np.asarray(X['date'].to_numpy(), dtype='datetime64[D]')
+        keep = []
+        for position, key in enumerate(zip(X['dish_name'].to_numpy(), days)):
+            if key in self._seen_rows:
+                continue
+            self._seen_rows[key] = None
+            keep.append(position)
+        while len(self._seen_rows) > MAX_SEEN_ROWS:
+            self._seen_rows.popitem(last=False)
+        return X if len(keep) == len(X) else X.iloc[keep]
+
+    def observe_features(self, X):
+        """
+        Add scored feature rows to the live histograms
+
+        Args:
+            X: pd.DataFrame of feature rows sent to the model; rows for a
+               (dish_name, date) already observed are skipped
+        """
+        with self._lock:
+            X = self._unseen(X)
+            for feature, counts in self.feature_counts.items():
+                if feature not in X.columns:
+                    continue
+                values = X[feature].to_numpy(dtype=float)
+                values = values[~np.isnan(values)]
+                edges = self.reference[feature]['edges']
+                bins = np.searchsorted(edges, values, side='right')
+                counts += np.bincount(bins, minlength=len(counts))
+
+    def observe_actuals(self, records):
+        """
+        Ingest (forecast, actual) pairs
+
+        Args:
+            records: list of dict with 'dish_name', 'forecast' and 'actual'
+
+        Returns:
+            int: Number of pairs ingested
+        """
+        ingested = 0
+        with self._lock:
+            for record in records:
+                forecast = record.get('forecast')
+                actual = record.get('actual')
+                if record.get('dish_name') is None or forecast is None or actual is None:
+                    continue
+                dish = self.dishes.setdefault(record['dish_name'], _DishAccuracy())
+                dish.update(float(forecast) - float(actual), self.alpha)
+                ingested += 1
+        return ingested
+
+    def report(self):
+        """
+        Current accuracy, drift and the retrain-needed flag
+
+        Returns:
+            dict: JSON-safe monitoring report
+        """
+        with self._lock:
+            drift = {}
+            for feature, counts in self.feature_counts.items():
+                samples = int(counts.sum())
+                psi = None
+                if samples > 0:
+                    psi = round(population_stability_index(
+                        self.reference[feature]['proportions'], counts), 4)
+                drift[feature] = {
+                    'samples': samples,
+                    'psi': psi,
+                    'drifted': psi is not None and samples >= self.min_samples and psi > self.psi_threshold
+                }
+
+            dishes = {name: acc.to_dict() for name, acc in self.dishes.items()}
+            total = sum(acc.count for acc in self.dishes.values())
+            recent_mae = None
+            if total > 0:
+                recent_mae = round(sum(acc.ewm_abs_error * acc.count for acc in self.dishes.values()) / total, 3)
+
+        reasons = [f'{feature} drifted (PSI {info["psi"]})'
+                   for feature, info in drift.items() if info['drifted']]
+        if (recent_mae is not None and self.baseline_mae and total >= self.min_samples
+                and recent_mae > self.mae_factor * self.baseline_mae):
+            reasons.append(f'recent MAE {recent_mae} exceeds {self.mae_factor}x test MAE '
+                           f'{round(self.baseline_mae, 3)}')
+
+        return {
+            'retrain_needed': len(reasons) > 0,
+            'reasons': reasons,
+            'accuracy': {
+                'pairs': total,
+                'recent_mae': recent_mae,
+                'baseline_test_mae': self.baseline_mae,
+                'dishes': dishes
+            },
+            'drift': drift
+        }
@@ -0,0 +1,223 @@
+"""
+Plan Store Module
+Materializes next-day production plans in SQLite for millisecond reads
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from contextlib import closing
+from datetime import datetime, timedelta
+
+
+PLAN_DB_PATH = os.environ.get('ML_PLAN_DB', 'plans.db')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS plans (
+    restaurant_id TEXT NOT NULL,
+    plan_date TEXT NOT NULL,
+    input_hash TEXT NOT NULL,
+    plan TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    compute_ms REAL,
+    PRIMARY KEY (restaurant_id, plan_date)
+);
+CREATE TABLE IF NOT EXISTS inputs (
+    restaurant_id TEXT PRIMARY KEY,
+    payload TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+"""
+
+
+def input_fingerprint(data, model_version=None):
+    """
+    Stable hash of a /predict payload and the model that scores it
+
+    Key order does not matter, so the same inputs always map to the same
+    plan; retraining the model changes the hash and forces a recompute.
+    """
+    canonical = json.dumps({'data': data, 'model': model_version}, sort_keys=True,
+                           separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def next_plan_date(now=None):
+    """Date the /predict pipeline forecasts for (tomorrow)"""
+    return ((now or datetime.now()) + timedelta(days=1)).strftime('%Y-%m-%d')
+
+
+class PlanStore:
+    """
+    Precomputed production plans keyed by restaurant and date
+
+    Each restaurant's latest /predict payload is kept as well, so the
+    nightly job can rebuild every plan without reaching back into Mongo.
+    """
+
+    def __init__(self, path=PLAN_DB_PATH):
+        self.path = path
+        with closing(self._connect()) as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        # One short-lived connection per call keeps the store safe to share
+        # between Flask threads and the async server's workers
+        return sqlite3.connect(self.path, timeout=10)
+
+    def get(self, restaurant_id, plan_date=None):
+        """
+        Read a materialized plan
+
+        Args:
+            restaurant_id: str
+            plan_date: str, 'YYYY-MM-DD' (default: latest stored)
+
+        Returns:
+            dict or None: Plan with its date, input hash and creation time
+        """
+        query = 'SELECT plan_date, input_hash, plan, created_at, compute_ms FROM plans WHERE restaurant_id = ?'
+        params = [restaurant_id]
+        if plan_date:
+            query += ' AND plan_date = ?'
+            params.append(plan_date)
+        query += ' ORDER BY plan_date DESC LIMIT 1'
+
+        with closing(self._connect()) as conn:
+            row = conn.execute(query, params).fetchone()
+        if row is None:
+            return None
+
+        return {
+            'restaurant_id': restaurant_id,
+            'plan_date': row[0],
+            'input_hash': row[1],
+            'production_plan': json.loads(row[2]),
+            'created_at': row[3],
+            'compute_ms': row[4]
+        }
+
+    def put(self, restaurant_id, plan_date, input_hash, plan, compute_ms=None):
+        """Store (or replace) the plan for a restaurant and date"""
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO plans VALUES (?, ?, ?, ?, ?, ?)',
+                (restaurant_id, plan_date, input_hash, json.dumps(plan),
+                 datetime.now().isoformat(timespec='seconds'), compute_ms)
+            )
+
+    def save_inputs(self, restaurant_id, data):
+        """Remember the latest /predict payload for the nightly job"""
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO inputs VALUES (?, ?, ?)',
+                (restaurant_id, json.dumps(data, default=str), datetime.now().isoformat(timespec='seconds'))
+            )
+
+    def iter_inputs(self):
+        """Yield (restaurant_id, payload) for every restaurant seen so far"""
+        with closing(self._connect()) as conn:
+            restaurant_ids = [row[0] for row in conn.execute('SELECT restaurant_id FROM inputs')]
+        for restaurant_id in restaurant_ids:
+            with closing(self._connect()) as conn:
+                row = conn.execute('SELECT payload FROM inputs WHERE restaurant_id = ?',
+                                   (restaurant_id,)).fetchone()
+            if row:
+                yield restaurant_id, json.loads(row[0])
+
+    def prune(self, before_date):
+        """Drop plans dated before 'YYYY-MM-DD'; returns rows removed"""
+        with closing(self._connect()) as conn, conn:
+            return conn.execute('DELETE FROM plans WHERE plan_date < ?', (before_date,)).rowcount
+
+
+def materialize(store, restaurant_id, data, compute_plan, model_version=None,
+                plan_date=None, force=False):
+    """
+    Return the stored plan if its inputs are unchanged, otherwise recompute
+
+    Args:
+        store: PlanStore
+        restaurant_id: str
+        data: dict, /predict payload
+        compute_plan: callable, data -> production plan dict
+        model_version: str, changes whenever the model is retrained
+        plan_date: str, 'YYYY-MM-DD' (default: tomorrow)
+        force: bool, recompute even if the inputs match
+
+    Returns:
+        tuple: (stored plan dict, True if it was recomputed)
+    """
+    plan_date = plan_date or next_plan_date()
+    input_hash = input_fingerprint(data, model_version)
+
+    if not force:
+        stored = store.get(restaurant_id, plan_date)
+        if stored is not None and stored['input_hash'] == input_hash:
+            return stored, False
+
+    start_time = time.perf_counter()
+    plan = compute_plan(data)
+    compute_ms = round((time.perf_counter() - start_time) * 1000, 1)
+    store.put(restaurant_id, plan_date, input_hash, plan, compute_ms)
+    return store.get(restaurant_id, plan_date), True
+
+
+def run_nightly(store, compute_plan, model_version=None, snapshot_dir=None, keep_days=7):
+    """
+    Precompute tomorrow's plan for every known restaurant
+
+    Inputs come from the payloads saved by POST /plan/<restaurant_id>, or
+    from '<restaurant_id>.json' files in snapshot_dir when given.
+    model_version may be a callable of the restaurant id when restaurants
+    are served by models of their own.
+
+    Returns:
+        dict: Counts of recomputed, unchanged and failed restaurants
+    """
+    if snapshot_dir:
+        def sources():
+            for filename in sorted(os.listdir(snapshot_dir)):
+                if filename.endswith('.json'):
+                    with open(os.path.join(snapshot_dir, filename)) as f:
+                        yield filename[:-len('.json')], json.load(f)
+    else:
+        sources = store.iter_inputs
+
+    stats = {'recomputed': 0, 'unchanged': 0, 'failed': 0}
+    start_time = time.perf_counter()
+    for restaurant_id, data in sources():
+        try:
+            if isinstance(data, dict):
+                data = {**data, 'restaurant_id': restaurant_id}
+            version = model_version(restaurant_id) if callable(model_version) else model_version
+            _, recomputed = materialize(store, restaurant_id, data, compute_plan, version)
+            stats['recomputed' if recomputed else 'unchanged'] += 1
+        except Exception as e:
+            print(f"Plan for {restaurant_id} failed: {e}")
+            stats['failed'] += 1
+
+    stats['pruned'] = store.prune((datetime.now() - timedelta(days=keep_days)).strftime('%Y-%m-%d'))
+    stats['seconds'] = round(time.perf_counter() - start_time, 2)
+    return stats
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Precompute next-day production plans')
+    parser.add_argument('--db', default=PLAN_DB_PATH, help='SQLite plan store')
+    parser.add_argument('--snapshots', help='Directory of <restaurant_id>.json /predict payloads')
+    parser.add_argument('--keep-days', type=int, default=7, help='Days of old plans to keep')
+    args = parser.parse_args()
+
+    # Imported here so the store itself does not depend on Flask
+    from app import build_production_plan, planner_for
+
+    stats = run_nightly(PlanStore(args.db), build_production_plan,
+                        model_version=lambda restaurant_id: planner_for(restaurant_id).metadata.get('timestamp'),
+                        snapshot_dir=args.snapshots, keep_days=args.keep_days)
+    print(f"Plans: {stats['recomputed']} recomputed, {stats['unchanged']} unchanged, "
+          f"{stats['failed']} failed, {stats['pruned']} pruned in {stats['seconds']}s")
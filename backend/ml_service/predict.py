@@ -8,9 +8,18 @@ import numpy as np
 from datetime import datetime, timedelta
 import joblib
 import json
+import xgboost as xgb
+import threading
+import time
 
 from data_preprocessing import DataPreprocessor
 from feature_engineering import FeatureEngineer
+from inference import feature_matrix, load_bundle, score
+from batching import PredictionBatcher
+from monitoring import ForecastMonitor
+from cold_start import SimilarityIndexCache
+from explanations import summarize_contributions, tree_contributions
+from fallback import FallbackForecaster, TIER_COLD_START, TIER_MODEL, TIER_NO_HISTORY
 
 
 class ProductionPlanner:
@@ -18,12 +27,29 @@ class ProductionPlanner:
     Makes demand predictions and generates production plans
     """
     
-    def __init__(self, model_path='model.pkl', metadata_path='model_metadata.json'):
-        self.model = None
-        self.feature_columns = []
+    def __init__(self, model_path='model.pkl', metadata_path='model_metadata.json',
+                 arrays_path='model_arrays.joblib', use_mmap=False, inference_backend='xgboost',
+                 batch_window_ms=0, batch_max_rows=1024):
+        # Immutable ModelBundle, replaced as a whole by load_model
+        self.bundle = None
+        self.arrays_path = arrays_path
+        self.use_mmap = use_mmap
+        self.inference_backend = inference_backend
         self.preprocessor = DataPreprocessor()
         self.feature_engineer = FeatureEngineer()
-        self.metadata = {}
+        self.monitor = ForecastMonitor()
+        
+        # Booster for explaining compiled/mmap bundles, loaded on first use
+        self._explain_lock = threading.Lock()
+        self._explain_cache = (None, None)
+        
+        # Cold-start postings per menu, reused across requests
+        self.similarity_indexes = SimilarityIndexCache()
+        
+        # Coalesce rows from concurrent requests into one model call
+        self.batcher = None
+        if batch_window_ms > 0:
+            self.batcher = PredictionBatcher(score, batch_window_ms, batch_max_rows)
         
         # Load model if path exists
         try:
@@ -31,15 +57,90 @@ class ProductionPlanner:
         except Exception as e:
             print(f"Warning: Could not load model - {e}")
     
+    @property
+    def model(self):
+        return self.bundle.model if self.bundle is not None else None
+    
+    @property
+    def feature_columns(self):
+        return list(self.bundle.feature_columns) if self.bundle is not None else []
+    
+    @property
+    def metadata(self):
+        return self.bundle.metadata if self.bundle is not None else {}
+    
     def load_model(self, model_path, metadata_path):
-        """Load trained model and metadata"""
-        self.model = joblib.load(model_path)
+        """
+        Load trained model and metadata into a new bundle
+        
+        The bundle is built completely before it replaces the current one,
+        so requests in flight keep scoring with the bundle they started with.
+        """
+        bundle = load_bundle(model_path, metadata_path, self.arrays_path,
+                             use_mmap=self.use_mmap, inference_backend=self.inference_backend)
+        self.monitor.set_reference(bundle.metadata)
+        self.bundle = bundle
+        print(f"Model loaded successfully. Test RMSE: {bundle.metadata['metrics'].get('test_rmse', 'N/A')}")
+    
+    def _score(self, X_pred, bundle):
+        """
+        Score feature rows, through the micro-batcher when enabled
+        
+        Args:
+            X_pred: pd.DataFrame of engineered feature rows
+            bundle: ModelBundle taken at the start of the request
+            
+        Returns:
+            np.ndarray: Raw predictions
+        """
+        self.monitor.observe_features(X_pred)
+        X = feature_matrix(bundle, X_pred)
+        if self.batcher is not None:
+            return self.batcher.predict(X, bundle)
+        return score(bundle, X)
+    
+    def _explain(self, X_pred, bundle):
+        """
+        Top feature contributions for scored rows, in one batched call
         
-        with open(metadata_path, 'r') as f:
-            self.metadata = json.load(f)
+        Args:
+            X_pred: pd.DataFrame of engineered feature rows
+            bundle: ModelBundle the rows were scored with
+            
+        Returns:
+            list: One explanation dict per row
+        """
+        if isinstance(bundle.model, xgb.Booster):
+            model, iteration_range = bundle.model, bundle.iteration_range
+        else:
+            with self._explain_lock:
+                cached_bundle, model = self._explain_cache
+                if cached_bundle is not bundle:
+                    model = joblib.load(bundle.model_path)
+                    self._explain_cache = (bundle, model)
+            iteration_range = None
+        
+        X = feature_matrix(bundle, X_pred)
+        columns = list(bundle.feature_columns)
+        contributions = tree_contributions(model, X, columns, iteration_range)
+        return summarize_contributions(contributions, X, columns)
+    
+    def _build_features(self, historical_data, dish_name, prediction_date):
+        """
+        Build the engineered feature row for one dish
+        
+        Returns:
+            pd.DataFrame: Single feature row, or None if the dish has no history
+        """
+        pred_data = self.preprocessor.prepare_prediction_data(
+            historical_data, dish_name, prediction_date
+        )
         
-        self.feature_columns = self.metadata['feature_columns']
-        print(f"Model loaded successfully. Test RMSE: {self.metadata['metrics'].get('test_rmse', 'N/A')}")
+        if pred_data is None:
+            return None
+        
+        # Feature engineering
+        return self.feature_engineer.engineer_features(pred_data)
     
     def predict_demand(self, historical_data, dish_name, prediction_date=None):
         """
@@ -53,32 +154,24 @@ class ProductionPlanner:
         Returns:
             float: Predicted quantity
         """
-        if self.model is None:
+        bundle = self.bundle
+        if bundle is None:
             raise ValueError("Model not loaded. Cannot make predictions.")
         
         # Default to tomorrow
         if prediction_date is None:
             prediction_date = datetime.now() + timedelta(days=1)
         
-        # Prepare prediction data
-        pred_data = self.preprocessor.prepare_prediction_data(
-            historical_data, dish_name, prediction_date
-        )
+        pred_data = self._build_features(historical_data, dish_name, prediction_date)
         
         if pred_data is None:
             return 0
         
-        # Feature engineering
-        pred_data = self.feature_engineer.engineer_features(pred_data)
-        
-        # Select features
-        X_pred = pred_data[self.feature_columns]
-        
         # Make prediction
-        prediction = self.model.predict(X_pred)[0]
+        prediction = self._score(pred_data, bundle)[0]
         
-        # Ensure non-negative
-        prediction = max(0, prediction)
+        # Ensure non-negative (plain float so it serializes to JSON)
+        prediction = max(0.0, float(prediction))
         
         return round(prediction, 2)
     
@@ -238,35 +331,143 @@ class ProductionPlanner:
         
         return production_plan
     
-    def predict_all_dishes(self, historical_data, menu_items, prediction_date=None):
+    def predict_all_dishes(self, historical_data, menu_items, prediction_date=None, cold_start=True):
         """
         Predict demand for all dishes
         
+        Returns:
+            dict: {dish_name: predicted_quantity}
+        """
+        predictions, _, _ = self.forecast_all_dishes(historical_data, menu_items, prediction_date, cold_start)
+        return predictions
+    
+    def forecast_all_dishes(self, historical_data, menu_items, prediction_date=None, cold_start=True,
+                            budget_ms=None, explain=False):
+        """
+        Predict demand for all dishes through a chain of forecast tiers
+        
+        Feature rows for every dish with history are scored in one model call.
+        Dishes the model cannot serve (feature or scoring errors, no model,
+        or the latency budget running out) drop to seasonal exponential
+        smoothing, then to the global mean. New dishes without history
+        borrow demand from similar dishes.
+        
+        With explain, the feature matrix that was scored also gets its
+        tree contributions, so explanations cost one extra batched call.
+        
         Args:
             historical_data: pd.DataFrame with historical sales
             menu_items: list of dict with menu items
             prediction_date: datetime, date to predict for
+            cold_start: bool, estimate new dishes from similar ones instead of 0
+            budget_ms: float, time after which remaining dishes skip the model
+            explain: bool, add top feature contributions for model-served dishes
             
         Returns:
-            dict: {dish_name: predicted_quantity}
+            tuple: ({dish_name: predicted_quantity}, {dish_name: tier},
+                    {dish_name: explanation} for model-served dishes)
         """
+        # One bundle for the whole request, even if /train swaps it meanwhile
+        bundle = self.bundle
+        deadline = time.perf_counter() + budget_ms / 1000 if budget_ms else None
+        
+        def out_of_time():
+            return deadline is not None and time.perf_counter() > deadline
+        
+        if prediction_date is None:
+            prediction_date = datetime.now() + timedelta(days=1)
+        
         predictions = {}
+        tiers = {}
+        explanations = {}
+        new_items = []
+        fallback_items = []
+        known = set(pd.unique(historical_data['dish_name']))
+        
+        if bundle is None:
+            print("Warning: Model not loaded - using fallback forecasts for all dishes")
         
+        # Build every dish's feature row, then score them in one call
+        feature_rows = []
+        scored_items = []
         for item in menu_items:
             dish_name = item['name']
+            if dish_name not in known:
+                predictions[dish_name] = 0
+                tiers[dish_name] = TIER_NO_HISTORY
+                new_items.append(item)
+                continue
+            if bundle is None or out_of_time():
+                # Rows built so far are still scored in the one model call
+                fallback_items.append(item)
+                continue
             try:
-                pred = self.predict_demand(historical_data, dish_name, prediction_date)
-                predictions[dish_name] = pred
+                feature_rows.append(self._build_features(historical_data, dish_name, prediction_date))
+                scored_items.append(item)
             except Exception as e:
                 print(f"Warning: Could not predict for {dish_name} - {e}")
-                # Use average demand as fallback
-                dish_data = historical_data[historical_data['dish_name'] == dish_name]
-                if len(dish_data) > 0:
-                    predictions[dish_name] = dish_data['quantity_sold'].mean()
-                else:
-                    predictions[dish_name] = 0
+                fallback_items.append(item)
         
-        return predictions
+        if feature_rows:
+            X_pred = pd.concat(feature_rows, ignore_index=True)
+            try:
+                scores = self._score(X_pred, bundle)
+            except Exception as e:
+                print(f"Warning: Batch prediction failed - {e}")
+                fallback_items.extend(scored_items)
+            else:
+                for item, score in zip(scored_items, scores):
+                    predictions[item['name']] = round(max(0.0, float(score)), 2)
+                    tiers[item['name']] = TIER_MODEL
+                if explain:
+                    try:
+                        explanations = dict(zip((item['name'] for item in scored_items), self._explain(X_pred, bundle)))
+                    except Exception as e:
+                        print(f"Warning: Could not explain predictions - {e}")
+        
+        if fallback_items:
+            if bundle is not None:
+                print(f"Warning: {len(fallback_items)} dish(es) served by the fallback tiers")
+            fallback_predictions, fallback_tiers = self.fallback_forecasts(
+                historical_data, fallback_items, prediction_date
+            )
+            predictions.update(fallback_predictions)
+            tiers.update(fallback_tiers)
+        
+        if cold_start:
+            self._estimate_new_dishes(predictions, new_items, menu_items, tiers)
+        
+        # Keep menu order in the result
+        return ({item['name']: predictions[item['name']] for item in menu_items},
+                {item['name']: tiers[item['name']] for item in menu_items},
+                explanations)
+    
+    def fallback_forecasts(self, historical_data, menu_items, prediction_date):
+        """
+        Seasonal (or global mean) forecasts, all dishes in one grouped pass
+        
+        Returns:
+            tuple: ({dish_name: predicted_quantity}, {dish_name: tier})
+        """
+        forecaster = FallbackForecaster(historical_data, prediction_date)
+        return forecaster.forecast([item['name'] for item in menu_items])
+    
+    def _estimate_new_dishes(self, predictions, new_items, menu_items, tiers=None):
+        """Fill in new dishes from their nearest neighbours (in place)"""
+        if not new_items:
+            return
+        
+        new_names = {item['name'] for item in new_items}
+        known_demand = {name: qty for name, qty in predictions.items() if name not in new_names}
+        index = self.similarity_indexes.get(menu_items)
+        
+        for item in new_items:
+            estimate, neighbours = index.estimate(item, known_demand)
+            if estimate is not None:
+                predictions[item['name']] = estimate
+                if tiers is not None:
+                    tiers[item['name']] = TIER_COLD_START
+                print(f"Cold start: {item['name']} estimated at {estimate} from {neighbours}")
 
 
 # Example usage
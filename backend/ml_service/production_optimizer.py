@@ -0,0 +1,202 @@
+"""
+Production Optimizer Module
+Chooses dish production under ingredient stock and expiry constraints
+"""
+
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+
+# Never plan more than this multiple of forecast demand
+MAX_DEMAND_MULTIPLE = 1.2
+
+# Share of an ingredient's cost earned back when it goes into a sold portion
+# before it spoils; scaled by urgency, so always below the portion's cost
+EXPIRY_WEIGHT = 0.5
+
+# Interactive solve budget; near-optimal plans are fine for whole portions
+TIME_LIMIT_SECONDS = 2.0
+MIP_REL_GAP = 0.005
+
+# Ingredient cost share of the selling price, as in generate_production_plan
+COST_RATIO = 0.6
+
+
+def _normalize(name):
+    return str(name or '').strip().lower()
+
+
+def _inventory_batches(inventory_data, now):
+    """Stock batches with days left until expiry"""
+    batches = []
+    for item in inventory_data:
+        name = _normalize(item.get('ingredient') or item.get('itemName'))
+        if not name:
+            continue
+        days_left = np.inf
+        if item.get('expiryDate'):
+            expiry = pd.Timestamp(item['expiryDate']).tz_localize(None)
+            days_left = (expiry - now).total_seconds() / 86400
+        batches.append({
+            'ingredient': name,
+            'quantity': max(float(item.get('quantity') or 0), 0.0),
+            'days_left': days_left
+        })
+    return batches
+
+
+def optimize_production(predictions, menu_items, inventory_data, recipes, now=None):
+    """
+    Maximize expected profit from forecast demand under ingredient stock
+
+    Solved as one mixed-integer LP over the whole menu:
+
+        max  sum_d price_d * sales_d - cost_d * make_d + sum_b bonus_b * sold_b
+        s.t. sales_d <= make_d,  sales_d <= demand_d,  make_d <= 1.2 * demand_d
+             sum_d recipe[i, d] * make_d = sum_{b of ingredient i} use_b
+             sum_{b of ingredient i} sold_b <= sum_d recipe[i, d] * sales_d
+             0 <= sold_b <= use_b <= stock_b  (0 for expired batches)
+             make_d integer
+
+    sold_b is the part of a batch that ends up in sold portions. Its bonus
+    is a share of the ingredient's cost per unit, growing as the batch
+    nears expiry, so near-expiry stock is used first and dishes that
+    consume it are favoured. Only sold portions earn it, and it is worth
+    less than the portion's cost, so it never pays to make more than demand.
+
+    Args:
+        predictions: dict, {dish_name: forecast demand}
+        menu_items: list of dict with 'name' and 'price'
+        inventory_data: list of dict with 'ingredient'/'itemName', 'quantity', 'expiryDate'
+        recipes: dict, {dish_name: {ingredient: quantity per portion}}
+        now: datetime, reference time for expiry (default: now)
+
+    Returns:
+        dict: Per-dish production, per-ingredient usage and expected profit
+    """
+    from scipy.optimize import Bounds, LinearConstraint, milp
+    from scipy.sparse import coo_matrix, hstack
+
+    start_time = time.perf_counter()
+    now = pd.Timestamp(now or datetime.now())
+
+    price_of = {item['name']: float(item.get('price') or 0) for item in menu_items}
+    dishes = [name for name in predictions if name in recipes or name in price_of]
+    if not dishes:
+        return {'dishes': [], 'ingredients': [], 'untracked_ingredients': [],
+                'expected_profit': 0, 'status': 'No dishes to plan', 'solve_ms': 0}
+    demand = np.array([max(float(predictions[name]), 0.0) for name in dishes])
+    price = np.array([price_of.get(name, 0.0) for name in dishes])
+    cost = price * COST_RATIO
+
+    batches = _inventory_batches(inventory_data, now)
+    tracked = sorted({b['ingredient'] for b in batches})
+    ingredient_index = {name: i for i, name in enumerate(tracked)}
+
+    # Recipe matrix (ingredients x dishes); untracked ingredients are not limiting
+    rows, cols, amounts, untracked = [], [], [], set()
+    for d, dish in enumerate(dishes):
+        for ingredient, amount in (recipes.get(dish) or {}).items():
+            i = ingredient_index.get(_normalize(ingredient))
+            if i is None:
+                untracked.add(_normalize(ingredient))
+                continue
+            rows.append(i)
+            cols.append(d)
+            amounts.append(float(amount))
+    num_dishes, num_ingredients, num_batches = len(dishes), len(tracked), len(batches)
+    R = coo_matrix((amounts, (rows, cols)), shape=(num_ingredients, num_dishes))
+
+    batch_ingredient = np.array([ingredient_index[b['ingredient']] for b in batches], dtype=int)
+    stock = np.array([b['quantity'] for b in batches])
+    days_left = np.array([b['days_left'] for b in batches])
+    usable = np.where(days_left >= 0, stock, 0.0)
+    urgency = 1.0 / (1.0 + np.clip(days_left, 0, None))
+
+    # Cost per ingredient unit: each dish's cost spread over its recipe units,
+    # cheapest dish using the ingredient, so one unit is never worth more than
+    # its share of any portion it goes into
+    dense_R = R.toarray()
+    recipe_units = dense_R.sum(axis=0)
+    portion_unit_cost = cost / np.where(recipe_units > 0, recipe_units, 1)
+    unit_cost = np.where(dense_R > 0, portion_unit_cost[None, :], np.inf).min(axis=1)
+    unit_cost = np.where(np.isfinite(unit_cost), unit_cost, 0.0)
+    bonus = EXPIRY_WEIGHT * urgency * unit_cost[batch_ingredient]
+
+    # Variables: [make (dishes), sales (dishes), use (batches), sold (batches)]
+    c = np.concatenate([cost, -price, np.zeros(num_batches), -bonus])
+    B = coo_matrix((np.ones(num_batches), (batch_ingredient, np.arange(num_batches))),
+                   shape=(num_ingredients, num_batches))
+    eye = coo_matrix(np.eye(num_dishes))
+    batch_eye = coo_matrix(np.eye(num_batches))
+
+    constraints = [
+        # sales - make <= 0
+        LinearConstraint(hstack([-eye, eye, coo_matrix((num_dishes, 2 * num_batches))]).tocsr(),
+                         -np.inf, 0),
+    ]
+    if num_ingredients:
+        # recipe usage equals stock drawn from batches
+        constraints.append(LinearConstraint(
+            hstack([R, coo_matrix((num_ingredients, num_dishes)), -B,
+                    coo_matrix((num_ingredients, num_batches))]).tocsr(), 0, 0))
+        # stock credited as sold is at most what sold portions contain
+        constraints.append(LinearConstraint(
+            hstack([coo_matrix((num_ingredients, num_dishes)), -R,
+                    coo_matrix((num_ingredients, num_batches)), B]).tocsr(), -np.inf, 0))
+        # ... and at most what was drawn from each batch
+        constraints.append(LinearConstraint(
+            hstack([coo_matrix((num_batches, 2 * num_dishes)), -batch_eye, batch_eye]).tocsr(), -np.inf, 0))
+
+    bounds = Bounds(
+        np.zeros(2 * num_dishes + 2 * num_batches),
+        np.concatenate([np.floor(demand * MAX_DEMAND_MULTIPLE + 1e-9), demand, usable, usable])
+    )
+    integrality = np.concatenate([np.ones(num_dishes), np.zeros(num_dishes + 2 * num_batches)])
+
+    result = milp(c, constraints=constraints, bounds=bounds, integrality=integrality,
+                  options={'time_limit': TIME_LIMIT_SECONDS, 'mip_rel_gap': MIP_REL_GAP})
+    if result.x is None:
+        raise RuntimeError(f'Production optimization failed: {result.message}')
+
+    make = np.round(result.x[:num_dishes])
+    sales = result.x[num_dishes:2 * num_dishes]
+    use = result.x[2 * num_dishes:2 * num_dishes + num_batches]
+
+    used = np.bincount(batch_ingredient, weights=use, minlength=num_ingredients)
+    available = np.bincount(batch_ingredient, weights=usable, minlength=num_ingredients)
+    near_expiry = days_left <= 3
+    near_expiry_used = np.bincount(batch_ingredient[near_expiry], weights=use[near_expiry],
+                                   minlength=num_ingredients)
+    exhausted = {tracked[i] for i in range(num_ingredients) if used[i] >= available[i] - 1e-6}
+
+    dish_plans = []
+    for d, dish in enumerate(dishes):
+        needs = {tracked[i] for i in np.flatnonzero(dense_R[:, d] > 0)}
+        dish_plans.append({
+            'dish_name': dish,
+            'forecast_demand': round(float(demand[d]), 1),
+            'optimized_production': int(make[d]),
+            'expected_sales': round(float(sales[d]), 1),
+            'limited_by': sorted(needs & exhausted) if make[d] < np.floor(demand[d]) else []
+        })
+
+    ingredient_plans = [{
+        'ingredient': tracked[i],
+        'available': round(float(available[i]), 2),
+        'used': round(float(used[i]), 2),
+        'near_expiry_used': round(float(near_expiry_used[i]), 2),
+        'left': round(float(available[i] - used[i]), 2)
+    } for i in range(num_ingredients)]
+
+    return {
+        'dishes': dish_plans,
+        'ingredients': ingredient_plans,
+        'untracked_ingredients': sorted(untracked),
+        'expected_profit': round(float(price @ sales - cost @ make), 2),
+        'status': result.message,
+        'solve_ms': round((time.perf_counter() - start_time) * 1000, 1)
+    }
@@ -0,0 +1,202 @@
+"""
+Sampling Profiler Module
+On-demand stack sampling with collapsed (flamegraph-ready) output
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+
+DEFAULT_INTERVAL_MS = 5
+MAX_SECONDS = 60
+
+# Pipeline stages, recognised from the code on the stack. Nothing in the
+# request path is instrumented, so profiling costs nothing while it is off.
+STAGE_FUNCTIONS = {
+    'forecast_all_dishes': 'forecast',
+    'predict_demand': 'forecast',
+    'prepare_prediction_data': 'prepare',
+    'engineer_features': 'features',
+    'feature_matrix': 'score',
+    'score': 'score',
+    '_score': 'score',
+    '_explain': 'explain',
+    'generate_production_plan': 'plan'
+}
+STAGE_MODULES = {
+    'schemas.py': 'parse',
+    'fallback.py': 'fallback',
+    'cold_start.py': 'cold_start',
+    'explanations.py': 'explain',
+    'reconciliation.py': 'reconcile',
+    'production_optimizer.py': 'optimize',
+    'donation_allocator.py': 'donations'
+}
+
+# A thread whose innermost Python frame is in one of these is waiting, not
+# working (thread.py: an idle executor worker; profiler.py: the request
+# sleeping through a profiling window)
+IDLE_MODULES = {'threading.py', 'thread.py', 'selectors.py', 'socketserver.py', 'socket.py', 'queue.py',
+                'base_events.py', 'profiler.py'}
+
+
+def _stage_of(code, filename):
+    return STAGE_FUNCTIONS.get(code.co_name) or STAGE_MODULES.get(filename)
+
+
+def collapse_frame(frame):
+    """
+    One collapsed stack line (root first, ';'-separated)
+
+    A '[stage]' frame is inserted wherever the pipeline stage changes, so
+    the flamegraph groups time by stage.
+
+    Returns:
+        tuple: (stack string, innermost stage or None, innermost file name)
+    """
+    frames = []
+    while frame is not None:
+        frames.append(frame.f_code)
+        frame = frame.f_back
+
+    parts = []
+    stage = None
+    filename = None
+    for code in reversed(frames):
+        filename = os.path.basename(code.co_filename)
+        frame_stage = _stage_of(code, filename)
+        if frame_stage is not None and frame_stage != stage:
+            stage = frame_stage
+            parts.append(f'[{stage}]')
+        parts.append(f'{code.co_name} ({filename})')
+    return ';'.join(parts), stage, filename
+
+
+class SamplingProfiler:
+    """
+    Samples thread stacks from a background thread
+
+    Every interval the sampler reads sys._current_frames() and counts each
+    thread's stack. The profiled code runs unmodified; the only cost is
+    the sampler taking the GIL to walk stacks (about 5% at 5 ms on one
+    core, see `benchmark.py profile`). Samples land
+    where threads hold the GIL, so time inside native code that releases
+    it (XGBoost scoring) shows up as the Python frame that called it.
+    """
+
+    def __init__(self, interval_ms=DEFAULT_INTERVAL_MS, thread_ids=None, include_idle=False):
+        """
+        Args:
+            interval_ms: float, time between samples
+            thread_ids: set of thread idents to sample (default: all but the sampler)
+            include_idle: bool, also count threads blocked waiting
+        """
+        self.interval = interval_ms / 1000
+        self.thread_ids = thread_ids
+        self.include_idle = include_idle
+        self.stacks = Counter()
+        self.stages = Counter()
+        self.samples = 0
+        self.elapsed = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+        self._started = None
+
+    def _sample(self):
+        sampler = threading.get_ident()
+        for ident, frame in sys._current_frames().items():
+            if ident == sampler or (self.thread_ids is not None and ident not in self.thread_ids):
+                continue
+            stack, stage, filename = collapse_frame(frame)
+            if not self.include_idle and filename in IDLE_MODULES:
+                continue
+            self.stacks[stack] += 1
+            self.stages[stage or 'other'] += 1
+        self.samples += 1
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self):
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.elapsed = time.perf_counter() - self._started
+        return self
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def collapsed(self):
+        """Stacks in collapsed format ('frame;frame;frame count' per line)"""
+        return '\n'.join(f'{stack} {count}' for stack, count in self.stacks.most_common())
+
+    def report(self):
+        """
+        Returns:
+            dict: Sample counts, share of samples per stage and the collapsed stacks
+        """
+        total = sum(self.stages.values()) or 1
+        return {
+            'seconds': round(self.elapsed, 3),
+            'interval_ms': self.interval * 1000,
+            'samples': self.samples,
+            'stages': {stage: round(count / total, 3) for stage, count in self.stages.most_common()},
+            'collapsed': self.collapsed()
+        }
+
+
+def profile_for(seconds, interval_ms=DEFAULT_INTERVAL_MS):
+    """Sample every thread of the process for a fixed window (blocks)"""
+    profiler = SamplingProfiler(interval_ms)
+    with profiler:
+        time.sleep(min(seconds, MAX_SECONDS))
+    return profiler
+
+
+def profile_call(fn, *args, interval_ms=DEFAULT_INTERVAL_MS):
+    """
+    Run fn(*args) with only the calling thread sampled
+
+    Returns:
+        tuple: (fn's result, SamplingProfiler)
+    """
+    profiler = SamplingProfiler(interval_ms, thread_ids={threading.get_ident()})
+    with profiler:
+        result = fn(*args)
+    return result, profiler
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Profile predict_all_dishes on sample data')
+    parser.add_argument('--interval-ms', type=float, default=DEFAULT_INTERVAL_MS)
+    parser.add_argument('--out', default='predict.collapsed', help='collapsed stacks for flamegraph.pl/speedscope')
+    args = parser.parse_args()
+
+    import pandas as pd
+    from predict import ProductionPlanner
+
+    planner = ProductionPlanner()
+    history = pd.read_csv('sample_training_data.csv')
+    menu = [{'name': name} for name in history['dish_name'].unique()]
+    _, profiler = profile_call(planner.predict_all_dishes, history, menu, interval_ms=args.interval_ms)
+
+    with open(args.out, 'w') as f:
+        f.write(profiler.collapsed() + '\n')
+    print(f"{profiler.samples} samples in {profiler.elapsed:.2f}s written to {args.out}")
+    for stage, share in profiler.report()['stages'].items():
+        print(f"  {stage:>10}: {share:.1%}")
@@ -0,0 +1,171 @@
+"""
+Hierarchical Reconciliation Module
+Makes dish, category and restaurant forecasts add up consistently
+"""
+
+import numpy as np
+import pandas as pd
+
+
+# Days of aggregated history used for base forecasts and variances
+HISTORY_WINDOW = 28
+
+# Dishes with fewer observed days get their variance floored and inflated
+MIN_OBSERVED_DAYS = 7
+
+
+def build_hierarchy(menu_items):
+    """
+    Build the summing matrix for restaurant -> category -> dish
+
+    Args:
+        menu_items: list of dict with 'name' and optional 'category'
+
+    Returns:
+        tuple: (S matrix (levels x dishes), row labels, dish names)
+    """
+    dish_names = list(dict.fromkeys(item['name'] for item in menu_items))
+    category_of = {item['name']: item.get('category') or 'Other' for item in menu_items}
+    categories = sorted(set(category_of.values()))
+
+    dish_categories = np.array([category_of[name] for name in dish_names])
+    S = np.vstack([
+        np.ones((1, len(dish_names))),
+        (dish_categories[None, :] == np.array(categories)[:, None]).astype(float),
+        np.eye(len(dish_names))
+    ])
+    labels = ([('restaurant', 'total')] + [('category', c) for c in categories]
+              + [('dish', d) for d in dish_names])
+
+    return S, labels, dish_names
+
+
+def daily_matrix(historical_data, dish_names, end_date, window=HISTORY_WINDOW):
+    """
+    Daily sales as a (dishes x days) matrix over the trailing window
+
+    Args:
+        historical_data: pd.DataFrame with date, dish_name, quantity_sold
+        dish_names: list of str, row order
+        end_date: pd.Timestamp, last day of the window (inclusive)
+        window: int, number of days
+
+    Returns:
+        tuple: (sales matrix with 0 for days without sales, observed-day mask)
+    """
+    days = pd.date_range(end=end_date.normalize(), periods=window, freq='D')
+    history = historical_data[['date', 'dish_name', 'quantity_sold']].copy()
+    history['date'] = pd.to_datetime(history['date']).dt.normalize()
+
+    # observed=True: a categorical dish_name must not expand to every (dish, date) pair
+    daily = history.groupby(['dish_name', 'date'], observed=True)['quantity_sold'].sum()
+    daily = daily.unstack('date').reindex(index=dish_names, columns=days)
+
+    observed = daily.notna().to_numpy()
+    return daily.fillna(0).to_numpy(dtype=float), observed
+
+
+def seasonal_base_forecast(Y, prediction_date, days):
+    """
+    Base forecast per row: blend of the last-7-day mean and the mean of
+    the same weekday over the window
+
+    Args:
+        Y: (series x days) matrix
+        prediction_date: datetime
+        days: pd.DatetimeIndex matching Y's columns
+
+    Returns:
+        np.ndarray: One forecast per series
+    """
+    recent = Y[:, -7:].mean(axis=1)
+    same_weekday = Y[:, days.dayofweek == pd.Timestamp(prediction_date).dayofweek]
+    if same_weekday.shape[1] == 0:
+        return recent
+    return 0.5 * recent + 0.5 * same_weekday.mean(axis=1)
+
+
+def reconcile(base, S, variances):
+    """
+    Weighted least-squares reconciliation
+
+    Finds the coherent set of forecasts (every aggregate equals the sum of
+    its dishes) closest to the base forecasts, trusting low-variance series
+    more: bottom = (S'WS)^-1 S'W base with W = diag(1 / variance).
+
+    Args:
+        base: (levels,) base forecasts in S row order
+        S: (levels x dishes) summing matrix
+        variances: (levels,) forecast error variance per series
+
+    Returns:
+        np.ndarray: Reconciled forecasts for every level
+    """
+    W = 1.0 / np.maximum(variances, 1e-6)
+    StW = S.T * W
+    bottom = np.linalg.solve(StW @ S, StW @ base)
+
+    # Negative dish demand is meaningless; clip and re-aggregate to stay coherent
+    bottom = np.maximum(bottom, 0)
+    return S @ bottom
+
+
+def reconcile_forecasts(predictions, historical_data, menu_items, prediction_date):
+    """
+    Reconcile dish forecasts with category and restaurant totals
+
+    Dish base forecasts come from the model; category and restaurant base
+    forecasts come from their own aggregated history. Series with few
+    observations or noisy history get a high variance, so sparse dishes
+    borrow strength from their category.
+
+    Args:
+        predictions: dict, {dish_name: predicted_quantity}
+        historical_data: pd.DataFrame with historical sales
+        menu_items: list of dict with 'name' and 'category'
+        prediction_date: datetime, date being forecast
+
+    Returns:
+        tuple: (reconciled {dish_name: quantity}, hierarchy summary dict)
+    """
+    S, labels, dish_names = build_hierarchy(menu_items)
+    days = pd.date_range(end=pd.Timestamp(prediction_date).normalize() - pd.Timedelta(days=1),
+                         periods=HISTORY_WINDOW, freq='D')
+
+    Y_dish, observed = daily_matrix(historical_data, dish_names, days[-1])
+    Y = S @ Y_dish
+
+    base = seasonal_base_forecast(Y, prediction_date, days)
+    num_dishes = len(dish_names)
+    base[-num_dishes:] = [float(predictions.get(name, 0)) for name in dish_names]
+
+    # Variance of each series' daily values
+    variances = Y.var(axis=1) + 1.0
+    dish_variances = variances[-num_dishes:]
+    
+    # A mostly-zero dish has a tiny sample variance, which would make it the
+    # most trusted series. Floor sparse dishes at the largest dish variance
+    # in their category (and the category's per-dish share) before inflating,
+    # so they, not the dense dishes, absorb the correction.
+    membership = S[1:-num_dishes]
+    category_floor = np.maximum((membership * dish_variances).max(axis=1),
+                                variances[1:-num_dishes] / membership.sum(axis=1))
+    floor = (membership * category_floor[:, None]).max(axis=0)
+    observed_days = observed.sum(axis=1)
+    sparse = observed_days < MIN_OBSERVED_DAYS
+    sparsity = MIN_OBSERVED_DAYS / np.clip(observed_days, 1, MIN_OBSERVED_DAYS)
+    dish_variances[sparse] = np.maximum(dish_variances[sparse], floor[sparse]) * sparsity[sparse]
+
+    reconciled = reconcile(base, S, variances)
+
+    hierarchy = {'restaurant': None, 'categories': []}
+    for (level, name), base_value, value in zip(labels, base, reconciled):
+        entry = {'base_forecast': round(float(base_value), 1), 'reconciled': round(float(value), 1)}
+        if level == 'restaurant':
+            hierarchy['restaurant'] = entry
+        elif level == 'category':
+            hierarchy['categories'].append({'category': name, **entry})
+
+    dish_forecasts = {name: round(float(value), 2)
+                      for name, value in zip(dish_names, reconciled[-num_dishes:])}
+    return dish_forecasts, hierarchy
@@ -0,0 +1,238 @@
+"""
+Response Format Module
+Field projection, columnar layout, compression and streaming for plan responses
+"""
+
+import json
+import os
+import re
+import zlib
+from dataclasses import dataclass
+
+from schemas import SchemaError
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+# Compression effort (1 fastest .. 9 smallest); bodies below the floor go uncompressed
+GZIP_LEVEL = int(os.environ.get('ML_GZIP_LEVEL', 6))
+ZSTD_LEVEL = int(os.environ.get('ML_ZSTD_LEVEL', 3))
+MIN_COMPRESS_BYTES = 1024
+
+# Streamed lists are encoded this many rows per C-encoder call
+STREAM_BATCH_ROWS = 256
+STREAM_CHUNK_BYTES = 64 * 1024
+
+MAX_FIELDS = 100
+FIELD_PATTERN = re.compile(r'[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)*')
+LAYOUTS = ('rows', 'columnar')
+
+# Compact separators; encode() takes the one-shot C encoder path
+_encoder = json.JSONEncoder(separators=(',', ':'))
+
+
+@dataclass(frozen=True)
+class ResponseOptions:
+    """
+    How a caller wants a plan response
+
+    Attributes:
+        fields: dict tree of kept keys ({key: subtree or None for all}), or None
+        columnar: bool, turn lists of dicts into {column: [values]}
+        encoding: 'zstd', 'gzip' or None
+        stream: bool, send the body in chunks as it is encoded
+    """
+    fields: dict = None
+    columnar: bool = False
+    encoding: str = None
+    stream: bool = False
+
+
+def _field_tree(value):
+    """'summary,predictions.dish_name' -> {'summary': None, 'predictions': {'dish_name': None}}"""
+    paths = [path.strip() for path in value.split(',') if path.strip()]
+    if len(paths) > MAX_FIELDS:
+        raise SchemaError([{'field': 'fields', 'record': None, 'value': str(len(paths)),
+                            'error': f'at most {MAX_FIELDS} fields'}])
+
+    tree = {}
+    for path in paths:
+        if not FIELD_PATTERN.fullmatch(path):
+            raise SchemaError([{'field': 'fields', 'record': None, 'value': path[:50],
+                                'error': 'must be dot-separated names'}])
+        node = tree
+        *parents, leaf = path.split('.')
+        for key in parents:
+            if key in node and node[key] is None:
+                break  # an ancestor is already kept whole
+            node = node.setdefault(key, {})
+        else:
+            node[leaf] = None
+    return tree
+
+
+def _negotiate_encoding(accept_encoding):
+    """Best supported coding from an Accept-Encoding header"""
+    accepted = set()
+    for token in (accept_encoding or '').split(','):
+        coding, _, params = token.strip().partition(';')
+        if params.replace(' ', '') in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            continue
+        accepted.add(coding.strip().lower())
+    if zstandard is not None and 'zstd' in accepted:
+        return 'zstd'
+    if 'gzip' in accepted:
+        return 'gzip'
+    return None
+
+
+def parse_response_options(query, accept_encoding=None):
+    """
+    Read response options from the query string and Accept-Encoding
+
+    Query:
+        fields: comma-separated keys of production_plan to keep; dotted
+                paths select inside nested objects and lists of objects
+                (e.g. predictions.dish_name)
+        layout: 'rows' (default) or 'columnar'
+        stream: '1' to stream the body
+
+    Returns:
+        ResponseOptions
+
+    Raises:
+        SchemaError: If an option is malformed
+    """
+    fields = query.get('fields')
+    layout = query.get('layout', 'rows')
+    if layout not in LAYOUTS:
+        raise SchemaError([{'field': 'layout', 'record': None, 'value': str(layout)[:50],
+                            'error': f'must be one of {", ".join(LAYOUTS)}'}])
+    return ResponseOptions(
+        fields=_field_tree(fields) if fields else None,
+        columnar=layout == 'columnar',
+        encoding=_negotiate_encoding(accept_encoding),
+        stream=query.get('stream') in ('1', 'true')
+    )
+
+
+def project(value, tree):
+    """Keep only the keys in tree; lists are projected item by item"""
+    if tree is None:
+        return value
+    if isinstance(value, dict):
+        return {key: project(value[key], subtree) for key, subtree in tree.items() if key in value}
+    if isinstance(value, list):
+        if all(subtree is None for subtree in tree.values()):
+            # Flat selection from row dicts, the common case: one comprehension per row
+            keys = list(tree)
+            return [{key: row[key] for key in keys if key in row} if isinstance(row, dict) else row
+                    for row in value]
+        return [project(item, tree) for item in value]
+    return value
+
+
+def to_columnar(value):
+    """
+    Lists of dicts become {column: [values]}, recursively through dicts
+
+    Columns are the union of row keys in first-seen order; rows missing a
+    key get null. Each key is sent once instead of once per row.
+    """
+    if isinstance(value, dict):
+        return {key: to_columnar(item) for key, item in value.items()}
+    if isinstance(value, list) and value and all(isinstance(row, dict) for row in value):
+        columns = list(dict.fromkeys(key for row in value for key in row))
+        return {column: [row.get(column) for row in value] for column in columns}
+    return value
+
+
+def shape_body(body, options):
+    """Apply projection and layout to a response's production_plan"""
+    plan = body.get('production_plan')
+    if plan is None or (options.fields is None and not options.columnar):
+        return body
+    if options.fields is not None:
+        plan = project(plan, options.fields)
+    if options.columnar:
+        plan = to_columnar(plan)
+    return {**body, 'production_plan': plan}
+
+
+def _compressor(encoding):
+    if encoding == 'zstd':
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+    # wbits 31: gzip container
+    return zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+
+def content_headers(options, encoded=True):
+    headers = {'Content-Type': 'application/json', 'Vary': 'Accept-Encoding'}
+    if options.encoding and encoded:
+        headers['Content-Encoding'] = options.encoding
+    return headers
+
+
+def encode_body(body, options):
+    """
+    Serialize (and compress) a whole body
+
+    Returns:
+        tuple: (bytes, headers)
+    """
+    data = _encoder.encode(body).encode()
+    if options.encoding is None or len(data) < MIN_COMPRESS_BYTES:
+        return data, content_headers(options, encoded=False)
+    compressor = _compressor(options.encoding)
+    return compressor.compress(data) + compressor.flush(), content_headers(options)
+
+
+def iter_json(value, depth=3):
+    """
+    JSON text of value in pieces, identical to the one-shot encoding
+
+    Containers are opened down to depth; long lists are then encoded
+    STREAM_BATCH_ROWS at a time, so a large plan never exists as one
+    string and the first bytes leave before the last row is encoded.
+    """
+    if depth > 0 and isinstance(value, dict) and value and all(isinstance(key, str) for key in value):
+        separator = '{'
+        for key, item in value.items():
+            yield separator + _encoder.encode(key) + ':'
+            yield from iter_json(item, depth - 1)
+            separator = ','
+        yield '}'
+    elif depth > 0 and isinstance(value, list) and len(value) > STREAM_BATCH_ROWS:
+        for start in range(0, len(value), STREAM_BATCH_ROWS):
+            batch = _encoder.encode(value[start:start + STREAM_BATCH_ROWS])
+            yield ('[' if start == 0 else ',') + batch[1:-1]
+        yield ']'
+    else:
+        yield _encoder.encode(value)
+
+
+def iter_encoded(body, options):
+    """Body as (compressed) byte chunks of about STREAM_CHUNK_BYTES; headers from content_headers"""
+    compressor = _compressor(options.encoding) if options.encoding else None
+    pending = []
+    size = 0
+    for text in iter_json(body):
+        pending.append(text)
+        size += len(text)
+        if size < STREAM_CHUNK_BYTES:
+            continue
+        chunk = ''.join(pending).encode()
+        pending, size = [], 0
+        if compressor is not None:
+            chunk = compressor.compress(chunk)
+        if chunk:
+            yield chunk
+
+    chunk = ''.join(pending).encode()
+    if compressor is not None:
+        chunk = compressor.compress(chunk) + compressor.flush()
+    if chunk:
+        yield chunk
@@ -0,0 +1,484 @@
+"""
+Request Schema Module
+Validates API payloads and converts them once into fixed-dtype frames
+"""
+
+import re
+from datetime import datetime, timedelta, timezone as fixed_timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import infer_dtype
+
+
+# Column -> dtype of every sales frame handed to the planner or trainer
+SALES_SCHEMA = {
+    'date': 'datetime64[ns]',
+    'dish_name': 'category',
+    'quantity_sold': 'float32',
+    'selling_price': 'float32',
+    'cost_price': 'float32'
+}
+
+REQUIRED_SALES_COLUMNS = ('date', 'dish_name', 'quantity_sold')
+
+# infer_dtype results that need no per-value checks
+NUMERIC_KINDS = {'integer', 'floating', 'mixed-integer-float', 'empty'}
+STRING_KINDS = {'string', 'empty'}
+
+# Restaurant ids route to per-restaurant model directories
+RESTAURANT_ID_PATTERN = re.compile(r'[A-Za-z0-9_-]{1,64}')
+
+# '+05:30' style fixed offsets (IANA names like 'Asia/Kolkata' also accepted)
+UTC_OFFSET_PATTERN = re.compile(r'([+-])(\d{2}):?(\d{2})')
+
+# Date strings that carry their own offset ('Z', '+05:30', '-0800')
+OFFSET_SUFFIX_PATTERN = re.compile(r'(?:Z|[+-]\d{2}:?\d{2})$', re.IGNORECASE)
+
+# Errors listed in a response; the total count is always reported
+MAX_REPORTED_ERRORS = 20
+
+
+class SchemaError(ValueError):
+    """
+    Payload failed validation
+
+    Attributes:
+        errors: list of {'field', 'record', 'value', 'error'}, capped
+        total: int, number of invalid values found
+    """
+
+    def __init__(self, errors, total=None):
+        self.errors = errors[:MAX_REPORTED_ERRORS]
+        self.total = total if total is not None else len(errors)
+        first = self.errors[0]
+        location = first['field'] if first.get('record') is None else f"{first['field']}[{first['record']}]"
+        super().__init__(f"{self.total} invalid value(s); first: {location} {first['error']}")
+
+    def to_dict(self):
+        """Body of the 400 response"""
+        return {
+            'success': False,
+            'error': str(self),
+            'invalid_count': self.total,
+            'details': self.errors
+        }
+
+
+def _require_object(data):
+    if not isinstance(data, dict):
+        raise SchemaError([{'field': 'body', 'record': None, 'value': type(data).__name__,
+                            'error': 'must be a JSON object'}])
+
+
+def _require_list(data, field):
+    """Return data[field] as a list (missing means empty)"""
+    value = data.get(field)
+    if value is None:
+        return []
+    if not isinstance(value, list):
+        raise SchemaError([{'field': field, 'record': None, 'value': type(value).__name__,
+                            'error': 'must be a list'}])
+    return value
+
+
+def _require_records(records, field):
+    """Every element must be a JSON object"""
+    if set(map(type, records)) <= {dict}:
+        return
+    bad = [i for i, record in enumerate(records) if not isinstance(record, dict)]
+    if bad:
+        raise SchemaError([{'field': field, 'record': i, 'value': repr(records[i])[:50],
+                            'error': 'must be an object'} for i in bad[:MAX_REPORTED_ERRORS]], len(bad))
+
+
+def _collect(errors, field, mask, raw, message):
+    """Append one error per flagged record, keeping the total count"""
+    flagged = np.flatnonzero(mask)
+    room = MAX_REPORTED_ERRORS - len(errors['items'])
+    for i in flagged[:max(room, 0)]:
+        value = raw[i]
+        errors['items'].append({'field': field, 'record': int(i),
+                                'value': None if value is None else str(value)[:50], 'error': message})
+    errors['total'] += len(flagged)
+
+
+def _is_missing(raw):
+    return np.array([value is None or value == '' for value in raw], dtype=bool)
+
+
+def _numeric_column(raw, field, required, errors, minimum=None):
+    """Convert one column of JSON values to float32, flagging bad values"""
+    column = np.array(raw, dtype=object)
+    if infer_dtype(column, skipna=False) in NUMERIC_KINDS:
+        # Fast path: every value is already a JSON number
+        values = column.astype(np.float64)
+        missing = wrong_type = np.zeros(len(raw), dtype=bool)
+    else:
+        missing = _is_missing(raw)
+        # Strings, bools and containers are not numbers even if pandas could coerce them
+        wrong_type = np.array([not (gone or (isinstance(value, (int, float)) and not isinstance(value, bool)))
+                               for value, gone in zip(raw, missing)], dtype=bool)
+        values = np.array([np.nan if bad or gone else value
+                           for value, bad, gone in zip(raw, wrong_type, missing)], dtype=np.float64)
+
+    non_finite = ~missing & ~wrong_type & ~np.isfinite(values)
+    _collect(errors, field, wrong_type, raw, 'must be a number')
+    _collect(errors, field, non_finite, raw, 'must be finite')
+    if required:
+        _collect(errors, field, missing, raw, 'is required')
+    if minimum is not None:
+        _collect(errors, field, values < minimum, raw, f'must be >= {minimum}')
+
+    return values.astype(np.float32)
+
+
+def timezone_info(name):
+    """
+    tzinfo for an IANA name or a '+05:30' offset
+
+    Raises:
+        ValueError: If the name is neither
+    """
+    match = UTC_OFFSET_PATTERN.fullmatch(name)
+    if match:
+        sign, hours, minutes = match.groups()
+        offset = timedelta(hours=int(hours), minutes=int(minutes))
+        return fixed_timezone(-offset if sign == '-' else offset)
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f"Unknown timezone '{name}'")
+
+
+def parse_timezone(value, field='timezone'):
+    """Optional timezone name, validated (None when absent)"""
+    if value is None:
+        return None
+    try:
+        if not isinstance(value, str):
+            raise ValueError
+        timezone_info(value)
+    except ValueError:
+        raise SchemaError([{'field': field, 'record': None, 'value': str(value)[:50],
+                            'error': "must be an IANA timezone or an offset like '+05:30'"}])
+    return value
+
+
+def _date_column(raw, field, required, errors, timezone=None):
+    """
+    Parse ISO date strings to datetime64[ns], flagging unparseable ones
+
+    Strings with an offset are stored as naive UTC, or as naive local time
+    in timezone when one is given. Strings without an offset are kept as
+    written.
+    """
+    strings = np.array(raw, dtype=object)
+    if infer_dtype(strings, skipna=False) in STRING_KINDS:
+        missing = strings == ''
+        wrong_type = np.zeros(len(raw), dtype=bool)
+    else:
+        missing = _is_missing(raw)
+        wrong_type = np.array([not (gone or isinstance(value, str))
+                               for value, gone in zip(raw, missing)], dtype=bool)
+        strings = np.array([None if gone or bad else value for value, gone, bad in zip(raw, missing, wrong_type)],
+                           dtype=object)
+
+    # Sales repeat the same few hundred dates, so parse each distinct string once
+    codes, uniques = pd.factorize(strings)
+    # utc=True: mixed naive / offset strings still give one datetime column;
+    # offsets are converted and everything is stored as naive UTC
+    uniques = pd.Series(uniques, dtype=object)
+    parsed = pd.to_datetime(uniques, format='ISO8601', errors='coerce', utc=True)
+    if timezone is not None and len(parsed):
+        # Instants with an offset move to local wall time; naive strings already are
+        has_offset = uniques.str.strip().str.contains(OFFSET_SUFFIX_PATTERN, na=False).to_numpy()
+        local = parsed.dt.tz_convert(timezone_info(timezone)).dt.tz_localize(None)
+        parsed = parsed.dt.tz_convert(None).where(~has_offset, local)
+    else:
+        parsed = parsed.dt.tz_convert(None)
+    # Code -1 (missing) picks the trailing NaT
+    dates = np.append(parsed.to_numpy(dtype='datetime64[ns]'), np.datetime64('NaT', 'ns'))[codes]
+
+    unparseable = ~missing & ~wrong_type & np.isnat(dates)
+    _collect(errors, field, wrong_type, raw, 'must be a date string')
+    _collect(errors, field, unparseable, raw, 'is not an ISO date')
+    if required:
+        _collect(errors, field, missing, raw, 'is required')
+
+    return dates
+
+
+def _name_column(raw, field, required, errors):
+    """Dish names as a categorical column"""
+    column = np.array(raw, dtype=object)
+    if infer_dtype(column, skipna=False) in STRING_KINDS:
+        codes, uniques = pd.factorize(column)
+        names = pd.Categorical.from_codes(codes, categories=uniques)
+        # Blank names are checked once per distinct name, not once per record
+        blank_codes = np.flatnonzero(names.categories.str.strip() == '')
+        missing = np.isin(names.codes, blank_codes)
+        wrong_type = np.zeros(len(raw), dtype=bool)
+    else:
+        missing = np.array([value is None or (isinstance(value, str) and not value.strip())
+                            for value in raw], dtype=bool)
+        wrong_type = np.array([not (gone or isinstance(value, str))
+                               for value, gone in zip(raw, missing)], dtype=bool)
+        codes, uniques = pd.factorize(np.array(
+            [value if isinstance(value, str) and not gone else None for value, gone in zip(raw, missing)],
+            dtype=object))
+        names = pd.Categorical.from_codes(codes, categories=uniques)
+
+    _collect(errors, field, wrong_type, raw, 'must be a string')
+    if required:
+        _collect(errors, field, missing, raw, 'is required')
+    return names
+
+
+def sales_frame(records, field='historical_data', timezone=None):
+    """
+    Validate sales records and build a fixed-dtype frame in one pass
+
+    Each column is pulled out of the records once and converted with a
+    single vectorized call, so later stages never re-parse dates or
+    compare object strings.
+
+    Args:
+        records: list of dict with date, dish_name, quantity_sold and
+                 optional selling_price, cost_price
+        field: str, payload field name used in error messages
+        timezone: str, convert timestamps with an offset to this local time
+
+    Returns:
+        pd.DataFrame: Columns and dtypes of SALES_SCHEMA
+
+    Raises:
+        SchemaError: If any record is malformed
+    """
+    _require_records(records, field)
+    errors = {'items': [], 'total': 0}
+
+    def column(name):
+        return [record.get(name) for record in records]
+
+    columns = {
+        'date': _date_column(column('date'), f'{field}.date', True, errors, timezone),
+        'dish_name': _name_column(column('dish_name'), f'{field}.dish_name', True, errors),
+        'quantity_sold': _numeric_column(column('quantity_sold'), f'{field}.quantity_sold',
+                                         True, errors, minimum=0),
+        'selling_price': _numeric_column(column('selling_price'), f'{field}.selling_price',
+                                         False, errors, minimum=0),
+        'cost_price': _numeric_column(column('cost_price'), f'{field}.cost_price',
+                                      False, errors, minimum=0)
+    }
+
+    if errors['total']:
+        raise SchemaError(errors['items'], errors['total'])
+
+    return pd.DataFrame(columns, copy=False)
+
+
+def validate_menu_items(items, field='menu_items'):
+    """
+    Check menu items: a non-empty unique 'name' and a non-negative price
+
+    Returns:
+        list: The items, unchanged
+    """
+    _require_records(items, field)
+    errors = {'items': [], 'total': 0}
+
+    names = [item.get('name') for item in items]
+    _collect(errors, f'{field}.name',
+             [not (isinstance(name, str) and name.strip()) for name in names], names, 'is required')
+    seen = set()
+    duplicate = []
+    for name in names:
+        duplicate.append(name in seen)
+        seen.add(name)
+    _collect(errors, f'{field}.name', duplicate, names, 'is duplicated')
+    _numeric_column([item.get('price') for item in items], f'{field}.price', False, errors, minimum=0)
+
+    if errors['total']:
+        raise SchemaError(errors['items'], errors['total'])
+    return items
+
+
+def validate_inventory(items, field='inventory_data'):
+    """
+    Check inventory items: numeric quantity, parseable expiry date
+
+    Returns:
+        list: The items, unchanged
+    """
+    _require_records(items, field)
+    errors = {'items': [], 'total': 0}
+
+    _numeric_column([item.get('quantity') for item in items], f'{field}.quantity', False, errors)
+    _date_column([item.get('expiryDate') for item in items], f'{field}.expiryDate', False, errors)
+
+    if errors['total']:
+        raise SchemaError(errors['items'], errors['total'])
+    return items
+
+
+def parse_date(value, field):
+    """Parse an optional ISO date; None passes through"""
+    if value is None:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise SchemaError([{'field': field, 'record': None, 'value': str(value)[:50],
+                            'error': 'is not an ISO date'}])
+
+
+def parse_restaurant_id(value, field='restaurant_id'):
+    """Optional restaurant id; also used as a directory name, so kept to [A-Za-z0-9_-]"""
+    if value is None:
+        return None
+    if not (isinstance(value, str) and RESTAURANT_ID_PATTERN.fullmatch(value)):
+        raise SchemaError([{'field': field, 'record': None, 'value': str(value)[:50],
+                            'error': 'must be 1-64 letters, digits, "_" or "-"'}])
+    return value
+
+
+def parse_budget_ms(value, field='latency_budget_ms'):
+    """Parse an optional positive latency budget in milliseconds"""
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not value > 0:
+        raise SchemaError([{'field': field, 'record': None, 'value': str(value)[:50],
+                            'error': 'must be a positive number'}])
+    return float(value)
+
+
+def parse_profile_payload(data, max_seconds):
+    """
+    Validate a /admin/profile body (may be empty)
+
+    Returns:
+        tuple: (seconds, interval_ms)
+    """
+    data = data or {}
+    _require_object(data)
+    seconds = parse_budget_ms(data.get('seconds'), 'seconds') or 10.0
+    interval_ms = parse_budget_ms(data.get('interval_ms'), 'interval_ms') or 5.0
+    if seconds > max_seconds:
+        raise SchemaError([{'field': 'seconds', 'record': None, 'value': str(seconds),
+                            'error': f'must be at most {max_seconds}'}])
+    if interval_ms < 1:
+        raise SchemaError([{'field': 'interval_ms', 'record': None, 'value': str(interval_ms),
+                            'error': 'must be at least 1'}])
+    return seconds, interval_ms
+
+
+def parse_actuals_payload(data):
+    """
+    Validate a /monitor/actuals body
+
+    Each record needs a 'dish_name' and numeric 'forecast' and 'actual'
+    (>= 0); 'date' is optional but must be an ISO date when given.
+
+    Returns:
+        tuple: (records, unchanged; restaurant id or None)
+    """
+    _require_object(data)
+    records = _require_list(data, 'records')
+    _require_records(records, 'records')
+    errors = {'items': [], 'total': 0}
+
+    names = [record.get('dish_name') for record in records]
+    _collect(errors, 'records.dish_name',
+             [not (isinstance(name, str) and name.strip()) for name in names], names, 'is required')
+    _numeric_column([record.get('forecast') for record in records], 'records.forecast', True, errors)
+    _numeric_column([record.get('actual') for record in records], 'records.actual', True, errors, minimum=0)
+    _date_column([record.get('date') for record in records], 'records.date', False, errors)
+
+    if errors['total']:
+        raise SchemaError(errors['items'], errors['total'])
+    return records, parse_restaurant_id(data.get('restaurant_id'))
+
+
+def parse_predict_payload(data):
+    """
+    Validate a /predict (or /plan) body
+
+    Returns:
+        tuple: (sales frame, menu_items, inventory_data)
+    """
+    _require_object(data)
+    history = sales_frame(_require_list(data, 'historical_data'))
+    menu_items = validate_menu_items(_require_list(data, 'menu_items'))
+    inventory_data = validate_inventory(_require_list(data, 'inventory_data'))
+    return history, menu_items, inventory_data
+
+
+def parse_dish_payload(data):
+    """
+    Validate a /predict/dish/<dish_name> body
+
+    Returns:
+        tuple: (sales frame, prediction date or None)
+    """
+    _require_object(data)
+    history = sales_frame(_require_list(data, 'historical_data'))
+    return history, parse_date(data.get('prediction_date'), 'prediction_date')
+
+
+def parse_training_payload(data):
+    """Validate a /train body into a sales frame"""
+    _require_object(data)
+    return sales_frame(_require_list(data, 'training_data'), 'training_data')
+
+
+def _slot_scheme(data, field='scheme'):
+    """Optional slot scheme name, 'meal' by default"""
+    scheme = data.get(field, 'meal')
+    if scheme not in ('meal', 'hourly'):
+        raise SchemaError([{'field': field, 'record': None, 'value': str(scheme)[:50],
+                            'error': "must be 'meal' or 'hourly'"}])
+    return scheme
+
+
+def parse_slot_training_payload(data, default_timezone='UTC'):
+    """
+    Validate a /train/slots body; dates carry the order time
+
+    Slots are local meal times, so order times with an offset (e.g. from
+    toISOString) are converted to the restaurant's 'timezone' first.
+
+    Returns:
+        tuple: (sales frame in local time, slot scheme, timezone)
+    """
+    _require_object(data)
+    timezone = parse_timezone(data.get('timezone')) or default_timezone
+    history = sales_frame(_require_list(data, 'training_data'), 'training_data', timezone)
+    return history, _slot_scheme(data), timezone
+
+
+def parse_slot_predict_payload(data, default_timezone='UTC'):
+    """
+    Validate a /predict/slots body
+
+    Args:
+        default_timezone: str, used when the body has no 'timezone'
+                          (the slot model's training timezone)
+
+    Returns:
+        tuple: (sales frame in local time, dish names or None, naive local
+               prediction date or None)
+    """
+    _require_object(data)
+    timezone = parse_timezone(data.get('timezone')) or default_timezone
+    history = sales_frame(_require_list(data, 'historical_data'), timezone=timezone)
+    dishes = data.get('dishes')
+    if dishes is not None and not (isinstance(dishes, list) and all(isinstance(d, str) for d in dishes)):
+        raise SchemaError([{'field': 'dishes', 'record': None, 'value': repr(dishes)[:50],
+                            'error': 'must be a list of strings'}])
+    prediction_date = parse_date(data.get('prediction_date'), 'prediction_date')
+    if prediction_date is not None and prediction_date.tzinfo is not None:
+        # Same wall-clock convention as the order times above
+        prediction_date = prediction_date.astimezone(timezone_info(timezone)).replace(tzinfo=None)
+    return history, dishes, prediction_date
@@ -0,0 +1,9 @@
+"""
+Test Configuration
+Puts the service modules (flat, imported by name) on the import path
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,79 @@
+"""
+Micro-Batching Tests
+Batched results match scoring each caller's rows alone
+"""
+
+import threading
+
+import numpy as np
+import pytest
+
+from batching import PredictionBatcher
+
+
+class LinearModel:
+    def __init__(self, weights):
+        self.weights = np.asarray(weights, dtype=np.float32)
+
+
+def linear_score(model, X):
+    return X @ model.weights
+
+
+def run_concurrently(batcher, requests):
+    """requests: list of (X, model); returns each caller's predictions"""
+    results = [None] * len(requests)
+    start = threading.Barrier(len(requests))
+
+    def call(i, X, model):
+        start.wait()
+        results[i] = batcher.predict(X, model)
+
+    threads = [threading.Thread(target=call, args=(i, X, model)) for i, (X, model) in enumerate(requests)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_batched_matches_unbatched():
+    rng = np.random.default_rng(0)
+    model = LinearModel([1.0, -2.0, 0.5])
+    requests = [(rng.random((rows, 3), dtype=np.float32), model) for rows in (1, 5, 2, 8, 3, 1)]
+    batcher = PredictionBatcher(linear_score, window_ms=50)
+
+    results = run_concurrently(batcher, requests)
+
+    for (X, _), result in zip(requests, results):
+        np.testing.assert_allclose(result, linear_score(model, X), rtol=1e-6)
+    assert batcher.rows_scored == 20
+    assert batcher.batches_scored < len(requests)
+
+
+def test_rows_scored_with_their_own_model():
+    X = np.ones((2, 3), dtype=np.float32)
+    old, new = LinearModel([1, 1, 1]), LinearModel([2, 2, 2])
+    batcher = PredictionBatcher(linear_score, window_ms=50)
+
+    results = run_concurrently(batcher, [(X, old), (X, new), (X, old)])
+
+    np.testing.assert_array_equal(results[0], [3, 3])
+    np.testing.assert_array_equal(results[1], [6, 6])
+    np.testing.assert_array_equal(results[2], [3, 3])
+
+
+def test_full_batch_scores_without_waiting_out_the_window():
+    batcher = PredictionBatcher(linear_score, window_ms=10000, max_rows=4)
+    X = np.ones((4, 3), dtype=np.float32)
+
+    np.testing.assert_array_equal(batcher.predict(X, LinearModel([1, 0, 0])), [1, 1, 1, 1])
+
+
+def test_scoring_errors_reach_every_caller():
+    def failing_score(model, X):
+        raise RuntimeError('booster gone')
+
+    batcher = PredictionBatcher(failing_score, window_ms=1)
+    with pytest.raises(RuntimeError, match='booster gone'):
+        batcher.predict(np.ones((1, 3), dtype=np.float32), LinearModel([1, 1, 1]))
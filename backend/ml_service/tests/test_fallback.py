@@ -0,0 +1,52 @@
+"""
+Fallback Forecaster Tests
+Seasonal and global-mean tiers for dishes the model does not serve
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from fallback import TIER_GLOBAL, TIER_SEASONAL, FallbackForecaster
+
+
+def weekly_history(weeks=8):
+    """Chai sells 10 on weekdays and 20 on weekends; Dosa a flat 6"""
+    days = pd.date_range('2024-01-01', periods=7 * weeks)  # starts on a Monday
+    rows = []
+    for day in days:
+        rows.append({'date': day, 'dish_name': 'Chai', 'quantity_sold': 20 if day.weekday() >= 5 else 10})
+        rows.append({'date': day, 'dish_name': 'Dosa', 'quantity_sold': 6})
+    return pd.DataFrame(rows)
+
+
+def test_known_dishes_get_seasonal_tier():
+    predictions, tiers = FallbackForecaster(weekly_history(), '2024-02-26').forecast(['Chai', 'Dosa'])
+
+    assert tiers == {'Chai': TIER_SEASONAL, 'Dosa': TIER_SEASONAL}
+    assert predictions['Dosa'] == pytest.approx(6, abs=0.01)
+
+
+def test_weekday_factors_follow_the_weekly_pattern():
+    history = weekly_history()
+    saturday, _ = FallbackForecaster(history, '2024-03-02').forecast(['Chai'])
+    monday, _ = FallbackForecaster(history, '2024-03-04').forecast(['Chai'])
+
+    assert saturday['Chai'] == pytest.approx(20, rel=0.05)
+    assert monday['Chai'] == pytest.approx(10, rel=0.05)
+
+
+def test_unknown_dish_gets_global_mean():
+    history = weekly_history()
+    predictions, tiers = FallbackForecaster(history, '2024-02-26').forecast(['Samosa'])
+
+    assert tiers == {'Samosa': TIER_GLOBAL}
+    assert predictions['Samosa'] == pytest.approx(round(history['quantity_sold'].mean(), 2))
+
+
+def test_empty_history_falls_back_to_zero():
+    empty = pd.DataFrame({'date': pd.to_datetime([]), 'dish_name': [], 'quantity_sold': np.array([], dtype=float)})
+    predictions, tiers = FallbackForecaster(empty, '2024-02-26').forecast(['Chai'])
+
+    assert predictions == {'Chai': 0.0}
+    assert tiers == {'Chai': TIER_GLOBAL}
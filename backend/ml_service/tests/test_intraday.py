@@ -0,0 +1,100 @@
+"""
+Intraday Tests
+Restaurant-local order times and the slot forecaster round trip
+"""
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from exogenous import ExogenousFeatures
+from intraday import SlotForecaster, _frame, slot_grid
+from schemas import SchemaError, parse_slot_predict_payload, parse_slot_training_payload, sales_frame
+
+
+# UTC order times that fall at 08:00, 13:00 and 20:00 in Kolkata (+05:30)
+UTC_ORDER_TIMES = {'02:30:00Z': 3, '07:30:00Z': 9, '14:30:00Z': 6}
+
+
+def order_lines(days=60, dishes=('Dosa', 'Thali')):
+    start = pd.Timestamp('2024-01-01')
+    return [{'date': f"{(start + pd.Timedelta(days=day)).date()}T{time}", 'dish_name': dish,
+             'quantity_sold': quantity + (day % 7 == 5) * 2}
+            for day in range(days) for dish in dishes for time, quantity in UTC_ORDER_TIMES.items()]
+
+
+def test_offsets_move_to_local_time_and_naive_times_are_kept():
+    frame = sales_frame([
+        {'date': '2024-03-01T14:30:00Z', 'dish_name': 'Dosa', 'quantity_sold': 1},
+        {'date': '2024-03-01T20:00:00+05:30', 'dish_name': 'Dosa', 'quantity_sold': 1},
+        {'date': '2024-03-01T09:15:00', 'dish_name': 'Dosa', 'quantity_sold': 1}
+    ], timezone='Asia/Kolkata')
+
+    assert list(frame['date']) == [pd.Timestamp('2024-03-01 20:00'), pd.Timestamp('2024-03-01 20:00'),
+                                   pd.Timestamp('2024-03-01 09:15')]
+
+
+def test_late_utc_order_lands_on_the_next_local_day():
+    frame = sales_frame([{'date': '2024-03-01T20:00:00Z', 'dish_name': 'Dosa', 'quantity_sold': 1}],
+                        timezone='+05:30')
+
+    assert frame['date'].iloc[0] == pd.Timestamp('2024-03-02 01:30')
+
+
+def test_unknown_timezone_is_a_schema_error():
+    with pytest.raises(SchemaError) as info:
+        parse_slot_training_payload({'training_data': order_lines(days=1), 'timezone': 'Mars/Olympus'})
+
+    assert info.value.errors[0]['field'] == 'timezone'
+
+
+def test_prediction_date_with_offset_is_localized():
+    payload = {'historical_data': order_lines(days=1), 'timezone': 'Asia/Kolkata',
+               'prediction_date': '2024-03-01T20:00:00+00:00'}
+
+    _, _, prediction_date = parse_slot_predict_payload(payload)
+
+    assert prediction_date == datetime(2024, 3, 2, 1, 30)
+    assert prediction_date.tzinfo is None
+
+
+def test_naive_prediction_date_is_kept():
+    payload = {'historical_data': order_lines(days=1), 'prediction_date': '2024-03-01'}
+
+    _, _, prediction_date = parse_slot_predict_payload(payload, default_timezone='Asia/Kolkata')
+
+    assert prediction_date == datetime(2024, 3, 1)
+
+
+def test_local_times_fill_meal_slots():
+    history, scheme, _ = parse_slot_training_payload({'training_data': order_lines(days=2), 'timezone': 'Asia/Kolkata'})
+
+    grid = slot_grid(history, scheme)['grid']
+
+    np.testing.assert_array_equal(grid[:, 0, :], [[3, 9, 6], [3, 9, 6]])
+
+
+def test_missing_feature_column_is_filled_as_nan():
+    mask = np.array([True, False, True])
+
+    frame = _frame({'slot': np.array([0.0, 1.0, 2.0])}, ['slot', 'holiday_flag'], mask)
+
+    assert list(frame['slot']) == [0.0, 2.0]
+    assert frame['holiday_flag'].isna().all()
+
+
+def test_slot_forecaster_round_trip():
+    history, scheme, timezone = parse_slot_training_payload(
+        {'training_data': order_lines(), 'timezone': 'Asia/Kolkata'})
+    forecaster = SlotForecaster(scheme, exogenous=ExogenousFeatures(), timezone=timezone)
+    forecaster.train(history)
+
+    forecast = forecaster.predict(history, ['Dosa', 'Thali', 'Unknown'], datetime(2024, 3, 1))
+
+    assert set(forecast) == {'Dosa', 'Thali'}
+    assert list(forecast['Dosa']) == forecaster.slot_labels
+    # Lunch is the busiest slot in local time, breakfast the quietest
+    dosa = forecast['Dosa']
+    assert dosa['breakfast'] < dosa['dinner'] < dosa['lunch']
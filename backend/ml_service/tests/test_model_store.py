@@ -0,0 +1,80 @@
+"""
+Model Store Tests
+Compiled tree ensemble parity with XGBoost and memory-mapped artifacts
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+import xgboost as xgb
+
+from model_store import TreeEnsemble, flatten_booster, load_model_arrays, save_model_arrays
+
+
+COLUMNS = ['lag_1', 'lag_7', 'price', 'weekday']
+
+
+@pytest.fixture(scope='module')
+def data():
+    rng = np.random.default_rng(0)
+    X = rng.random((600, len(COLUMNS)), dtype=np.float32) * 10
+    y = 3 * X[:, 0] + X[:, 1] * (X[:, 3] > 5) - X[:, 2] + rng.normal(0, 0.5, len(X))
+    # Missing values exercise the default directions
+    X[rng.random(X.shape) < 0.1] = np.nan
+    return X, y
+
+
+@pytest.fixture(scope='module')
+def booster(data):
+    X, y = data
+    dtrain = xgb.DMatrix(X[:500], label=y[:500], feature_names=COLUMNS)
+    dtest = xgb.DMatrix(X[500:], label=y[500:], feature_names=COLUMNS)
+    return xgb.train({'max_depth': 5, 'learning_rate': 0.3, 'seed': 0}, dtrain, num_boost_round=60,
+                     evals=[(dtest, 'test')], early_stopping_rounds=5, verbose_eval=False)
+
+
+def test_matches_xgboost(data, booster):
+    X, _ = data
+    ensemble = TreeEnsemble(flatten_booster(booster, COLUMNS))
+    expected = booster.inplace_predict(X, iteration_range=(0, ensemble.num_trees))
+
+    np.testing.assert_allclose(ensemble.predict_array(X), expected, rtol=1e-5, atol=1e-4)
+
+
+def test_keeps_only_early_stopped_trees():
+    X = np.random.default_rng(1).random((300, 2), dtype=np.float32)
+    model = xgb.XGBRegressor(n_estimators=50, early_stopping_rounds=3, max_depth=3)
+    model.fit(X[:200], X[:200, 0], eval_set=[(X[200:], X[200:, 0] + 5)], verbose=False)
+    ensemble = TreeEnsemble(flatten_booster(model, ['a', 'b']))
+
+    assert ensemble.num_trees == model.best_iteration + 1
+    np.testing.assert_allclose(ensemble.predict_array(X), model.predict(X), rtol=1e-5, atol=1e-4)
+
+
+def test_dataframe_columns_reordered(data, booster):
+    X, _ = data
+    ensemble = TreeEnsemble(flatten_booster(booster, COLUMNS))
+    frame = pd.DataFrame(X, columns=COLUMNS)[COLUMNS[::-1]]
+
+    np.testing.assert_array_equal(ensemble.predict(frame), ensemble.predict_array(X))
+
+
+def test_mapped_artifact_used_without_copies(tmp_path, data, booster):
+    X, _ = data
+    path = str(tmp_path / 'model_arrays.joblib')
+    arrays = save_model_arrays(booster, path, COLUMNS)
+    ensemble = load_model_arrays(path)
+
+    assert isinstance(ensemble.children, np.memmap)
+    assert np.shares_memory(ensemble.left, ensemble.children)
+    np.testing.assert_array_equal(ensemble.predict_array(X), TreeEnsemble(arrays).predict_array(X))
+    assert [name for name in tmp_path.iterdir()] == [tmp_path / 'model_arrays.joblib']
+
+
+def test_artifact_without_children_still_loads(data, booster):
+    X, _ = data
+    arrays = flatten_booster(booster, COLUMNS)
+    legacy = {key: value for key, value in arrays.items() if key != 'children'}
+    legacy['left'], legacy['right'] = arrays['children'][0::2].copy(), arrays['children'][1::2].copy()
+
+    np.testing.assert_array_equal(TreeEnsemble(legacy).predict_array(X), TreeEnsemble(arrays).predict_array(X))
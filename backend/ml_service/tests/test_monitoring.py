@@ -0,0 +1,73 @@
+"""
+Monitoring Tests
+Drift histograms, re-scored rows and the retrain signal
+"""
+
+import numpy as np
+import pandas as pd
+
+from monitoring import ForecastMonitor, build_feature_reference
+
+
+def feature_rows(values, day='2024-03-01'):
+    return pd.DataFrame({
+        'dish_name': [f'Dish {i}' for i in range(len(values))],
+        'date': pd.Timestamp(day),
+        'lag_1_days': np.asarray(values, dtype=float)
+    })
+
+
+def monitor_for(training_values, **options):
+    monitor = ForecastMonitor(**options)
+    monitor.set_reference({'feature_reference': build_feature_reference(feature_rows(training_values)),
+                           'metrics': {'test_mae': 2.0}})
+    return monitor
+
+
+def test_reference_proportions_cover_training_rows():
+    reference = build_feature_reference(feature_rows(np.arange(100)))['lag_1_days']
+
+    assert len(reference['proportions']) == len(reference['edges']) + 1
+    assert abs(sum(reference['proportions']) - 1) < 1e-9
+
+
+def test_rescored_rows_are_counted_once():
+    monitor = monitor_for(np.arange(100), min_samples=10)
+    rows = feature_rows(np.full(10, 500.0))
+
+    for _ in range(4):
+        monitor.observe_features(rows)
+
+    assert monitor.report()['drift']['lag_1_days']['samples'] == 10
+
+
+def test_training_like_traffic_does_not_drift():
+    monitor = monitor_for(np.arange(100), min_samples=10)
+
+    monitor.observe_features(feature_rows(np.arange(100)))
+
+    drift = monitor.report()['drift']['lag_1_days']
+    assert drift['psi'] < 0.01 and not drift['drifted']
+
+
+def test_shifted_traffic_drifts_after_min_samples():
+    monitor = monitor_for(np.arange(100), min_samples=20)
+
+    monitor.observe_features(feature_rows(np.full(10, 500.0)))
+    assert not monitor.report()['retrain_needed']
+
+    monitor.observe_features(feature_rows(np.full(10, 500.0), day='2024-03-02'))
+    report = monitor.report()
+    assert report['drift']['lag_1_days']['drifted']
+    assert report['retrain_needed']
+
+
+def test_accuracy_flags_retrain_when_errors_grow():
+    monitor = monitor_for(np.arange(100), min_samples=5)
+
+    monitor.observe_actuals([{'dish_name': 'Dosa', 'forecast': 20, 'actual': 10}] * 5)
+
+    report = monitor.report()
+    assert report['accuracy']['pairs'] == 5
+    assert report['accuracy']['dishes']['Dosa']['bias'] == 10
+    assert any('MAE' in reason for reason in report['reasons'])
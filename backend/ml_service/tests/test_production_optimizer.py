@@ -0,0 +1,90 @@
+"""
+Production Optimizer Tests
+Profit, stock, expiry and demand limits of the production MILP
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from production_optimizer import MAX_DEMAND_MULTIPLE, optimize_production
+
+
+NOW = datetime(2026, 1, 1, 9, 0)
+
+
+def expiring(ingredient, quantity, days):
+    return {'ingredient': ingredient, 'quantity': quantity, 'expiryDate': (NOW + timedelta(days=days)).isoformat()}
+
+
+def plan_of(result):
+    return {dish['dish_name']: dish for dish in result['dishes']}
+
+
+def ingredients_of(result):
+    return {item['ingredient']: item for item in result['ingredients']}
+
+
+def test_near_expiry_stock_never_pays_to_overproduce():
+    # Review repro: the expiry bonus used to make 12 chai for demand 10
+    result = optimize_production({'Chai': 10}, [{'name': 'Chai', 'price': 10}],
+                                 [expiring('milk', 1e6, 0.5)], {'Chai': {'milk': 100}}, now=NOW)
+
+    assert plan_of(result)['Chai']['optimized_production'] == 10
+    assert result['expected_profit'] == pytest.approx(40)
+
+
+def test_near_expiry_batch_used_first():
+    inventory = [expiring('milk', 500, 0.5), expiring('milk', 500, 10), {'ingredient': 'flour', 'quantity': 1000}]
+    result = optimize_production({'Chai': 6, 'Bread': 6}, [{'name': 'Chai', 'price': 10}, {'name': 'Bread', 'price': 10}],
+                                 inventory, {'Chai': {'milk': 100}, 'Bread': {'flour': 100}}, now=NOW)
+
+    milk = ingredients_of(result)['milk']
+    assert milk['used'] == pytest.approx(600)
+    assert milk['near_expiry_used'] == pytest.approx(500)
+
+
+def test_scarce_stock_goes_to_the_more_profitable_dish():
+    result = optimize_production({'Paneer Tikka': 5, 'Paneer Roll': 5},
+                                 [{'name': 'Paneer Tikka', 'price': 300}, {'name': 'Paneer Roll', 'price': 100}],
+                                 [{'ingredient': 'Paneer', 'quantity': 1.0}],
+                                 {'Paneer Tikka': {'paneer': 0.1}, 'Paneer Roll': {'paneer': 0.1}}, now=NOW)
+
+    plans = plan_of(result)
+    assert plans['Paneer Tikka']['optimized_production'] == 5
+    assert plans['Paneer Roll']['optimized_production'] == 5
+    assert plans['Paneer Roll']['limited_by'] == []
+
+    result = optimize_production({'Paneer Tikka': 8, 'Paneer Roll': 8},
+                                 [{'name': 'Paneer Tikka', 'price': 300}, {'name': 'Paneer Roll', 'price': 100}],
+                                 [{'ingredient': 'Paneer', 'quantity': 1.0}],
+                                 {'Paneer Tikka': {'paneer': 0.1}, 'Paneer Roll': {'paneer': 0.1}}, now=NOW)
+    plans = plan_of(result)
+    assert plans['Paneer Tikka']['optimized_production'] == 8
+    assert plans['Paneer Roll']['optimized_production'] == 2
+    assert plans['Paneer Roll']['limited_by'] == ['paneer']
+    assert ingredients_of(result)['paneer']['left'] == pytest.approx(0)
+
+
+def test_expired_stock_is_unusable():
+    result = optimize_production({'Chai': 5}, [{'name': 'Chai', 'price': 10}],
+                                 [expiring('milk', 1000, -1)], {'Chai': {'milk': 100}}, now=NOW)
+
+    assert plan_of(result)['Chai']['optimized_production'] == 0
+    assert ingredients_of(result)['milk']['available'] == 0
+
+
+def test_untracked_ingredients_do_not_limit():
+    result = optimize_production({'Chai': 7.6}, [{'name': 'Chai', 'price': 10}], [],
+                                 {'Chai': {'milk': 100, 'sugar': 5}}, now=NOW)
+
+    chai = plan_of(result)['Chai']
+    assert result['untracked_ingredients'] == ['milk', 'sugar']
+    assert 7 <= chai['optimized_production'] <= int(7.6 * MAX_DEMAND_MULTIPLE)
+    assert chai['expected_sales'] <= 7.6
+
+
+def test_no_dishes():
+    result = optimize_production({}, [], [], {}, now=NOW)
+
+    assert result['dishes'] == [] and result['expected_profit'] == 0
@@ -0,0 +1,76 @@
+"""
+Reconciliation Tests
+Coherence of dish, category and restaurant forecasts after WLS
+"""
+
+import numpy as np
+import pandas as pd
+
+from reconciliation import build_hierarchy, reconcile, reconcile_forecasts
+
+
+PREDICTION_DATE = pd.Timestamp('2024-03-01')
+MENU = [
+    {'name': 'Biryani', 'category': 'Mains'},
+    {'name': 'Pulao', 'category': 'Mains'},
+    {'name': 'Kheer', 'category': 'Desserts'},
+    {'name': 'Special', 'category': 'Mains'}
+]
+
+
+def history():
+    rng = np.random.default_rng(0)
+    days = pd.date_range(end=PREDICTION_DATE - pd.Timedelta(days=1), periods=28)
+    rows = []
+    for day in days:
+        rows.append({'date': day, 'dish_name': 'Biryani', 'quantity_sold': 30 + rng.normal(0, 2)})
+        rows.append({'date': day, 'dish_name': 'Pulao', 'quantity_sold': 10 + rng.normal(0, 1)})
+        rows.append({'date': day, 'dish_name': 'Kheer', 'quantity_sold': 8 + rng.normal(0, 1)})
+    # Sold on two days only
+    rows += [{'date': days[-1], 'dish_name': 'Special', 'quantity_sold': 5},
+             {'date': days[-8], 'dish_name': 'Special', 'quantity_sold': 4}]
+    return pd.DataFrame(rows)
+
+
+def test_summing_matrix():
+    S, labels, dishes = build_hierarchy(MENU)
+
+    assert labels[0] == ('restaurant', 'total')
+    assert labels[1:3] == [('category', 'Desserts'), ('category', 'Mains')]
+    assert S.shape == (1 + 2 + len(dishes), len(dishes))
+    np.testing.assert_array_equal(S[0], 1)
+    np.testing.assert_array_equal(S[2], [1, 1, 0, 1])
+
+
+def test_reconciled_levels_add_up():
+    S, _, _ = build_hierarchy(MENU)
+    base = np.array([70.0, 9.0, 50.0, 32.0, 11.0, 8.0, 4.0])
+    reconciled = reconcile(base, S, np.ones(len(base)))
+
+    np.testing.assert_allclose(reconciled, S @ reconciled[-4:])
+    assert (reconciled >= 0).all()
+
+
+def test_low_variance_series_move_least():
+    S, _, _ = build_hierarchy(MENU)
+    base = np.array([80.0, 8.0, 60.0, 30.0, 10.0, 8.0, 5.0])
+    variances = np.array([1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 100.0])
+    reconciled = reconcile(base, S, variances)
+
+    changes = np.abs(reconciled - base)[-4:]
+    assert changes.argmax() == 3
+
+
+def test_forecasts_coherent_and_sparse_dish_absorbs_gap():
+    predictions = {'Biryani': 30.0, 'Pulao': 10.0, 'Kheer': 8.0, 'Special': 30.0}
+    dishes, hierarchy = reconcile_forecasts(predictions, history(), MENU, PREDICTION_DATE)
+
+    categories = {entry['category']: entry['reconciled'] for entry in hierarchy['categories']}
+    assert abs(sum(dishes.values()) - hierarchy['restaurant']['reconciled']) < 0.1
+    assert abs(dishes['Biryani'] + dishes['Pulao'] + dishes['Special'] - categories['Mains']) < 0.1
+
+    # The sparse dish's inflated forecast takes most of the correction
+    moves = {name: abs(dishes[name] - predictions[name]) for name in predictions}
+    assert dishes['Special'] < 20
+    assert max(moves, key=moves.get) == 'Special'
+    assert moves['Special'] > moves['Biryani'] + moves['Pulao']
@@ -0,0 +1,100 @@
+"""
+Response Format Tests
+Field projection, columnar layout and encodings of plan responses
+"""
+
+import gzip
+import json
+
+import pytest
+
+import response_format
+from response_format import (
+    ResponseOptions, encode_body, iter_encoded, iter_json, parse_response_options, project, shape_body,
+    to_columnar
+)
+from schemas import SchemaError
+
+
+PLAN = {
+    'timestamp': '2024-02-21T10:00:00',
+    'summary': {'total_dishes': 2, 'expected_profit': 120.5},
+    'predictions': [
+        {'dish_name': 'Biryani', 'predicted_demand': 30.0, 'priority': 'High'},
+        {'dish_name': 'Dosa', 'predicted_demand': 12.5, 'priority': 'Low', 'note': 'new'}
+    ]
+}
+
+
+def test_field_paths_select_nested_keys():
+    options = parse_response_options({'fields': 'summary.total_dishes,predictions.dish_name'})
+
+    assert project(PLAN, options.fields) == {
+        'summary': {'total_dishes': 2},
+        'predictions': [{'dish_name': 'Biryani'}, {'dish_name': 'Dosa'}]
+    }
+
+
+def test_whole_key_wins_over_nested_path():
+    options = parse_response_options({'fields': 'summary,summary.total_dishes'})
+
+    assert project(PLAN, options.fields) == {'summary': PLAN['summary']}
+
+
+def test_missing_keys_are_skipped():
+    options = parse_response_options({'fields': 'predictions.note,unknown'})
+
+    assert project(PLAN, options.fields) == {'predictions': [{}, {'note': 'new'}]}
+
+
+@pytest.mark.parametrize('query', [{'fields': 'summary;drop'}, {'layout': 'tree'}])
+def test_malformed_options_rejected(query):
+    with pytest.raises(SchemaError):
+        parse_response_options(query)
+
+
+def test_columnar_layout_unions_columns():
+    columns = to_columnar(PLAN)['predictions']
+
+    assert columns == {
+        'dish_name': ['Biryani', 'Dosa'],
+        'predicted_demand': [30.0, 12.5],
+        'priority': ['High', 'Low'],
+        'note': [None, 'new']
+    }
+
+
+def test_shape_body_only_touches_the_plan():
+    body = {'success': True, 'production_plan': PLAN}
+    shaped = shape_body(body, ResponseOptions(fields={'summary': None}, columnar=True))
+
+    assert shaped == {'success': True, 'production_plan': {'summary': PLAN['summary']}}
+    assert shape_body(body, ResponseOptions()) is body
+
+
+def test_gzip_round_trip_and_small_bodies_uncompressed():
+    big = {'production_plan': {'predictions': [{'dish_name': f'Dish {i}'} for i in range(200)]}}
+    data, headers = encode_body(big, ResponseOptions(encoding='gzip'))
+    assert headers['Content-Encoding'] == 'gzip'
+    assert json.loads(gzip.decompress(data)) == big
+
+    data, headers = encode_body({'success': True}, ResponseOptions(encoding='gzip'))
+    assert 'Content-Encoding' not in headers
+    assert json.loads(data) == {'success': True}
+
+
+def test_negotiation_skips_refused_codings():
+    assert parse_response_options({}, 'gzip;q=0, br').encoding is None
+    assert parse_response_options({}, 'br, gzip').encoding == 'gzip'
+
+
+def test_streamed_text_matches_one_shot_encoding(monkeypatch):
+    monkeypatch.setattr(response_format, 'STREAM_BATCH_ROWS', 3)
+    monkeypatch.setattr(response_format, 'STREAM_CHUNK_BYTES', 64)
+    body = {'success': True, 'production_plan': {'predictions': [{'i': i} for i in range(10)]}}
+    expected = json.dumps(body, separators=(',', ':'))
+
+    assert ''.join(iter_json(body)) == expected
+    chunks = list(iter_encoded(body, ResponseOptions(encoding='gzip', stream=True)))
+    assert len(chunks) > 1
+    assert gzip.decompress(b''.join(chunks)).decode() == expected
@@ -0,0 +1,99 @@
+"""
+Schema Tests
+Payload validation errors and the fixed-dtype sales frame
+"""
+
+import numpy as np
+import pytest
+
+from schemas import (
+    MAX_REPORTED_ERRORS, SchemaError, parse_actuals_payload, parse_predict_payload, parse_restaurant_id,
+    sales_frame
+)
+
+
+def record(**overrides):
+    base = {'date': '2024-02-21', 'dish_name': 'Biryani', 'quantity_sold': 12,
+            'selling_price': 250, 'cost_price': 150}
+    return {**base, **overrides}
+
+
+def details(error):
+    return {(item['field'], item['record'], item['error']) for item in error.errors}
+
+
+def test_sales_frame_dtypes():
+    frame = sales_frame([record(), record(dish_name='Dosa', quantity_sold=3.5)])
+
+    assert str(frame['date'].dtype) == 'datetime64[ns]'
+    assert str(frame['dish_name'].dtype) == 'category'
+    assert frame['quantity_sold'].dtype == np.float32
+    assert frame['quantity_sold'].tolist() == [12.0, 3.5]
+
+
+def test_sales_frame_reports_every_bad_value():
+    records = [record(), record(date='yesterday', quantity_sold=-3), record(dish_name=''),
+               record(quantity_sold='7', selling_price=True)]
+
+    with pytest.raises(SchemaError) as raised:
+        sales_frame(records)
+
+    assert raised.value.total == 5
+    assert details(raised.value) == {
+        ('historical_data.date', 1, 'is not an ISO date'),
+        ('historical_data.quantity_sold', 1, 'must be >= 0'),
+        ('historical_data.dish_name', 2, 'is required'),
+        ('historical_data.quantity_sold', 3, 'must be a number'),
+        ('historical_data.selling_price', 3, 'must be a number')
+    }
+
+
+def test_error_list_is_capped_but_total_kept():
+    records = [record(quantity_sold='x')] * (MAX_REPORTED_ERRORS + 5)
+
+    with pytest.raises(SchemaError) as raised:
+        sales_frame(records)
+
+    assert len(raised.value.errors) == MAX_REPORTED_ERRORS
+    assert raised.value.to_dict()['invalid_count'] == MAX_REPORTED_ERRORS + 5
+
+
+def test_non_object_records_rejected():
+    with pytest.raises(SchemaError) as raised:
+        parse_predict_payload({'historical_data': [record(), 'oops']})
+
+    assert details(raised.value) == {('historical_data', 1, 'must be an object')}
+
+
+def test_mixed_naive_and_offset_dates():
+    frame = sales_frame([record(date='2024-02-21'), record(date='2024-02-21T06:30:00+05:30'),
+                         record(date='2024-02-21T01:00:00Z')])
+
+    assert frame['date'].astype(str).tolist() == ['2024-02-21 00:00:00', '2024-02-21 01:00:00',
+                                                  '2024-02-21 01:00:00']
+
+
+def test_menu_names_must_be_unique():
+    with pytest.raises(SchemaError) as raised:
+        parse_predict_payload({'historical_data': [record()],
+                               'menu_items': [{'name': 'Dosa'}, {'name': 'Dosa', 'price': -1}]})
+
+    assert details(raised.value) == {('menu_items.name', 1, 'is duplicated'),
+                                     ('menu_items.price', 1, 'must be >= 0')}
+
+
+def test_restaurant_id_pattern():
+    assert parse_restaurant_id('r42_main-1') == 'r42_main-1'
+    with pytest.raises(SchemaError):
+        parse_restaurant_id('../r42')
+
+
+def test_actuals_payload():
+    records, restaurant_id = parse_actuals_payload(
+        {'records': [{'dish_name': 'Dosa', 'forecast': 4.5, 'actual': 5}], 'restaurant_id': 'r1'})
+    assert restaurant_id == 'r1' and records[0]['actual'] == 5
+
+    with pytest.raises(SchemaError) as raised:
+        parse_actuals_payload({'records': [{'dish_name': 'Dosa', 'forecast': '4', 'actual': None}]})
+    assert details(raised.value) == {('records.forecast', 0, 'must be a number'),
+                                     ('records.actual', 0, 'is required')}
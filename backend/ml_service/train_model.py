@@ -5,7 +5,6 @@ Trains XGBoost Regressor for demand forecasting
 
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
 import xgboost as xgb
 import joblib
@@ -14,6 +13,61 @@ from datetime import datetime
 
 from data_preprocessing import DataPreprocessor
 from feature_engineering import FeatureEngineer
+from model_store import save_model_arrays
+from monitoring import build_feature_reference
+from dataset_cache import DatasetCache, canonical_dataset, dataset_hash
+
+
+# Histogram bins per feature; fewer bins train faster in less memory
+MAX_BIN = 256
+
+# Booster parameters (the former XGBRegressor settings, with explicit hist)
+XGB_PARAMS = {
+    'objective': 'reg:squarederror',
+    'tree_method': 'hist',
+    'max_depth': 6,
+    'learning_rate': 0.1,
+    'subsample': 0.8,
+    'colsample_bytree': 0.8,
+    'min_child_weight': 3,
+    'gamma': 0.1,
+    'reg_alpha': 0.1,
+    'reg_lambda': 1.0
+}
+NUM_BOOST_ROUND = 200
+EARLY_STOPPING_ROUNDS = 20
+
+# Rows converted to float32 at a time while building the training matrix
+CHUNK_ROWS = 65536
+
+
+class FeatureBatches(xgb.DataIter):
+    """
+    Row chunks of a feature frame as float32 arrays
+
+    QuantileDMatrix consumes the chunks one at a time, so the float64
+    frame is never copied whole into a second dense matrix.
+    """
+
+    def __init__(self, X, y, chunk_rows=CHUNK_ROWS):
+        self.X = X
+        self.y = y
+        self.chunk_rows = chunk_rows
+        self.position = 0
+        super().__init__()
+
+    def next(self, input_data):
+        if self.position >= len(self.X):
+            return 0
+        stop = self.position + self.chunk_rows
+        input_data(data=self.X.iloc[self.position:stop].to_numpy(dtype=np.float32),
+                   label=self.y.iloc[self.position:stop].to_numpy(dtype=np.float32),
+                   feature_names=list(self.X.columns))
+        self.position = stop
+        return 1
+
+    def reset(self):
+        self.position = 0
 
 
 class DemandForecaster:
@@ -21,12 +75,21 @@ class DemandForecaster:
     Manages training and evaluation of the demand forecasting model
     """
     
-    def __init__(self):
+    def __init__(self, cache_dir=None, max_bin=MAX_BIN):
+        """
+        Args:
+            cache_dir: str, directory for cached feature matrices (None disables)
+            max_bin: int, histogram bins per feature
+        """
         self.model = None
         self.preprocessor = DataPreprocessor()
         self.feature_engineer = FeatureEngineer()
         self.feature_columns = []
         self.metrics = {}
+        self.feature_reference = {}
+        self.dataset_hash = None
+        self.cache = DatasetCache(cache_dir) if cache_dir else None
+        self.max_bin = max_bin
     
     def train(self, data, test_size=0.2, random_state=42):
         """
@@ -42,66 +105,96 @@ class DemandForecaster:
         """
         print("Starting model training...")
         
-        # Load and preprocess data
+        # Canonical row order and dtypes, so equal data always hashes equal
         df = self.preprocessor.load_data(data)
-        df = self.preprocessor.prepare_training_data(df)
-        
-        print(f"Preprocessed data shape: {df.shape}")
+        df = canonical_dataset(df, self.preprocessor.required_columns)
+        self.dataset_hash = dataset_hash(df, extra=self.feature_engineer.exogenous.fingerprint())
+        print(f"Dataset hash: {self.dataset_hash[:16]}")
         
-        # Feature engineering
-        df = self.feature_engineer.engineer_features(df)
-        
-        # Select features
-        X, y, feature_names = self.feature_engineer.select_features(df)
-        self.feature_columns = feature_names
+        cached = self.cache.load(self.dataset_hash) if self.cache else None
+        if cached is not None:
+            # Same data as an earlier run: skip preprocessing entirely
+            X, y = cached
+            feature_names = list(X.columns)
+            print("Reusing cached feature matrix")
+        else:
+            df = self.preprocessor.prepare_training_data(df)
+            
+            print(f"Preprocessed data shape: {df.shape}")
+            
+            # Feature engineering
+            df = self.feature_engineer.engineer_features(df)
+            
+            # Rows come out dish by dish; order by date (stable, so dishes
+            # keep their order within a day) for the time-ordered split
+            df = df.sort_values('date', kind='stable', ignore_index=True)
+            
+            # Select features
+            X, y, feature_names = self.feature_engineer.select_features(df)
+            if self.cache:
+                self.cache.save(self.dataset_hash, X, y)
         
         print(f"Features selected: {len(feature_names)}")
         print(f"Feature names: {feature_names}")
         
-        # Train-test split
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=test_size, random_state=random_state, shuffle=False
-        )
+        return self.fit_features(X, y, test_size, random_state)
+    
+    def fit_features(self, X, y, test_size=0.2, random_state=42):
+        """
+        Train on an engineered feature matrix
+        
+        Args:
+            X: pd.DataFrame of features, rows sorted by date (as train() builds them)
+            y: pd.Series target
+            test_size: float, trailing share of rows held out
+            random_state: int, random seed
+            
+        Returns:
+            dict: Training metrics
+        """
+        self.feature_columns = feature_names = list(X.columns)
+        
+        # Time-ordered split: the most recent days of every dish are held out
+        num_train = len(X) - int(np.ceil(len(X) * test_size))
+        X_train, X_test = X.iloc[:num_train], X.iloc[num_train:]
+        y_train, y_test = y.iloc[:num_train], y.iloc[num_train:]
         
         print(f"Training set size: {len(X_train)}, Test set size: {len(X_test)}")
         
-        # Initialize XGBoost model
-        self.model = xgb.XGBRegressor(
-            objective='reg:squarederror',
-            n_estimators=200,
-            max_depth=6,
-            learning_rate=0.1,
-            subsample=0.8,
-            colsample_bytree=0.8,
-            min_child_weight=3,
-            gamma=0.1,
-            reg_alpha=0.1,
-            reg_lambda=1.0,
-            random_state=random_state,
-            n_jobs=-1
-        )
+        # Distribution the drift monitor compares live features with: every
+        # dish and day the model learned from, not just the training split
+        self.feature_reference = build_feature_reference(X)
+        
+        # Quantized histogram matrices built from float32 chunks; the eval
+        # set reuses the training cuts instead of sketching its own
+        dtrain = xgb.QuantileDMatrix(FeatureBatches(X_train, y_train), max_bin=self.max_bin)
+        dtest = xgb.QuantileDMatrix(FeatureBatches(X_test, y_test), max_bin=self.max_bin, ref=dtrain)
         
         # Train model
         print("Training XGBoost model...")
-        self.model.fit(
-            X_train, y_train,
-            eval_set=[(X_test, y_test)],
-            early_stopping_rounds=20,
-            verbose=False
+        self.model = xgb.train(
+            {**XGB_PARAMS, 'max_bin': self.max_bin, 'seed': random_state},
+            dtrain,
+            num_boost_round=NUM_BOOST_ROUND,
+            evals=[(dtest, 'test')],
+            early_stopping_rounds=EARLY_STOPPING_ROUNDS,
+            verbose_eval=False
         )
         
-        # Predictions
-        y_train_pred = self.model.predict(X_train)
-        y_test_pred = self.model.predict(X_test)
+        # Predictions with the early-stopped trees, straight from the
+        # quantized matrices (split thresholds are bin cuts, so exact)
+        iteration_range = (0, self.model.best_iteration + 1)
+        y_train_pred = self.model.predict(dtrain, iteration_range=iteration_range)
+        y_test_pred = self.model.predict(dtest, iteration_range=iteration_range)
         
-        # Calculate metrics
+        # Calculate metrics (float32 targets give float32 scores; JSON needs floats)
         self.metrics = {
-            'train_rmse': np.sqrt(mean_squared_error(y_train, y_train_pred)),
-            'test_rmse': np.sqrt(mean_squared_error(y_test, y_test_pred)),
-            'train_mae': mean_absolute_error(y_train, y_train_pred),
-            'test_mae': mean_absolute_error(y_test, y_test_pred),
-            'train_r2': r2_score(y_train, y_train_pred),
-            'test_r2': r2_score(y_test, y_test_pred),
+            'train_rmse': float(np.sqrt(mean_squared_error(y_train, y_train_pred))),
+            'test_rmse': float(np.sqrt(mean_squared_error(y_test, y_test_pred))),
+            'train_mae': float(mean_absolute_error(y_train, y_train_pred)),
+            'test_mae': float(mean_absolute_error(y_test, y_test_pred)),
+            'train_r2': float(r2_score(y_train, y_train_pred)),
+            'test_r2': float(r2_score(y_test, y_test_pred)),
             'train_size': len(X_train),
             'test_size': len(X_test),
             'num_features': len(feature_names)
@@ -114,13 +207,15 @@ class DemandForecaster:
         
         return self.metrics
     
-    def save_model(self, model_path='model.pkl', metadata_path='model_metadata.json'):
+    def save_model(self, model_path='model.pkl', metadata_path='model_metadata.json',
+                   arrays_path='model_arrays.joblib'):
         """
         Save trained model and metadata
         
         Args:
             model_path: str, path to save model
             metadata_path: str, path to save metadata
+            arrays_path: str, path to save memory-mappable node arrays (None to skip)
         """
         if self.model is None:
             raise ValueError("No trained model to save. Train the model first.")
@@ -128,12 +223,18 @@ class DemandForecaster:
         # Save model
         joblib.dump(self.model, model_path)
         
+        # Save flattened trees so workers can share one mapped copy
+        if arrays_path:
+            save_model_arrays(self.model, arrays_path, self.feature_columns)
+        
         # Save metadata
         metadata = {
             'feature_columns': self.feature_columns,
             'metrics': self.metrics,
+            'feature_reference': self.feature_reference,
+            'dataset_hash': self.dataset_hash,
             'timestamp': datetime.now().isoformat(),
-            'model_type': 'XGBRegressor'
+            'model_type': 'Booster'
         }
         
         with open(metadata_path, 'w') as f:
@@ -141,6 +242,8 @@ class DemandForecaster:
         
         print(f"Model saved to {model_path}")
         print(f"Metadata saved to {metadata_path}")
+        if arrays_path:
+            print(f"Model arrays saved to {arrays_path}")
     
     def load_model(self, model_path='model.pkl', metadata_path='model_metadata.json'):
         """
@@ -313,6 +313,117 @@ const getProductionOptimization = async (req, res) => {
   }
 };
 
+// Production plan fields read by getMLOptimization
+const ML_PLAN_FIELDS = [
+  'summary.high_waste_risk_count',
+  'summary.total_dishes',
+  'summary.expected_profit',
+  'predictions.dish_name',
+  'predictions.predicted_demand',
+  'predictions.current_stock',
+  'predictions.recommended_production',
+  'predictions.expected_profit',
+  'predictions.priority',
+  'predictions.action',
+  'waste_alerts.severity',
+  'waste_alerts.message',
+  'waste_alerts.action',
+  'donation_suggestions'
+].join(',');
+
+// Tomorrow's plan for a restaurant. Dashboards read the plan the ML service
+// has already materialized ('next': the date the ML service plans for); 30
+// days of orders are only gathered and sent (and the plan computed) when no
+// plan is stored for that date yet.
+const fetchMLPlan = async (restaurantId, menuItems, inventory) => {
+  const axios = require('axios');
+  const ML_SERVICE_URL = process.env.ML_SERVICE_URL || 'http://localhost:5002';
+
+  try {
+    const stored = await axios.get(`${ML_SERVICE_URL}/plan/${restaurantId}`, {
+      timeout: 10000,
+      // Only the plan fields getMLOptimization uses; the response is gzipped
+      params: { date: 'next', fields: ML_PLAN_FIELDS }
+    });
+    if (stored.data.success) {
+      return stored.data;
+    }
+  } catch (error) {
+    // 404: nothing materialized yet; anything else is a real failure
+    if (!error.response || error.response.status !== 404) {
+      throw error;
+    }
+  }
+
+  const recentOrders = await PreOrder.find({
+    restaurant: restaurantId,
+    createdAt: { $gte: new Date(Date.now() - 30 * 24 * 60 * 60 * 1000) } // Last 30 days
+  });
+
+  // Prepare historical sales data for ML service
+  const historicalData = [];
+  
+  // Process orders to extract sales data
+  recentOrders.forEach(order => {
+    const orderDate = new Date(order.createdAt);
+    order.items.forEach(item => {
+      if (item.menuItemId) {
+        const menuItem = menuItems.find(m => m._id.toString() === item.menuItemId.toString());
+        if (menuItem) {
+          historicalData.push({
+            date: orderDate.toISOString().split('T')[0],
+            dish_name: menuItem.name,
+            quantity_sold: item.quantity || 1,
+            selling_price: menuItem.price,
+            cost_price: menuItem.price * 0.6  // Assume 40% margin
+          });
+        }
+      } else if (item.dish) {
+        // Legacy format
+        const menuItem = menuItems.find(m => m.name === item.dish);
+        if (menuItem) {
+          historicalData.push({
+            date: orderDate.toISOString().split('T')[0],
+            dish_name: item.dish,
+            quantity_sold: item.quantity || 1,
+            selling_price: menuItem.price,
+            cost_price: menuItem.price * 0.6
+          });
+        }
+      }
+    });
+  });
+
+  // Prepare menu items data
+  const menuItemsData = menuItems.map(item => ({
+    name: item.name,
+    price: item.price,
+    stock: item.stock || 0,
+    category: item.category,
+    isAvailable: item.isAvailable
+  }));
+
+  // Prepare inventory data
+  const inventoryData = inventory.map(item => ({
+    ingredient: item.ingredient || item.itemName,
+    itemName: item.itemName || item.ingredient,
+    quantity: item.quantity,
+    status: item.status,
+    expiryDate: item.expiryDate
+  }));
+
+  // Miss: the ML service computes the plan and stores it for the next reads
+  const mlResponse = await axios.post(`${ML_SERVICE_URL}/plan/${restaurantId}`, {
+    historical_data: historicalData,
+    menu_items: menuItemsData,
+    inventory_data: inventoryData
+  }, {
+    timeout: 10000,  // 10 second timeout
+    params: { fields: ML_PLAN_FIELDS }
+  });
+  return mlResponse.data;
+};
+
 // @desc    Get ML-based production optimization with demand forecasting
 // @route   GET /api/predictions/ml-optimize
 // @access  Private/Restaurant
@@ -320,83 +431,17 @@ const getMLOptimization = async (req, res) => {
   try {
     const restaurantId = req.user._id;
 
-    // Fetch all required data in parallel
-    const [inventory, menuItems, recentOrders] = await Promise.all([
+    // Menu and stock are needed for the response either way
+    const [inventory, menuItems] = await Promise.all([
       Inventory.find({ restaurant: restaurantId }),
-      MenuItem.find({ restaurant: restaurantId }),
-      PreOrder.find({ 
-        restaurant: restaurantId,
-        createdAt: { $gte: new Date(Date.now() - 30 * 24 * 60 * 60 * 1000) } // Last 30 days
-      })
+      MenuItem.find({ restaurant: restaurantId })
     ]);
 
-    // Prepare historical sales data for ML service
-    const historicalData = [];
-    
-    // Process orders to extract sales data
-    recentOrders.forEach(order => {
-      const orderDate = new Date(order.createdAt);
-      order.items.forEach(item => {
-        if (item.menuItemId) {
-          const menuItem = menuItems.find(m => m._id.toString() === item.menuItemId.toString());
-          if (menuItem) {
-            historicalData.push({
-              date: orderDate.toISOString().split('T')[0],
-              dish_name: menuItem.name,
-              quantity_sold: item.quantity || 1,
-              selling_price: menuItem.price,
-              cost_price: menuItem.price * 0.6  // Assume 40% margin
-            });
-          }
-        } else if (item.dish) {
-          // Legacy format
-          const menuItem = menuItems.find(m => m.name === item.dish);
-          if (menuItem) {
-            historicalData.push({
-              date: orderDate.toISOString().split('T')[0],
-              dish_name: item.dish,
-              quantity_sold: item.quantity || 1,
-              selling_price: menuItem.price,
-              cost_price: menuItem.price * 0.6
-            });
-          }
-        }
-      });
-    });
-
-    // Prepare menu items data
-    const menuItemsData = menuItems.map(item => ({
-      name: item.name,
-      price: item.price,
-      stock: item.stock || 0,
-      category: item.category,
-      isAvailable: item.isAvailable
-    }));
-
-    // Prepare inventory data
-    const inventoryData = inventory.map(item => ({
-      ingredient: item.ingredient || item.itemName,
-      itemName: item.itemName || item.ingredient,
-      quantity: item.quantity,
-      status: item.status,
-      expiryDate: item.expiryDate
-    }));
-
-    // Call ML service
-    const axios = require('axios');
-    const ML_SERVICE_URL = process.env.ML_SERVICE_URL || 'http://localhost:5002';
-
     try {
-      const mlResponse = await axios.post(`${ML_SERVICE_URL}/predict`, {
-        historical_data: historicalData,
-        menu_items: menuItemsData,
-        inventory_data: inventoryData
-      }, {
-        timeout: 10000  // 10 second timeout
-      });
+      const mlPlan = await fetchMLPlan(restaurantId, menuItems, inventory);
 
-      if (mlResponse.data.success) {
-        const productionPlan = mlResponse.data.production_plan;
+      if (mlPlan.success) {
+        const productionPlan = mlPlan.production_plan;
 
         // Format response to match frontend expectations
         const response = {